@@ -0,0 +1,58 @@
+"""Add composite indexes for analytics access paths
+
+Revision ID: 0a6d3e5f8b21
+Revises: f2a4c8d16e93
+Create Date: 2025-07-07 14:31:20.667015
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0a6d3e5f8b21'
+down_revision = 'f2a4c8d16e93'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'ix_eventlog_student_session_ts', 'eventlog',
+        ['student_id', 'session_id', sa.text('"timestamp" DESC')]
+    )
+    op.create_index(
+        'ix_eventlog_student_ts_covering', 'eventlog',
+        ['student_id', sa.text('"timestamp" DESC')],
+        postgresql_include=['event_type', 'success', 'score']
+    )
+    op.create_index(
+        'ix_chatinteraction_tracking_ts', 'chatinteraction',
+        ['session_tracking_id', sa.text('"timestamp" DESC')]
+    )
+    op.create_index(
+        'ix_codeinteraction_tracking_ts', 'codeinteraction',
+        ['session_tracking_id', 'timestamp']
+    )
+    op.create_index(
+        'ix_codesubmission_tracking_node_ts', 'codesubmission',
+        ['session_tracking_id', 'node_id', sa.text('"timestamp" DESC')]
+    )
+    op.create_index(
+        'ix_codesubmission_student_node_ts', 'codesubmission',
+        ['student_id', 'node_id', sa.text('"timestamp" DESC')]
+    )
+    op.create_index(
+        'ix_cointransaction_student_created', 'cointransaction',
+        ['student_id', sa.text('created_at DESC')]
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_cointransaction_student_created', table_name='cointransaction')
+    op.drop_index('ix_codesubmission_student_node_ts', table_name='codesubmission')
+    op.drop_index('ix_codesubmission_tracking_node_ts', table_name='codesubmission')
+    op.drop_index('ix_codeinteraction_tracking_ts', table_name='codeinteraction')
+    op.drop_index('ix_chatinteraction_tracking_ts', table_name='chatinteraction')
+    op.drop_index('ix_eventlog_student_ts_covering', table_name='eventlog')
+    op.drop_index('ix_eventlog_student_session_ts', table_name='eventlog')
@@ -0,0 +1,33 @@
+"""Index bubblenode by (session_id, node_id)
+
+Revision ID: 0a7d3f6c9e21
+Revises: f6c9d2e5b874
+Create Date: 2025-07-16 13:48:55.902614
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0a7d3f6c9e21'
+down_revision = 'f6c9d2e5b874'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the newest row where a node_id was duplicated within a session
+    op.execute("""
+        DELETE FROM bubblenode b
+        USING bubblenode newer
+        WHERE newer.session_id = b.session_id
+          AND newer.node_id = b.node_id
+          AND newer.id > b.id
+    """)
+    op.drop_index('ix_bubblenode_node_id', table_name='bubblenode')
+    op.create_index('ix_bubble_session_node', 'bubblenode', ['session_id', 'node_id'], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_bubble_session_node', table_name='bubblenode')
+    op.create_index('ix_bubblenode_node_id', 'bubblenode', ['node_id'], unique=False)
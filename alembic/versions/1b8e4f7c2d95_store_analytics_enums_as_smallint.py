@@ -0,0 +1,77 @@
+"""Store analytics enums as smallint codes with lookup tables
+
+Revision ID: 1b8e4f7c2d95
+Revises: 0a6d3e5f8b21
+Create Date: 2025-07-08 09:17:46.302581
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b8e4f7c2d95'
+down_revision = '0a6d3e5f8b21'
+branch_labels = None
+depends_on = None
+
+
+# Enum member names in declaration order, frozen at this revision
+EVENT_TYPES = (
+    'SESSION_START', 'SESSION_COMPLETE', 'BUBBLE_ENTER', 'BUBBLE_SUCCESS', 'BUBBLE_FAIL',
+    'HINT_REQUESTED', 'CODE_EXECUTED', 'TUTOR_INTERACTION', 'CHAT_MESSAGE', 'CODE_CHANGE',
+    'IDLE_DETECTED', 'STRUGGLE_DETECTED', 'HELP_REQUESTED',
+)
+MESSAGE_TYPES = (
+    'STUDENT_QUESTION', 'AI_RESPONSE', 'HINT_REQUEST', 'CODE_QUESTION', 'CLARIFICATION', 'ENCOURAGEMENT',
+)
+STRUGGLE_SEVERITIES = ('LOW', 'MEDIUM', 'HIGH', 'CRITICAL')
+TRANSACTION_TYPES = ('EARNED', 'BONUS', 'SPENT', 'REFUNDED')
+
+# member names -> (postgres enum type, lookup table, [(table, column)])
+ENUM_COLUMNS = [
+    (EVENT_TYPES, 'eventtype', 'event_type', [('eventlog', 'event_type'), ('eventlog_staging', 'event_type')]),
+    (MESSAGE_TYPES, 'messagetype', 'message_type', [('chatinteraction', 'message_type')]),
+    (STRUGGLE_SEVERITIES, 'struggleseverity', 'struggle_severity', [('struggleanalysis', 'severity')]),
+    (TRANSACTION_TYPES, 'transactiontype', 'transaction_type', [('cointransaction', 'transaction_type')]),
+]
+
+
+def _codes(member_names):
+    """(code, name) pairs, matching SmallIntEnum's 1-based declaration order"""
+    return list(enumerate(member_names, start=1))
+
+
+def upgrade() -> None:
+    for member_names, pg_type, lookup_table, columns in ENUM_COLUMNS:
+        cases = ' '.join(f"WHEN '{name}' THEN {code}" for code, name in _codes(member_names))
+        for table, column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.SmallInteger(),
+                postgresql_using=f'(CASE {column}::text {cases} END)::smallint'
+            )
+        op.execute(f'DROP TYPE {pg_type}')
+
+        # Human-readable names for ad-hoc joins
+        lookup = op.create_table(
+            lookup_table,
+            sa.Column('id', sa.SmallInteger(), autoincrement=False, nullable=False),
+            sa.Column('name', sa.Text(), nullable=False),
+            sa.PrimaryKeyConstraint('id')
+        )
+        op.bulk_insert(lookup, [{'id': code, 'name': name} for code, name in _codes(member_names)])
+
+
+def downgrade() -> None:
+    for member_names, pg_type, lookup_table, columns in ENUM_COLUMNS:
+        names = [name for _, name in _codes(member_names)]
+        sa.Enum(*names, name=pg_type).create(op.get_bind())
+        cases = ' '.join(f"WHEN {code} THEN '{name}'" for code, name in _codes(member_names))
+        for table, column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.Enum(*names, name=pg_type),
+                postgresql_using=f'(CASE {column} {cases} END)::{pg_type}'
+            )
+        op.drop_table(lookup_table)
@@ -0,0 +1,40 @@
+"""Generate user full_name in Postgres with a trigram index
+
+Revision ID: 1c8e4a2f7b30
+Revises: 0a7d3f6c9e21
+Create Date: 2025-07-16 15:20:43.116829
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1c8e4a2f7b30'
+down_revision = '0a7d3f6c9e21'
+branch_labels = None
+depends_on = None
+
+# User.full_name generated-column expression, frozen at this revision
+FULL_NAME_SQL = (
+    "CASE WHEN coalesce(first_name, '') <> '' AND coalesce(last_name, '') <> '' "
+    "THEN first_name || ' ' || last_name ELSE username END"
+)
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.add_column(
+        'user',
+        sa.Column('full_name', sa.String(), sa.Computed(FULL_NAME_SQL, persisted=True), nullable=True)
+    )
+    op.create_index(
+        'user_fullname_trgm', 'user', ['full_name'],
+        postgresql_using='gin',
+        postgresql_ops={'full_name': 'gin_trgm_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('user_fullname_trgm', table_name='user')
+    op.drop_column('user', 'full_name')
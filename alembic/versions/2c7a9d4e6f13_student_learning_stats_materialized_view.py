@@ -0,0 +1,98 @@
+"""Move learning profile aggregates into the student_learning_stats materialized view
+
+Revision ID: 2c7a9d4e6f13
+Revises: 1b8e4f7c2d95
+Create Date: 2025-07-09 11:04:52.318240
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2c7a9d4e6f13'
+down_revision = '1b8e4f7c2d95'
+branch_labels = None
+depends_on = None
+
+
+# Aggregate columns dropped from studentlearningprofile in favour of the view
+AGGREGATE_COLUMNS = [
+    ('average_session_duration_minutes', sa.Float(), '0'),
+    ('average_response_time_ms', sa.Float(), '0'),
+    ('overall_success_rate', sa.Float(), '0'),
+    ('total_sessions', sa.Integer(), '0'),
+    ('total_study_time_hours', sa.Float(), '0'),
+    ('last_activity_date', sa.DateTime(), None),
+]
+
+REFRESH_JOB = 'refresh-student-learning-stats'
+
+
+def upgrade() -> None:
+    for column, _, _ in AGGREGATE_COLUMNS:
+        op.drop_column('studentlearningprofile', column)
+
+    op.execute("""
+        CREATE MATERIALIZED VIEW student_learning_stats AS
+        WITH sessions AS (
+            SELECT
+                student_id,
+                count(*) AS total_sessions,
+                sum(extract(epoch FROM coalesce(end_time, last_activity) - start_time)) AS total_seconds,
+                max(last_activity) AS last_activity_date
+            FROM studentsessiontracking
+            GROUP BY student_id
+        ),
+        events AS (
+            SELECT
+                student_id,
+                avg(response_time_ms) AS average_response_time_ms,
+                avg(success::int) FILTER (WHERE success IS NOT NULL) AS overall_success_rate
+            FROM eventlog
+            GROUP BY student_id
+        )
+        SELECT
+            coalesce(s.student_id, e.student_id) AS student_id,
+            coalesce(s.total_sessions, 0)::int AS total_sessions,
+            coalesce(s.total_seconds / 3600.0, 0)::float AS total_study_time_hours,
+            coalesce(s.total_seconds / 60.0 / nullif(s.total_sessions, 0), 0)::float AS average_session_duration_minutes,
+            s.last_activity_date,
+            coalesce(e.average_response_time_ms, 0)::float AS average_response_time_ms,
+            coalesce(e.overall_success_rate, 0)::float AS overall_success_rate
+        FROM sessions s
+        FULL JOIN events e ON e.student_id = s.student_id
+    """)
+    # REFRESH ... CONCURRENTLY requires a unique index
+    op.create_index('ix_student_learning_stats_student_id', 'student_learning_stats', ['student_id'], unique=True)
+
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.schedule(
+                    '{REFRESH_JOB}',
+                    '*/5 * * * *',
+                    'REFRESH MATERIALIZED VIEW CONCURRENTLY student_learning_stats'
+                );
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute(f"""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.unschedule('{REFRESH_JOB}');
+            END IF;
+        END $$;
+    """)
+    op.execute('DROP MATERIALIZED VIEW IF EXISTS student_learning_stats')
+
+    for column, column_type, default in AGGREGATE_COLUMNS:
+        op.add_column(
+            'studentlearningprofile',
+            sa.Column(column, column_type, nullable=default is None, server_default=default)
+        )
@@ -0,0 +1,35 @@
+"""Store user hashed_password as bytea
+
+Revision ID: 2d9f5b3a8c41
+Revises: 1c8e4a2f7b30
+Create Date: 2025-07-16 15:34:12.508217
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '2d9f5b3a8c41'
+down_revision = '1c8e4a2f7b30'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # bcrypt hashes are ASCII, so the UTF-8 bytes are the hash itself
+    op.alter_column(
+        'user', 'hashed_password',
+        type_=sa.LargeBinary(),
+        existing_nullable=False,
+        postgresql_using="convert_to(hashed_password, 'UTF8')"
+    )
+
+
+def downgrade() -> None:
+    op.alter_column(
+        'user', 'hashed_password',
+        type_=sa.String(),
+        existing_nullable=False,
+        postgresql_using="convert_from(hashed_password, 'UTF8')"
+    )
@@ -0,0 +1,44 @@
+"""Generate chatinteraction character_count and word_count in Postgres
+
+Revision ID: 3d5b8e1f7a24
+Revises: 2c7a9d4e6f13
+Create Date: 2025-07-09 15:37:18.902461
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3d5b8e1f7a24'
+down_revision = '2c7a9d4e6f13'
+branch_labels = None
+depends_on = None
+
+
+# Generated-column expressions, frozen at this revision
+GENERATED_COLUMNS = {
+    'character_count': "length(content)",
+    'word_count': (
+        r"CASE WHEN content ~ '^\s*$' THEN 0 "
+        r"ELSE array_length(regexp_split_to_array(regexp_replace(content, '^\s+|\s+$', '', 'g'), '\s+'), 1) END"
+    ),
+}
+
+
+def upgrade() -> None:
+    # Existing values are recomputed from content when the columns are re-added
+    for column, expression in GENERATED_COLUMNS.items():
+        op.drop_column('chatinteraction', column)
+        op.add_column(
+            'chatinteraction',
+            sa.Column(column, sa.Integer(), sa.Computed(expression, persisted=True), nullable=True)
+        )
+
+
+def downgrade() -> None:
+    for column, expression in GENERATED_COLUMNS.items():
+        op.drop_column('chatinteraction', column)
+        op.add_column('chatinteraction', sa.Column(column, sa.Integer(), nullable=True))
+        op.execute(f'UPDATE chatinteraction SET {column} = {expression}')
+        op.alter_column('chatinteraction', column, nullable=False)
@@ -0,0 +1,37 @@
+"""Add covering indexes for course session and enrollment lists
+
+Revision ID: 3e1a6c4d9b52
+Revises: 2d9f5b3a8c41
+Create Date: 2025-07-16 15:52:37.264091
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3e1a6c4d9b52'
+down_revision = '2d9f5b3a8c41'
+branch_labels = None
+depends_on = None
+
+# Columns the enrollment list read at this revision, carried in enrollment_list_idx
+ENROLLMENT_LIST_COLUMNS = (
+    "id", "student_id", "status", "progress_percentage", "completed_at", "last_accessed_at"
+)
+
+
+def upgrade() -> None:
+    op.create_index(
+        'enrollment_list_idx', 'courseenrollment', ['course_id', sa.text('enrolled_at DESC')],
+        postgresql_include=list(ENROLLMENT_LIST_COLUMNS)
+    )
+    op.create_index(
+        'session_list_idx', 'session', ['course_id', sa.text('start_time DESC')],
+        postgresql_include=['name', 'status']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('session_list_idx', table_name='session')
+    op.drop_index('enrollment_list_idx', table_name='courseenrollment')
@@ -0,0 +1,64 @@
+"""Add student_balance, maintained from cointransaction inserts
+
+Revision ID: 4e9c2a7b5d36
+Revises: 3d5b8e1f7a24
+Create Date: 2025-07-10 09:26:44.157903
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4e9c2a7b5d36'
+down_revision = '3d5b8e1f7a24'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('student_balance',
+    sa.Column('student_id', sa.Integer(), nullable=False),
+    sa.Column('balance', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('version', sa.Integer(), server_default='0', nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.ForeignKeyConstraint(['student_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('student_id')
+    )
+
+    # Statement-level so a batched insert touches each student's row once
+    op.execute("""
+        CREATE OR REPLACE FUNCTION maintain_student_balance()
+        RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO student_balance (student_id, balance, version, updated_at)
+            SELECT student_id, sum(amount), count(*), now()
+            FROM inserted
+            GROUP BY student_id
+            ON CONFLICT (student_id) DO UPDATE SET
+                balance = student_balance.balance + EXCLUDED.balance,
+                version = student_balance.version + EXCLUDED.version,
+                updated_at = EXCLUDED.updated_at;
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER cointransaction_student_balance
+        AFTER INSERT ON cointransaction
+        REFERENCING NEW TABLE AS inserted
+        FOR EACH STATEMENT EXECUTE FUNCTION maintain_student_balance();
+    """)
+
+    op.execute("""
+        INSERT INTO student_balance (student_id, balance, version, updated_at)
+        SELECT student_id, sum(amount), count(*), now()
+        FROM cointransaction
+        GROUP BY student_id
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS cointransaction_student_balance ON cointransaction')
+    op.execute('DROP FUNCTION IF EXISTS maintain_student_balance()')
+    op.drop_table('student_balance')
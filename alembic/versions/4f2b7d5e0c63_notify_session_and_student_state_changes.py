@@ -0,0 +1,55 @@
+"""Notify session and student state changes for cache invalidation
+
+Revision ID: 4f2b7d5e0c63
+Revises: 3e1a6c4d9b52
+Create Date: 2025-07-16 16:08:51.730412
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2b7d5e0c63'
+down_revision = '3e1a6c4d9b52'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Payloads are the cache key parts; identical notifications within one
+    # transaction are folded by Postgres
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_session_change()
+        RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('session_changes', OLD.id::text);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER session_notify
+        AFTER UPDATE OR DELETE ON session
+        FOR EACH ROW EXECUTE FUNCTION notify_session_change();
+    """)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_studentstate_change()
+        RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('studentstate_changes', OLD.student_id || ':' || OLD.session_id);
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER studentstate_notify
+        AFTER UPDATE OR DELETE ON studentstate
+        FOR EACH ROW EXECUTE FUNCTION notify_studentstate_change();
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS studentstate_notify ON studentstate')
+    op.execute('DROP FUNCTION IF EXISTS notify_studentstate_change()')
+    op.execute('DROP TRIGGER IF EXISTS session_notify ON session')
+    op.execute('DROP FUNCTION IF EXISTS notify_session_change()')
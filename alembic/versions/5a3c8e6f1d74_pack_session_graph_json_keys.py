@@ -0,0 +1,77 @@
+"""Store session.graph_json in the short-key packed layout
+
+Revision ID: 5a3c8e6f1d74
+Revises: 4f2b7d5e0c63
+Create Date: 2025-07-16 16:27:05.913648
+
+"""
+from alembic import op
+import orjson
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5a3c8e6f1d74'
+down_revision = '4f2b7d5e0c63'
+branch_labels = None
+depends_on = None
+
+# Short-key layout of app.utils.graph_packing, frozen at this revision:
+# full key -> stored key, per level of the document
+GRAPH_KEYS = {"start_node": "s", "nodes": "n", "edges": "e"}
+NODE_KEYS = {"id": "i", "type": "k", "title": "t", "x": "x", "y": "y", "width": "w", "height": "h", "color": "c"}
+EDGE_KEYS = {"from_node": "f", "to_node": "t", "label": "l", "condition": "c"}
+
+# Optional keys left out of stored rows while null
+NULLABLE_NODE_KEYS = ("color",)
+NULLABLE_EDGE_KEYS = ("label", "condition")
+
+
+def _pack_item(item, keys, nullable):
+    return {keys.get(key, key): value for key, value in item.items() if not (value is None and key in nullable)}
+
+
+def _unpack_item(item, keys, nullable):
+    unpacked = {keys.get(key, key): value for key, value in item.items()}
+    for key in nullable:
+        unpacked.setdefault(key, None)
+    return unpacked
+
+
+def pack_graph(graph):
+    packed = {GRAPH_KEYS.get(key, key): value for key, value in graph.items()}
+    if "nodes" in graph:
+        packed["n"] = [_pack_item(node, NODE_KEYS, NULLABLE_NODE_KEYS) for node in graph["nodes"]]
+    if "edges" in graph:
+        packed["e"] = [_pack_item(edge, EDGE_KEYS, NULLABLE_EDGE_KEYS) for edge in graph["edges"]]
+    return packed
+
+
+def unpack_graph(packed):
+    def inverse(keys):
+        return {v: k for k, v in keys.items()}
+
+    graph = {inverse(GRAPH_KEYS).get(key, key): value for key, value in packed.items()}
+    if "n" in packed:
+        graph["nodes"] = [_unpack_item(node, inverse(NODE_KEYS), NULLABLE_NODE_KEYS) for node in packed["n"]]
+    if "e" in packed:
+        graph["edges"] = [_unpack_item(edge, inverse(EDGE_KEYS), NULLABLE_EDGE_KEYS) for edge in packed["e"]]
+    return graph
+
+
+def _rewrite(where: str, convert) -> None:
+    connection = op.get_bind()
+    rows = connection.execute(sa.text(f"SELECT id, graph_json FROM session WHERE {where}")).all()
+    for session_id, graph_json in rows:
+        connection.execute(
+            sa.text("UPDATE session SET graph_json = CAST(:graph_json AS jsonb) WHERE id = :id"),
+            {"id": session_id, "graph_json": orjson.dumps(convert(graph_json)).decode()}
+        )
+
+
+def upgrade() -> None:
+    _rewrite("graph_json ? 'nodes'", pack_graph)
+
+
+def downgrade() -> None:
+    _rewrite("graph_json ? 'n'", unpack_graph)
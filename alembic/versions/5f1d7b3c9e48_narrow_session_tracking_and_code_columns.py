@@ -0,0 +1,80 @@
+"""Narrow session tracking and code interaction columns, add range checks
+
+Revision ID: 5f1d7b3c9e48
+Revises: 4e9c2a7b5d36
+Create Date: 2025-07-10 14:52:09.631874
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5f1d7b3c9e48'
+down_revision = '4e9c2a7b5d36'
+branch_labels = None
+depends_on = None
+
+
+# table -> columns narrowed from double precision to real
+REAL_COLUMNS = {
+    'studentsessiontracking': ['progress_percentage', 'success_rate', 'current_struggle_score'],
+    'codeinteraction': ['completion_progress'],
+}
+
+# Per-session counters that fit comfortably in a smallint
+SMALLINT_COLUMNS = ['hints_used', 'help_requests', 'struggle_alerts_triggered', 'consecutive_failures']
+
+# CodeInteractionType values in declaration order, frozen at this revision
+CODE_INTERACTION_TYPES = ('keypress', 'paste', 'delete', 'run', 'submit')
+
+CHECK_CONSTRAINTS = [
+    ('ck_studentsessiontracking_progress', 'studentsessiontracking', 'progress_percentage BETWEEN 0 AND 100'),
+    ('ck_studentsessiontracking_success_rate', 'studentsessiontracking', 'success_rate BETWEEN 0 AND 100'),
+    ('ck_studentsessiontracking_struggle', 'studentsessiontracking', 'current_struggle_score BETWEEN 0 AND 100'),
+    ('ck_codeinteraction_completion_progress', 'codeinteraction', 'completion_progress BETWEEN 0 AND 1'),
+]
+
+
+def _codes():
+    """(code, value) pairs, matching SmallIntEnum's 1-based declaration order"""
+    return list(enumerate(CODE_INTERACTION_TYPES, start=1))
+
+
+def upgrade() -> None:
+    for table, columns in REAL_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=sa.REAL(), existing_nullable=False)
+    for column in SMALLINT_COLUMNS:
+        op.alter_column('studentsessiontracking', column, type_=sa.SmallInteger(), existing_nullable=False)
+
+    # Unrecognised legacy values fall back to keypress
+    cases = ' '.join(f"WHEN '{value}' THEN {code}" for code, value in _codes())
+    op.alter_column(
+        'codeinteraction', 'interaction_type',
+        type_=sa.SmallInteger(),
+        existing_nullable=False,
+        postgresql_using=f'(CASE interaction_type {cases} ELSE 1 END)::smallint'
+    )
+
+    for name, table, condition in CHECK_CONSTRAINTS:
+        op.create_check_constraint(name, table, condition)
+
+
+def downgrade() -> None:
+    for name, table, _ in CHECK_CONSTRAINTS:
+        op.drop_constraint(name, table, type_='check')
+
+    cases = ' '.join(f"WHEN {code} THEN '{value}'" for code, value in _codes())
+    op.alter_column(
+        'codeinteraction', 'interaction_type',
+        type_=sa.String(),
+        existing_nullable=False,
+        postgresql_using=f'(CASE interaction_type {cases} END)'
+    )
+
+    for column in SMALLINT_COLUMNS:
+        op.alter_column('studentsessiontracking', column, type_=sa.Integer(), existing_nullable=False)
+    for table, columns in REAL_COLUMNS.items():
+        for column in columns:
+            op.alter_column(table, column, type_=sa.Float(), existing_nullable=False)
@@ -0,0 +1,41 @@
+"""Stamp analytics timestamps with a database default
+
+Revision ID: 6a3e9c5d1b72
+Revises: 5f1d7b3c9e48
+Create Date: 2025-07-11 10:08:23.745196
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6a3e9c5d1b72'
+down_revision = '5f1d7b3c9e48'
+branch_labels = None
+depends_on = None
+
+
+# Naive UTC, matching the datetime.utcnow() values already stored
+UTC_NOW = sa.text("timezone('utc', now())")
+
+TIMESTAMP_COLUMNS = [
+    ('eventlog', 'timestamp'),
+    # COPY omits the timestamp, so staged rows are stamped here
+    ('eventlog_staging', 'timestamp'),
+    ('chatinteraction', 'timestamp'),
+    ('codeinteraction', 'timestamp'),
+    ('codesubmission', 'timestamp'),
+    ('struggleanalysis', 'timestamp'),
+    ('cointransaction', 'created_at'),
+]
+
+
+def upgrade() -> None:
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=UTC_NOW, existing_type=sa.DateTime(), existing_nullable=False)
+
+
+def downgrade() -> None:
+    for table, column in TIMESTAMP_COLUMNS:
+        op.alter_column(table, column, server_default=None, existing_type=sa.DateTime(), existing_nullable=False)
@@ -0,0 +1,44 @@
+"""Add session_edge table materialized from session graphs
+
+Revision ID: 6b4d9f7a2e85
+Revises: 5a3c8e6f1d74
+Create Date: 2025-07-16 16:49:18.402736
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6b4d9f7a2e85'
+down_revision = '5a3c8e6f1d74'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('session_edge',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('session_id', sa.Integer(), nullable=False),
+    sa.Column('from_node', sa.String(), nullable=False),
+    sa.Column('to_node', sa.String(), nullable=False),
+    sa.ForeignKeyConstraint(['session_id'], ['session.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_session_edge_from', 'session_edge', ['session_id', 'from_node'])
+    op.create_index('ix_session_edge_to', 'session_edge', ['session_id', 'to_node'])
+
+    # Backfill from the packed graph layout (edges under "e", endpoints "f"/"t")
+    op.execute("""
+        INSERT INTO session_edge (session_id, from_node, to_node)
+        SELECT s.id, e.edge->>'f', e.edge->>'t'
+        FROM session s
+        CROSS JOIN LATERAL jsonb_array_elements(s.graph_json->'e') WITH ORDINALITY AS e(edge, ord)
+        ORDER BY s.id, e.ord
+    """)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_session_edge_to', table_name='session_edge')
+    op.drop_index('ix_session_edge_from', table_name='session_edge')
+    op.drop_table('session_edge')
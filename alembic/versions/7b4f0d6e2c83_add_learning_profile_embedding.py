@@ -0,0 +1,39 @@
+"""Add pgvector embedding to studentlearningprofile
+
+Revision ID: 7b4f0d6e2c83
+Revises: 6a3e9c5d1b72
+Create Date: 2025-07-11 16:31:40.582917
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from pgvector.sqlalchemy import Vector
+
+
+# revision identifiers, used by Alembic.
+revision = '7b4f0d6e2c83'
+down_revision = '6a3e9c5d1b72'
+branch_labels = None
+depends_on = None
+
+# Embedding width at this revision
+PROFILE_EMBEDDING_DIMENSIONS = 384
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS vector')
+    op.add_column(
+        'studentlearningprofile',
+        sa.Column('embedding', Vector(PROFILE_EMBEDDING_DIMENSIONS), nullable=True)
+    )
+    op.create_index(
+        'ix_studentlearningprofile_embedding', 'studentlearningprofile', ['embedding'],
+        postgresql_using='ivfflat',
+        postgresql_with={'lists': 100},
+        postgresql_ops={'embedding': 'vector_cosine_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_studentlearningprofile_embedding', table_name='studentlearningprofile')
+    op.drop_column('studentlearningprofile', 'embedding')
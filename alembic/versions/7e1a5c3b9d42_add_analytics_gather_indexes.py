@@ -0,0 +1,41 @@
+"""Index student trackings by start time and struggle analyses by tracking
+
+Revision ID: 7e1a5c3b9d42
+Revises: 6b4d9f7a2e85
+Create Date: 2025-07-17 11:12:45.208317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7e1a5c3b9d42'
+down_revision = '6b4d9f7a2e85'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_studentsessiontracking_student_start', 'studentsessiontracking',
+            ['student_id', sa.text('start_time DESC')],
+            postgresql_concurrently=True
+        )
+        op.create_index(
+            'ix_struggleanalysis_tracking', 'struggleanalysis', ['session_tracking_id'],
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index(
+            'ix_struggleanalysis_tracking', table_name='struggleanalysis', postgresql_concurrently=True
+        )
+        op.drop_index(
+            'ix_studentsessiontracking_student_start', table_name='studentsessiontracking',
+            postgresql_concurrently=True
+        )
@@ -0,0 +1,52 @@
+"""Move codeinteraction code content into code_interaction_blob
+
+Revision ID: 8c5a1e7f3d94
+Revises: 7b4f0d6e2c83
+Create Date: 2025-07-14 09:45:12.093571
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c5a1e7f3d94'
+down_revision = '7b4f0d6e2c83'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('code_interaction_blob',
+    sa.Column('interaction_id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('code_snapshot_zst', sa.LargeBinary(), nullable=True),
+    sa.Column('code_diff', sa.String(length=2000), nullable=True),
+    sa.PrimaryKeyConstraint('interaction_id')
+    )
+    op.execute("""
+        INSERT INTO code_interaction_blob (interaction_id, code_snapshot_zst, code_diff)
+        SELECT id, code_snapshot_zst, code_diff FROM codeinteraction
+    """)
+    op.drop_column('codeinteraction', 'code_snapshot_zst')
+    op.drop_column('codeinteraction', 'code_diff')
+
+    op.drop_index('ix_codeinteraction_tracking_ts', table_name='codeinteraction')
+    op.create_index(
+        'ix_codeinteraction_tracking_ts', 'codeinteraction', ['session_tracking_id', 'timestamp'],
+        postgresql_include=['characters_added', 'execution_success']
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_codeinteraction_tracking_ts', table_name='codeinteraction')
+    op.create_index('ix_codeinteraction_tracking_ts', 'codeinteraction', ['session_tracking_id', 'timestamp'])
+
+    op.add_column('codeinteraction', sa.Column('code_snapshot_zst', sa.LargeBinary(), nullable=True))
+    op.add_column('codeinteraction', sa.Column('code_diff', sa.String(length=2000), nullable=True))
+    op.execute("""
+        UPDATE codeinteraction c
+        SET code_snapshot_zst = b.code_snapshot_zst, code_diff = b.code_diff
+        FROM code_interaction_blob b
+        WHERE b.interaction_id = c.id
+    """)
+    op.drop_table('code_interaction_blob')
@@ -0,0 +1,99 @@
+"""Count only code submissions in the session tracking counters trigger
+
+Revision ID: 8e2c5a7f1d36
+Revises: 7e1a5c3b9d42
+Create Date: 2025-07-18 10:05:31.642917
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '8e2c5a7f1d36'
+down_revision = '7e1a5c3b9d42'
+branch_labels = None
+depends_on = None
+
+# eventlog.event_type SMALLINT code of EventType.CODE_EXECUTED, frozen at this revision
+CODE_EXECUTED = 7
+
+
+def upgrade() -> None:
+    # Only code submissions move the counters, so average_response_time_ms stays an
+    # execution time (tutor events carry AI latency), and only the student's latest
+    # tracking row for the session is updated
+    op.execute("""
+        CREATE OR REPLACE FUNCTION maintain_session_tracking_counters()
+        RETURNS trigger AS $$
+        BEGIN
+            UPDATE studentsessiontracking SET
+                total_interactions = total_interactions + 1,
+                average_response_time_ms = CASE
+                    WHEN NEW.response_time_ms IS NULL THEN average_response_time_ms
+                    ELSE (average_response_time_ms * total_interactions + NEW.response_time_ms)
+                         / (total_interactions + 1)
+                END,
+                consecutive_failures = CASE NEW.success
+                    WHEN true THEN 0
+                    WHEN false THEN consecutive_failures + 1
+                    ELSE consecutive_failures
+                END,
+                last_activity = greatest(last_activity, NEW."timestamp")
+            WHERE id = (
+                SELECT id FROM studentsessiontracking
+                WHERE session_id = NEW.session_id
+                  AND student_id = NEW.student_id
+                ORDER BY start_time DESC, id DESC
+                LIMIT 1
+            );
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    # Filter in the trigger definition so other event types never call the function
+    op.execute('DROP TRIGGER IF EXISTS eventlog_session_tracking_counters ON eventlog')
+    op.execute(f"""
+        CREATE TRIGGER eventlog_session_tracking_counters
+        AFTER INSERT ON eventlog
+        FOR EACH ROW
+        WHEN (NEW.event_type = {CODE_EXECUTED} AND NEW.session_id IS NOT NULL)
+        EXECUTE FUNCTION maintain_session_tracking_counters();
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS eventlog_session_tracking_counters ON eventlog')
+    op.execute("""
+        CREATE OR REPLACE FUNCTION maintain_session_tracking_counters()
+        RETURNS trigger AS $$
+        BEGIN
+            IF NEW.session_id IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            UPDATE studentsessiontracking SET
+                total_interactions = total_interactions + 1,
+                average_response_time_ms = CASE
+                    WHEN NEW.response_time_ms IS NULL THEN average_response_time_ms
+                    ELSE (average_response_time_ms * total_interactions + NEW.response_time_ms)
+                         / (total_interactions + 1)
+                END,
+                consecutive_failures = CASE NEW.success
+                    WHEN true THEN 0
+                    WHEN false THEN consecutive_failures + 1
+                    ELSE consecutive_failures
+                END,
+                last_activity = greatest(last_activity, NEW."timestamp")
+            WHERE session_id = NEW.session_id
+              AND student_id = NEW.student_id;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER eventlog_session_tracking_counters
+        AFTER INSERT ON eventlog
+        FOR EACH ROW EXECUTE FUNCTION maintain_session_tracking_counters();
+    """)
@@ -0,0 +1,43 @@
+"""Store session.graph_json as jsonb with a GIN index
+
+Revision ID: 9d2b6f4a8e15
+Revises: 8c5a1e7f3d94
+Create Date: 2025-07-14 15:20:37.418062
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = '9d2b6f4a8e15'
+down_revision = '8c5a1e7f3d94'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.alter_column(
+        'session', 'graph_json',
+        type_=postgresql.JSONB(),
+        postgresql_using='graph_json::jsonb'
+    )
+    # CONCURRENTLY cannot run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'session_graph_json_gin', 'session', ['graph_json'],
+            postgresql_using='gin',
+            postgresql_ops={'graph_json': 'jsonb_path_ops'},
+            postgresql_concurrently=True
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('session_graph_json_gin', table_name='session', postgresql_concurrently=True)
+    op.alter_column(
+        'session', 'graph_json',
+        type_=sa.JSON(),
+        postgresql_using='graph_json::json'
+    )
@@ -0,0 +1,123 @@
+"""Partition eventlog and codeinteraction by timestamp
+
+Revision ID: a3c1e9f27b54
+Revises: 4f74cb7aa29a
+Create Date: 2025-07-02 10:12:31.504118
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'a3c1e9f27b54'
+down_revision = '4f74cb7aa29a'
+branch_labels = None
+depends_on = None
+
+
+# table -> foreign keys to restore on the rebuilt table
+PARTITIONED_TABLES = {
+    'eventlog': [
+        ('session_id', 'session'),
+        ('student_id', 'user'),
+    ],
+    'codeinteraction': [
+        ('session_id', 'session'),
+        ('session_tracking_id', 'studentsessiontracking'),
+        ('student_id', 'user'),
+    ],
+}
+
+# Months of partitions created ahead of the current one
+MONTHS_AHEAD = 3
+
+
+def _rebuild(table: str, partitioned: bool) -> None:
+    """Recreate `table` (partitioned or plain) from its current contents"""
+    legacy = f'{table}_legacy'
+    op.execute(f'ALTER TABLE {table} RENAME TO {legacy}')
+    op.execute(f'ALTER TABLE {legacy} RENAME CONSTRAINT {table}_pkey TO {legacy}_pkey')
+
+    partition_clause = ' PARTITION BY RANGE ("timestamp")' if partitioned else ''
+    op.execute(f'CREATE TABLE {table} (LIKE {legacy} INCLUDING DEFAULTS){partition_clause}')
+
+    # Partitioned tables require the partition key in every unique constraint
+    primary_key = '(id, "timestamp")' if partitioned else '(id)'
+    op.execute(f'ALTER TABLE {table} ADD CONSTRAINT {table}_pkey PRIMARY KEY {primary_key}')
+    for column, referenced in PARTITIONED_TABLES[table]:
+        op.create_foreign_key(None, table, referenced, [column], ['id'])
+
+    # Keep the id sequence alive when the legacy table is dropped
+    op.execute(f'ALTER SEQUENCE {table}_id_seq OWNED BY {table}.id')
+
+    if partitioned:
+        op.execute(f"""
+            DO $$
+            DECLARE
+                month_start date;
+            BEGIN
+                SELECT date_trunc('month', coalesce(min("timestamp"), now()))::date
+                  INTO month_start FROM {legacy};
+                WHILE month_start <= date_trunc('month', now() + interval '{MONTHS_AHEAD} months') LOOP
+                    PERFORM create_monthly_partition('{table}', month_start);
+                    month_start := (month_start + interval '1 month')::date;
+                END LOOP;
+            END $$;
+        """)
+        op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+
+    op.execute(f'INSERT INTO {table} SELECT * FROM {legacy}')
+    op.execute(f'DROP TABLE {legacy}')
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION create_monthly_partition(parent text, month_start date)
+        RETURNS void AS $$
+        BEGIN
+            EXECUTE format(
+                'CREATE TABLE IF NOT EXISTS %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                parent || '_' || to_char(month_start, 'YYYY_MM'),
+                parent,
+                month_start,
+                (month_start + interval '1 month')::date
+            );
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+
+    for table in PARTITIONED_TABLES:
+        _rebuild(table, partitioned=True)
+
+    # Pre-create next month's partitions when pg_cron is available
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.schedule(
+                    'precreate-analytics-partitions',
+                    '0 0 20 * *',
+                    $job$
+                    SELECT create_monthly_partition('eventlog', date_trunc('month', now() + interval '1 month')::date);
+                    SELECT create_monthly_partition('codeinteraction', date_trunc('month', now() + interval '1 month')::date);
+                    $job$
+                );
+            END IF;
+        END $$;
+    """)
+
+
+def downgrade() -> None:
+    op.execute("""
+        DO $$
+        BEGIN
+            IF EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron') THEN
+                PERFORM cron.unschedule('precreate-analytics-partitions');
+            END IF;
+        END $$;
+    """)
+
+    for table in PARTITIONED_TABLES:
+        _rebuild(table, partitioned=False)
+
+    op.execute('DROP FUNCTION IF EXISTS create_monthly_partition(text, date)')
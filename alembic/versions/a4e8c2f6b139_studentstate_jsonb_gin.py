@@ -0,0 +1,48 @@
+"""Store studentstate progress columns as jsonb with GIN indexes
+
+Revision ID: a4e8c2f6b139
+Revises: 9d2b6f4a8e15
+Create Date: 2025-07-15 10:03:55.276481
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'a4e8c2f6b139'
+down_revision = '9d2b6f4a8e15'
+branch_labels = None
+depends_on = None
+
+
+# column -> GIN index name
+JSONB_COLUMNS = {
+    'completed_nodes': 'studentstate_completed_gin',
+    'failed_attempts': 'studentstate_failed_gin',
+}
+
+
+def upgrade() -> None:
+    for column, index in JSONB_COLUMNS.items():
+        op.alter_column(
+            'studentstate', column,
+            type_=postgresql.JSONB(),
+            postgresql_using=f'{column}::jsonb'
+        )
+        op.create_index(
+            index, 'studentstate', [column],
+            postgresql_using='gin',
+            postgresql_ops={column: 'jsonb_path_ops'}
+        )
+
+
+def downgrade() -> None:
+    for column, index in JSONB_COLUMNS.items():
+        op.drop_index(index, table_name='studentstate')
+        op.alter_column(
+            'studentstate', column,
+            type_=sa.JSON(),
+            postgresql_using=f'{column}::json'
+        )
@@ -0,0 +1,33 @@
+"""Make studentstate unique per student and session
+
+Revision ID: b6f1a9d3c527
+Revises: a4e8c2f6b139
+Create Date: 2025-07-15 14:41:18.860359
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6f1a9d3c527'
+down_revision = 'a4e8c2f6b139'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # Keep the most recently active state where duplicates exist
+    op.execute("""
+        DELETE FROM studentstate s
+        USING studentstate newer
+        WHERE newer.student_id = s.student_id
+          AND newer.session_id = s.session_id
+          AND (newer.last_activity_at, newer.id) > (s.last_activity_at, s.id)
+    """)
+    op.create_unique_constraint(
+        'uq_studentstate_student_session', 'studentstate', ['student_id', 'session_id']
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('uq_studentstate_student_session', 'studentstate', type_='unique')
@@ -0,0 +1,56 @@
+"""Maintain studentsessiontracking counters from eventlog inserts
+
+Revision ID: b7d2f4a81c6e
+Revises: a3c1e9f27b54
+Create Date: 2025-07-03 09:41:07.218634
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = 'b7d2f4a81c6e'
+down_revision = 'a3c1e9f27b54'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.execute("""
+        CREATE OR REPLACE FUNCTION maintain_session_tracking_counters()
+        RETURNS trigger AS $$
+        BEGIN
+            IF NEW.session_id IS NULL THEN
+                RETURN NULL;
+            END IF;
+
+            UPDATE studentsessiontracking SET
+                total_interactions = total_interactions + 1,
+                average_response_time_ms = CASE
+                    WHEN NEW.response_time_ms IS NULL THEN average_response_time_ms
+                    ELSE (average_response_time_ms * total_interactions + NEW.response_time_ms)
+                         / (total_interactions + 1)
+                END,
+                consecutive_failures = CASE NEW.success
+                    WHEN true THEN 0
+                    WHEN false THEN consecutive_failures + 1
+                    ELSE consecutive_failures
+                END,
+                last_activity = greatest(last_activity, NEW."timestamp")
+            WHERE session_id = NEW.session_id
+              AND student_id = NEW.student_id;
+
+            RETURN NULL;
+        END;
+        $$ LANGUAGE plpgsql;
+    """)
+    op.execute("""
+        CREATE TRIGGER eventlog_session_tracking_counters
+        AFTER INSERT ON eventlog
+        FOR EACH ROW EXECUTE FUNCTION maintain_session_tracking_counters();
+    """)
+
+
+def downgrade() -> None:
+    op.execute('DROP TRIGGER IF EXISTS eventlog_session_tracking_counters ON eventlog')
+    op.execute('DROP FUNCTION IF EXISTS maintain_session_tracking_counters()')
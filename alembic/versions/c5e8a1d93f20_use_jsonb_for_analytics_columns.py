@@ -0,0 +1,63 @@
+"""Use jsonb for analytics JSON columns
+
+Revision ID: c5e8a1d93f20
+Revises: b7d2f4a81c6e
+Create Date: 2025-07-03 15:02:44.871390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c5e8a1d93f20'
+down_revision = 'b7d2f4a81c6e'
+branch_labels = None
+depends_on = None
+
+
+JSON_COLUMNS = {
+    'eventlog': ['payload'],
+    'studentsessiontracking': [
+        'nodes_completed', 'nodes_attempted', 'learning_style_indicators', 'engagement_patterns'
+    ],
+    'chatinteraction': ['additional_metadata'],
+    'codeinteraction': ['syntax_errors', 'additional_metadata'],
+    'codesubmission': [
+        'test_results', 'compilation_errors', 'runtime_errors', 'logic_errors', 'suggested_improvements'
+    ],
+    'struggleanalysis': ['indicators', 'recommendations'],
+    'studentlearningprofile': [
+        'common_struggle_areas', 'struggle_recovery_methods', 'motivation_drivers',
+        'engagement_triggers', 'ai_generated_insights', 'personalized_recommendations'
+    ],
+    'cointransaction': ['transaction_metadata'],
+}
+
+
+def upgrade() -> None:
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=postgresql.JSONB(),
+                existing_type=sa.JSON(),
+                postgresql_using=f'{column}::jsonb'
+            )
+    op.create_index(
+        'eventlog_payload_gin', 'eventlog', ['payload'],
+        postgresql_using='gin', postgresql_ops={'payload': 'jsonb_path_ops'}
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('eventlog_payload_gin', table_name='eventlog')
+    for table, columns in JSON_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.JSON(),
+                existing_type=postgresql.JSONB(),
+                postgresql_using=f'{column}::json'
+            )
@@ -0,0 +1,48 @@
+"""Add precomputed graph navigation index to session
+
+Revision ID: c7d2e5a8f416
+Revises: b6f1a9d3c527
+Create Date: 2025-07-15 16:02:37.214905
+
+"""
+from alembic import op
+import orjson
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d2e5a8f416'
+down_revision = 'b6f1a9d3c527'
+branch_labels = None
+depends_on = None
+
+
+def _build_graph_index(graph_json):
+    """Session.build_graph_index as of this revision: {"start", "adj", "types"}"""
+    graph_json = graph_json or {}
+    nodes = graph_json.get("nodes", [])
+    adjacency = {node["id"]: [] for node in nodes}
+    for edge in graph_json.get("edges", []):
+        adjacency.setdefault(edge["from_node"], []).append(edge["to_node"])
+    return {
+        "start": graph_json.get("start_node"),
+        "adj": adjacency,
+        "types": {node["id"]: node.get("type") for node in nodes},
+    }
+
+
+def upgrade() -> None:
+    op.add_column('session', sa.Column('graph_index_json', postgresql.JSONB(), nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(sa.text("SELECT id, graph_json FROM session")).all()
+    for session_id, graph_json in rows:
+        connection.execute(
+            sa.text("UPDATE session SET graph_index_json = CAST(:graph_index AS jsonb) WHERE id = :id"),
+            {"id": session_id, "graph_index": orjson.dumps(_build_graph_index(graph_json)).decode()}
+        )
+
+
+def downgrade() -> None:
+    op.drop_column('session', 'graph_index_json')
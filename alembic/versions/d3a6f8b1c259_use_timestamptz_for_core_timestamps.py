@@ -0,0 +1,48 @@
+"""Use TIMESTAMPTZ with server defaults for core model timestamps
+
+Revision ID: d3a6f8b1c259
+Revises: c7d2e5a8f416
+Create Date: 2025-07-16 09:12:48.530271
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd3a6f8b1c259'
+down_revision = 'c7d2e5a8f416'
+branch_labels = None
+depends_on = None
+
+
+# table -> (columns converted to TIMESTAMPTZ, of which defaulted to now())
+TIMESTAMP_COLUMNS = {
+    'session': (('start_time', 'end_time', 'created_at', 'updated_at', 'published_at'), ('created_at',)),
+    'bubblenode': (('created_at', 'updated_at'), ('created_at',)),
+    'studentstate': (('started_at', 'last_activity_at', 'completed_at'), ('started_at', 'last_activity_at')),
+    'user': (('created_at', 'updated_at', 'last_login'), ('created_at',)),
+}
+
+
+def upgrade() -> None:
+    # Existing values were written as naive UTC
+    for table, (columns, defaulted) in TIMESTAMP_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.DateTime(timezone=True),
+                postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                server_default=sa.text('now()') if column in defaulted else None,
+            )
+
+
+def downgrade() -> None:
+    for table, (columns, defaulted) in TIMESTAMP_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=sa.DateTime(),
+                postgresql_using=f"{column} AT TIME ZONE 'UTC'",
+                server_default=None,
+            )
@@ -0,0 +1,66 @@
+"""Compress codeinteraction snapshots with zstd
+
+Revision ID: d91b6c2e4a7f
+Revises: c5e8a1d93f20
+Create Date: 2025-07-04 11:26:58.306142
+
+"""
+from alembic import op
+import sqlalchemy as sa
+import zstandard
+
+
+# revision identifiers, used by Alembic.
+revision = 'd91b6c2e4a7f'
+down_revision = 'c5e8a1d93f20'
+branch_labels = None
+depends_on = None
+
+BATCH_SIZE = 1000
+
+# zstd level used for snapshots at this revision
+COMPRESSION_LEVEL = 3
+
+
+def _compress(code: str) -> bytes:
+    return zstandard.ZstdCompressor(level=COMPRESSION_LEVEL).compress(code.encode())
+
+
+def _decompress(data: bytes) -> str:
+    return zstandard.ZstdDecompressor().decompress(data).decode()
+
+
+def _convert(source: str, target: str, transform) -> None:
+    """Rewrite every row's `source` column into `target`, in keyset-paginated batches"""
+    bind = op.get_bind()
+    last_key = None
+    while True:
+        query = f'SELECT id, "timestamp", {source} FROM codeinteraction WHERE {source} IS NOT NULL'
+        params = {}
+        if last_key is not None:
+            query += ' AND (id, "timestamp") > (:id, :ts)'
+            params = {'id': last_key[0], 'ts': last_key[1]}
+        query += f' ORDER BY id, "timestamp" LIMIT {BATCH_SIZE}'
+
+        rows = bind.execute(sa.text(query), params).fetchall()
+        if not rows:
+            break
+        bind.execute(
+            sa.text(f'UPDATE codeinteraction SET {target} = :value WHERE id = :id AND "timestamp" = :ts'),
+            [{'value': transform(row[2]), 'id': row[0], 'ts': row[1]} for row in rows]
+        )
+        last_key = (rows[-1][0], rows[-1][1])
+
+
+def upgrade() -> None:
+    op.add_column('codeinteraction', sa.Column('code_snapshot_zst', sa.LargeBinary(), nullable=True))
+    _convert('code_snapshot', 'code_snapshot_zst', _compress)
+    op.drop_column('codeinteraction', 'code_snapshot')
+
+
+def downgrade() -> None:
+    op.add_column('codeinteraction', sa.Column('code_snapshot', sa.String(length=10000), nullable=True))
+    _convert('code_snapshot_zst', 'code_snapshot', _decompress)
+    op.execute("UPDATE codeinteraction SET code_snapshot = '' WHERE code_snapshot IS NULL")
+    op.alter_column('codeinteraction', 'code_snapshot', nullable=False)
+    op.drop_column('codeinteraction', 'code_snapshot_zst')
@@ -0,0 +1,34 @@
+"""Add unlogged eventlog staging table and widen eventlog ids
+
+Revision ID: e3f7a9b05c18
+Revises: d91b6c2e4a7f
+Create Date: 2025-07-04 16:48:12.590473
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e3f7a9b05c18'
+down_revision = 'd91b6c2e4a7f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # The telemetry firehose would exhaust a 32-bit id space
+    op.execute('ALTER SEQUENCE eventlog_id_seq AS bigint')
+    op.alter_column('eventlog', 'id', type_=sa.BigInteger(), existing_type=sa.Integer())
+
+    # Bulk COPY lands here without WAL; rows are moved into eventlog in batches.
+    # Shares eventlog's id sequence, so ids are final once staged.
+    op.execute('CREATE UNLOGGED TABLE eventlog_staging (LIKE eventlog INCLUDING DEFAULTS)')
+
+
+def downgrade() -> None:
+    # Don't lose rows that were staged but not yet moved
+    op.execute('INSERT INTO eventlog SELECT * FROM eventlog_staging')
+    op.execute('DROP TABLE eventlog_staging')
+    op.alter_column('eventlog', 'id', type_=sa.Integer(), existing_type=sa.BigInteger())
+    op.execute('ALTER SEQUENCE eventlog_id_seq AS integer')
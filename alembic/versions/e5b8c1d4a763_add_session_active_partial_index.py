@@ -0,0 +1,27 @@
+"""Add partial index for active published sessions
+
+Revision ID: e5b8c1d4a763
+Revises: d3a6f8b1c259
+Create Date: 2025-07-16 10:05:22.417390
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e5b8c1d4a763'
+down_revision = 'd3a6f8b1c259'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        'session_active_idx', 'session', ['start_time', 'end_time'],
+        postgresql_where=sa.text("status = 'PUBLISHED'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('session_active_idx', table_name='session')
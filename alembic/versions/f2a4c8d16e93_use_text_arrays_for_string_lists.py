@@ -0,0 +1,65 @@
+"""Use text[] for list-of-string analytics columns
+
+Revision ID: f2a4c8d16e93
+Revises: e3f7a9b05c18
+Create Date: 2025-07-07 10:05:39.114827
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f2a4c8d16e93'
+down_revision = 'e3f7a9b05c18'
+branch_labels = None
+depends_on = None
+
+
+ARRAY_COLUMNS = {
+    'studentsessiontracking': ['nodes_completed', 'nodes_attempted'],
+    'studentlearningprofile': [
+        'common_struggle_areas', 'struggle_recovery_methods', 'motivation_drivers',
+        'engagement_triggers', 'personalized_recommendations'
+    ],
+    'codeinteraction': ['syntax_errors'],
+    'codesubmission': ['compilation_errors', 'runtime_errors', 'logic_errors', 'suggested_improvements'],
+}
+
+
+def upgrade() -> None:
+    # ALTER ... USING cannot contain a subquery, so unnest through a helper function
+    op.execute("""
+        CREATE FUNCTION pg_temp.jsonb_to_text_array(value jsonb) RETURNS text[]
+        LANGUAGE sql IMMUTABLE STRICT AS $$
+            SELECT CASE jsonb_typeof(value)
+                WHEN 'array' THEN ARRAY(SELECT jsonb_array_elements_text(value))
+                ELSE '{}'::text[]
+            END
+        $$
+    """)
+    for table, columns in ARRAY_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=postgresql.ARRAY(sa.String()),
+                existing_type=postgresql.JSONB(),
+                postgresql_using=f'pg_temp.jsonb_to_text_array({column})'
+            )
+    op.create_index(
+        'studentsessiontracking_nodes_completed_gin', 'studentsessiontracking', ['nodes_completed'],
+        postgresql_using='gin'
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('studentsessiontracking_nodes_completed_gin', table_name='studentsessiontracking')
+    for table, columns in ARRAY_COLUMNS.items():
+        for column in columns:
+            op.alter_column(
+                table, column,
+                type_=postgresql.JSONB(),
+                existing_type=postgresql.ARRAY(sa.String()),
+                postgresql_using=f'to_jsonb({column})'
+            )
@@ -0,0 +1,51 @@
+"""Use JSONB with GIN indexes for bubblenode task metadata
+
+Revision ID: f6c9d2e5b874
+Revises: e5b8c1d4a763
+Create Date: 2025-07-16 11:27:06.381542
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'f6c9d2e5b874'
+down_revision = 'e5b8c1d4a763'
+branch_labels = None
+depends_on = None
+
+
+# column -> GIN index name (None: converted but not indexed)
+JSONB_COLUMNS = {
+    'test_cases': 'bubblenode_testcases_gin',
+    'hints': 'bubblenode_hints_gin',
+    'bonus_conditions': None,
+}
+
+
+def upgrade() -> None:
+    for column, index in JSONB_COLUMNS.items():
+        op.alter_column(
+            'bubblenode', column,
+            type_=postgresql.JSONB(),
+            postgresql_using=f'{column}::jsonb'
+        )
+        if index:
+            op.create_index(
+                index, 'bubblenode', [column],
+                postgresql_using='gin',
+                postgresql_ops={column: 'jsonb_path_ops'}
+            )
+
+
+def downgrade() -> None:
+    for column, index in JSONB_COLUMNS.items():
+        if index:
+            op.drop_index(index, table_name='bubblenode')
+        op.alter_column(
+            'bubblenode', column,
+            type_=sa.JSON(),
+            postgresql_using=f'{column}::json'
+        )
@@ -6,13 +6,12 @@ import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query, status
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session
 from pydantic import BaseModel
 
 from app.core.database import get_db
-from app.core.security import get_current_user, require_role
-from app.models.user import User
+from app.core.security import AuthIdentity, get_current_user, require_role
 from app.services.ai_analytics_service import AIAnalyticsService, LearningInsight, StudentRiskAssessment
 
 logger = logging.getLogger(__name__)
@@ -75,7 +74,7 @@ async def get_student_insights(
     days: Optional[int] = Query(30, description="Analysis period in days", ge=1, le=365),
     insight_types: Optional[List[str]] = Query(None, description="Filter by insight types"),
     min_confidence: Optional[float] = Query(0.7, description="Minimum confidence threshold", ge=0.0, le=1.0),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -122,7 +121,7 @@ async def get_student_insights(
                 title=insight.title,
                 description=insight.description,
                 confidence=insight.confidence,
-                priority=insight.priority,
+                priority=insight.priority.label,
                 action_items=insight.action_items,
                 supporting_data=insight.supporting_data
             )
@@ -141,7 +140,7 @@ async def get_student_insights(
 async def assess_student_risk(
     student_id: int,
     session_id: Optional[int] = Query(None, description="Specific session to analyze"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -173,7 +172,7 @@ async def assess_student_risk(
         
         return RiskAssessmentResponse(
             student_id=risk_assessment.student_id,
-            risk_level=risk_assessment.risk_level,
+            risk_level=risk_assessment.risk_level.label,
             risk_factors=risk_assessment.risk_factors,
             predicted_outcome=risk_assessment.predicted_outcome,
             intervention_suggestions=risk_assessment.intervention_suggestions,
@@ -192,7 +191,7 @@ async def assess_student_risk(
 @require_role(["instructor", "admin"])
 async def get_cohort_insights(
     request: CohortInsightsRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -230,7 +229,7 @@ async def get_cohort_insights(
 async def get_personalized_recommendations(
     student_id: int,
     recommendation_type: Optional[str] = Query("all", description="Type of recommendations"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -285,7 +284,7 @@ async def get_personalized_recommendations(
 async def get_instructor_ai_dashboard(
     session_id: int,
     include_predictions: bool = Query(True, description="Include predictive analytics"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -338,7 +337,7 @@ async def export_analytics_report(
     session_id: int,
     report_format: str = Query("json", description="Export format (json, csv)"),
     include_ai_insights: bool = Query(True, description="Include AI insights in export"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -383,7 +382,7 @@ async def export_analytics_report(
                         "title": insight.title,
                         "description": insight.description,
                         "confidence": insight.confidence,
-                        "priority": insight.priority
+                        "priority": insight.priority.label
                     }
                     for insight in insights
                 ]
@@ -392,7 +391,7 @@ async def export_analytics_report(
         
         # For now, return JSON format
         # TODO: Implement CSV export if needed
-        return JSONResponse(
+        return ORJSONResponse(
             content=report_data,
             headers={
                 "Content-Disposition": f"attachment; filename=analytics_report_{session_id}_{datetime.utcnow().strftime('%Y%m%d_%H%M%S')}.json"
@@ -8,8 +8,7 @@ from sqlmodel import Session
 from pydantic import BaseModel
 
 from app.core.database import get_session
-from app.core.security import get_current_user
-from app.models.user import User
+from app.core.security import AuthIdentity, get_current_user
 from app.utils.ai_utils import ask_gpt, is_ai_available
 from app.schemas.ai_tutor import (
     TutorRequest, TutorResponse, HintRequest, HintResponse,
@@ -17,6 +16,7 @@ from app.schemas.ai_tutor import (
     AdaptiveQuestionRequest, AdaptiveQuestionResponse, StudentProgressAnalysis,
     TutorSessionSummary, LearningPathSuggestion
 )
+from app.models.analytics import get_coin_balance
 from app.services.ai_tutor_service import AITutorService
 
 router = APIRouter(prefix="/ai-tutor", tags=["ai-tutor"])
@@ -38,7 +38,7 @@ class SimpleAIResponse(BaseModel):
 @router.post("/ask-simple", response_model=SimpleAIResponse)
 async def ask_simple_question(
     request: SimpleAIRequest,
-    current_user: User = Depends(get_current_user)
+    current_user: AuthIdentity = Depends(get_current_user)
 ) -> SimpleAIResponse:
     """
     Simple endpoint to ask GPT a question directly using the ask_gpt utility
@@ -80,7 +80,7 @@ async def get_ai_tutor_status():
 @router.post("/ask", response_model=TutorResponse)
 async def ask_tutor(
     request: TutorRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_session)
 ) -> TutorResponse:
     """
@@ -93,7 +93,7 @@ async def ask_tutor(
             "level": "intermediate",  # Could be fetched from user profile
             "completion_percentage": 0.65,  # Could be calculated from progress
             "time_spent": 120,  # Minutes in current session
-            "coins": 50,  # Current coin balance
+            "coins": get_coin_balance(current_user.id, db),
             "session_id": request.context.get("session_id") if request.context else None
         }
         
@@ -114,7 +114,7 @@ async def ask_tutor(
 @router.post("/hint", response_model=HintResponse)
 async def get_hint(
     request: HintRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_session)
 ) -> HintResponse:
     """
@@ -160,7 +160,7 @@ async def get_hint(
 @router.post("/code-feedback", response_model=CodeFeedbackResponse)
 async def get_code_feedback(
     request: CodeFeedbackRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_session)
 ) -> CodeFeedbackResponse:
     """
@@ -189,7 +189,7 @@ async def get_code_feedback(
 
 @router.get("/learning-path", response_model=LearningPathResponse)
 async def get_learning_path(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_session)
 ) -> LearningPathResponse:
     """
@@ -232,7 +232,7 @@ async def get_learning_path(
 @router.post("/adaptive-question", response_model=AdaptiveQuestionResponse)
 async def generate_adaptive_question(
     request: AdaptiveQuestionRequest,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_session)
 ) -> AdaptiveQuestionResponse:
     """
@@ -286,7 +286,7 @@ async def generate_adaptive_question(
 
 @router.get("/progress-analysis", response_model=StudentProgressAnalysis)
 async def get_progress_analysis(
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_session)
 ) -> StudentProgressAnalysis:
     """
@@ -336,7 +336,7 @@ async def get_progress_analysis(
 @router.get("/session-summary/{session_id}", response_model=TutorSessionSummary)
 async def get_session_summary(
     session_id: str,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_session)
 ) -> TutorSessionSummary:
     """
@@ -172,13 +172,13 @@ async def get_event_logs(
         stmt = stmt.where(EventLog.event_type == event_type)
     
     if start_date:
-        stmt = stmt.where(EventLog.created_at >= start_date)
+        stmt = stmt.where(EventLog.timestamp >= start_date)
     
     if end_date:
-        stmt = stmt.where(EventLog.created_at <= end_date)
+        stmt = stmt.where(EventLog.timestamp <= end_date)
     
     # Order by most recent first
-    stmt = stmt.order_by(EventLog.created_at.desc()).limit(limit)
+    stmt = stmt.order_by(EventLog.timestamp.desc()).limit(limit)
     
     events = db.exec(stmt).all()
     
@@ -314,7 +314,7 @@ async def get_dashboard_analytics(
     # Recent activity (last 7 days)
     week_ago = datetime.utcnow() - timedelta(days=7)
     recent_events = db.exec(
-        select(EventLog).where(EventLog.created_at >= week_ago)
+        select(EventLog).where(EventLog.timestamp >= week_ago)
     ).all()
     
     recent_enrollments = len([e for e in recent_events if e.event_type == "session_started"])
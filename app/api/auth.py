@@ -2,7 +2,7 @@
 Authentication API endpoints
 """
 
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm, HTTPBearer, HTTPAuthorizationCredentials
@@ -85,14 +85,13 @@ async def register(user_data: UserCreate, db: Session = Depends(get_db)):
         role=user_data.role,
         is_active=True,
         is_verified=False,
-        created_at=datetime.utcnow()
     )
     
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     
-    return UserResponse.from_orm(db_user)
+    return UserResponse.model_validate(db_user)
 
 
 @router.post("/token", response_model=TokenResponse)
@@ -113,7 +112,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         )
     
     # Update last login
-    user.last_login = datetime.utcnow()
+    user.last_login = datetime.now(timezone.utc)
     db.add(user)
     db.commit()
     
@@ -127,7 +126,7 @@ async def login(form_data: OAuth2PasswordRequestForm = Depends(), db: Session =
         access_token=access_token,
         token_type="bearer",
         expires_in=int(access_token_expires.total_seconds()),
-        user=UserResponse.from_orm(user)
+        user=UserResponse.model_validate(user)
     )
 
 
@@ -148,7 +147,7 @@ async def login_json(user_data: UserLogin, db: Session = Depends(get_db)):
         )
     
     # Update last login
-    user.last_login = datetime.utcnow()
+    user.last_login = datetime.now(timezone.utc)
     db.add(user)
     db.commit()
     
@@ -162,14 +161,14 @@ async def login_json(user_data: UserLogin, db: Session = Depends(get_db)):
         access_token=access_token,
         token_type="bearer",
         expires_in=int(access_token_expires.total_seconds()),
-        user=UserResponse.from_orm(user)
+        user=UserResponse.model_validate(user)
     )
 
 
 @router.get("/me", response_model=UserResponse)
 async def get_current_user_info(current_user: User = Depends(get_current_user)):
     """Get current user information"""
-    return UserResponse.from_orm(current_user)
+    return UserResponse.model_validate(current_user)
 
 
 @router.post("/refresh", response_model=TokenResponse)
@@ -184,5 +183,5 @@ async def refresh_token(current_user: User = Depends(get_current_user)):
         access_token=access_token,
         token_type="bearer",
         expires_in=int(access_token_expires.total_seconds()),
-        user=UserResponse.from_orm(current_user)
+        user=UserResponse.model_validate(current_user)
     ) 
\ No newline at end of file
@@ -5,12 +5,13 @@ Course API endpoints
 from typing import List, Optional
 from datetime import datetime
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select
+from sqlmodel import Session, select, func
 
 from app.core.database import get_db
 from app.models.user import User, UserRole
 from app.models.course import Course
 from app.models.enrollment import CourseEnrollment
+from app.models.session import Session as SessionModel, SessionStatus
 from app.schemas.course import CourseCreate, CourseResponse, CourseUpdate, CourseListResponse
 from app.schemas.enrollment import EnrollmentCreate, BulkEnrollmentResponse, EnrollmentResponse, EnrollmentListResponse
 from app.api.auth import get_current_user
@@ -71,7 +72,7 @@ async def create_course(
     db.commit()
     db.refresh(db_course)
     
-    return CourseResponse.from_orm(db_course)
+    return CourseResponse.model_validate(db_course)
 
 
 @router.get("/", response_model=CourseListResponse)
@@ -110,8 +111,7 @@ async def list_courses(
         )
     
     # Count total
-    total_stmt = stmt
-    total = len(db.exec(total_stmt).all())
+    total = db.exec(select(func.count()).select_from(stmt.subquery())).one()
     
     # Apply pagination
     offset = (page - 1) * per_page
@@ -119,25 +119,25 @@ async def list_courses(
     
     courses = db.exec(stmt).all()
     
+    # Session and active-student counts for the whole page (index-only scans)
+    course_ids = [course.id for course in courses]
+    session_counts = dict(db.exec(
+        select(SessionModel.course_id, func.count())
+        .where(SessionModel.course_id.in_(course_ids))
+        .group_by(SessionModel.course_id)
+    ).all())
+    student_counts = dict(db.exec(
+        select(CourseEnrollment.course_id, func.count())
+        .where(CourseEnrollment.course_id.in_(course_ids), CourseEnrollment.status == "active")
+        .group_by(CourseEnrollment.course_id)
+    ).all())
+    
     # Convert to response
     course_responses = []
     for course in courses:
-        response = CourseResponse.from_orm(course)
-        
-        # Add computed fields
-        from app.models.session import Session as SessionModel
-        session_stmt = select(SessionModel).where(SessionModel.course_id == course.id)
-        sessions = db.exec(session_stmt).all()
-        response.total_sessions = len(sessions)
-        
-        # Count enrolled students for this course
-        enrollment_stmt = select(CourseEnrollment).where(
-            CourseEnrollment.course_id == course.id,
-            CourseEnrollment.status == "active"
-        )
-        enrolled_students = db.exec(enrollment_stmt).all()
-        response.student_count = len(enrolled_students)
-        
+        response = CourseResponse.model_validate(course)
+        response.total_sessions = session_counts.get(course.id, 0)
+        response.student_count = student_counts.get(course.id, 0)
         course_responses.append(response)
     
     return CourseListResponse(
@@ -168,20 +168,19 @@ async def get_course(
             raise HTTPException(status_code=404, detail="Course not found")
     
     # Build response with computed fields
-    response = CourseResponse.from_orm(course)
+    response = CourseResponse.model_validate(course)
     
-    from app.models.session import Session as SessionModel, StudentState
-    session_stmt = select(SessionModel).where(SessionModel.course_id == course_id)
-    sessions = db.exec(session_stmt).all()
-    response.total_sessions = len(sessions)
+    response.total_sessions = db.exec(
+        select(func.count()).where(SessionModel.course_id == course_id)
+    ).one()
     
     # Count enrolled students for this course
-    enrollment_stmt = select(CourseEnrollment).where(
-        CourseEnrollment.course_id == course_id,
-        CourseEnrollment.status == "active"
-    )
-    enrolled_students = db.exec(enrollment_stmt).all()
-    response.student_count = len(enrolled_students)
+    response.student_count = db.exec(
+        select(func.count()).where(
+            CourseEnrollment.course_id == course_id,
+            CourseEnrollment.status == "active"
+        )
+    ).one()
     
     return response
 
@@ -197,7 +196,7 @@ async def update_course(
     course = require_course_access(course_id, current_user, db)
     
     # Update fields
-    update_data = course_data.dict(exclude_unset=True)
+    update_data = course_data.model_dump(exclude_unset=True)
     for field, value in update_data.items():
         setattr(course, field, value)
     
@@ -207,7 +206,7 @@ async def update_course(
     db.commit()
     db.refresh(course)
     
-    return CourseResponse.from_orm(course)
+    return CourseResponse.model_validate(course)
 
 
 @router.delete("/{course_id}")
@@ -220,11 +219,11 @@ async def delete_course(
     course = require_course_access(course_id, current_user, db)
     
     # Check if course has sessions
-    from app.models.session import Session as SessionModel
-    session_stmt = select(SessionModel).where(SessionModel.course_id == course_id)
-    sessions = db.exec(session_stmt).all()
+    has_sessions = db.exec(
+        select(SessionModel.id).where(SessionModel.course_id == course_id).limit(1)
+    ).first()
     
-    if sessions:
+    if has_sessions:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Cannot delete course with sessions"
@@ -352,42 +351,50 @@ async def get_course_enrollments(
             detail="Only course instructors can view enrollments"
         )
     
-    # Build query
-    stmt = select(CourseEnrollment).where(CourseEnrollment.course_id == course_id)
+    # Select only the columns carried by enrollment_list_idx (index-only scan)
+    stmt = select(
+        CourseEnrollment.id,
+        CourseEnrollment.student_id,
+        CourseEnrollment.status,
+        CourseEnrollment.enrolled_at,
+        CourseEnrollment.completed_at,
+        CourseEnrollment.progress_percentage,
+        CourseEnrollment.last_accessed_at,
+    ).where(CourseEnrollment.course_id == course_id)
     
     if status:
         stmt = stmt.where(CourseEnrollment.status == status)
     
     # Count total
-    total_stmt = stmt
-    total = len(db.exec(total_stmt).all())
+    total = db.exec(select(func.count()).select_from(stmt.subquery())).one()
     
-    # Apply pagination
+    # Apply pagination, newest first
     offset = (page - 1) * per_page
-    stmt = stmt.offset(offset).limit(per_page)
-    
-    enrollments = db.exec(stmt).all()
-    
-    # Build response with student info
-    enrollment_responses = []
-    for enrollment in enrollments:
-        # Get student info
-        student = db.get(User, enrollment.student_id)
-        
-        enrollment_response = EnrollmentResponse(
-            id=enrollment.id,
-            student_id=enrollment.student_id,
-            course_id=enrollment.course_id,
-            status=enrollment.status,
-            enrolled_at=enrollment.enrolled_at,
-            completed_at=enrollment.completed_at,
-            progress_percentage=enrollment.progress_percentage,
-            last_accessed_at=enrollment.last_accessed_at,
-            student_name=student.full_name if student else "Unknown",
-            student_email=student.email if student else "Unknown",
+    page_stmt = stmt.order_by(CourseEnrollment.enrolled_at.desc()).offset(offset).limit(per_page).subquery()
+    
+    # Student info for the page in the same query
+    rows = db.exec(
+        select(page_stmt, User.full_name, User.email)
+        .outerjoin(User, User.id == page_stmt.c.student_id)
+        .order_by(page_stmt.c.enrolled_at.desc())
+    ).all()
+    
+    enrollment_responses = [
+        EnrollmentResponse(
+            id=row.id,
+            student_id=row.student_id,
+            course_id=course_id,
+            status=row.status,
+            enrolled_at=row.enrolled_at,
+            completed_at=row.completed_at,
+            progress_percentage=row.progress_percentage,
+            last_accessed_at=row.last_accessed_at,
+            student_name=row.full_name or "Unknown",
+            student_email=row.email or "Unknown",
             course_name=course.name
         )
-        enrollment_responses.append(enrollment_response)
+        for row in rows
+    ]
     
     return EnrollmentListResponse(
         enrollments=enrollment_responses,
@@ -416,12 +423,15 @@ async def list_course_sessions(
         if course.instructor_id != current_user.id and not course.is_public:
             raise HTTPException(status_code=404, detail="Course not found")
     
-    from app.models.session import Session as SessionModel
-    stmt = select(SessionModel).where(SessionModel.course_id == course_id)
+    stmt = (
+        select(SessionModel)
+        .where(SessionModel.course_id == course_id)
+        .order_by(SessionModel.start_time.desc())
+    )
     
     # For students, only show published sessions
     if current_user.role == UserRole.STUDENT:
-        stmt = stmt.where(SessionModel.status == "published")
+        stmt = stmt.where(SessionModel.status == SessionStatus.PUBLISHED)
     
     sessions = db.exec(stmt).all()
     
@@ -6,12 +6,11 @@ import logging
 from typing import List, Optional, Dict, Any
 from datetime import datetime, timedelta
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session
 
 from app.core.database import get_db
-from app.core.security import get_current_user, get_current_user_optional
-from app.models.user import User
+from app.core.security import AuthIdentity, get_current_user, get_current_user_optional
 from app.services.progress_tracking_service import ProgressTrackingService
 from app.schemas.progress_tracking import (
     ProgressAnalysis, SkillAssessment, LearningGoal, AchievementBadge,
@@ -50,7 +49,7 @@ async def health_check():
 async def get_progress_analysis(
     student_id: int,
     days: Optional[int] = Query(30, description="Analysis period in days"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -79,7 +78,14 @@ async def get_progress_analysis(
             db=db
         )
         
-        return analysis
+        # Nested lists of models dominate this body: dump to Python values and let
+        # orjson encode datetimes/enums in C. Only the timedelta needs pydantic's
+        # ISO 8601 form, which orjson has no encoding for.
+        content = analysis.model_dump()
+        content["analysis_period"] = analysis.model_dump(
+            mode="json", include={"analysis_period"}
+        )["analysis_period"]
+        return ORJSONResponse(content)
         
     except Exception as e:
         logger.error(f"Error analyzing student progress: {e}")
@@ -90,7 +96,7 @@ async def get_progress_analysis(
 async def get_skill_assessments(
     student_id: int,
     skill_domain: Optional[str] = Query(None, description="Specific skill domain to assess"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -134,7 +140,7 @@ async def get_skill_assessments(
 @router.get("/difficulties/{student_id}", summary="Detect learning difficulties")
 async def detect_learning_difficulties(
     student_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -173,7 +179,7 @@ async def detect_learning_difficulties(
 async def get_difficulty_recommendation(
     student_id: int,
     topic: str = Query(..., description="Topic to get difficulty recommendation for"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -208,7 +214,7 @@ async def get_difficulty_recommendation(
 @router.get("/goals/{student_id}", response_model=List[LearningGoal], summary="Get personalized learning goals")
 async def get_learning_goals(
     student_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -242,7 +248,7 @@ async def get_learning_goals(
 @router.get("/badges/{student_id}", response_model=List[AchievementBadge], summary="Get achievement badges")
 async def get_achievement_badges(
     student_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -275,7 +281,7 @@ async def get_achievement_badges(
 @router.get("/insights/{student_id}", summary="Get learning insights")
 async def get_learning_insights(
     student_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -362,7 +368,7 @@ async def get_learning_insights(
 @router.get("/competency-map/{student_id}", summary="Get competency map")
 async def get_competency_map(
     student_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -426,7 +432,7 @@ async def get_adaptive_learning_path(
     student_id: int,
     focus_area: Optional[str] = Query(None, description="Area to focus the learning path on"),
     duration_hours: Optional[int] = Query(40, description="Desired path duration in hours"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -501,7 +507,7 @@ async def get_adaptive_learning_path(
 @router.get("/dashboard/{student_id}", summary="Get progress dashboard data")
 async def get_progress_dashboard(
     student_id: int,
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
@@ -598,7 +604,7 @@ async def get_progress_dashboard(
 async def get_predictive_analytics(
     student_id: int,
     prediction_horizon: Optional[int] = Query(7, description="Prediction horizon in days"),
-    current_user: User = Depends(get_current_user),
+    current_user: AuthIdentity = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
     """
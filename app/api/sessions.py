@@ -2,14 +2,17 @@
 Session and Bubble Graph API endpoints
 """
 
-from typing import List, Optional
-from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from datetime import datetime, timezone
+import orjson
 from fastapi import APIRouter, Depends, HTTPException, status, Query
-from sqlmodel import Session, select, and_
+from fastapi.responses import ORJSONResponse
+from sqlmodel import Session, select, func
 
 from app.core.database import get_db
 from app.models.user import User, UserRole
-from app.models.session import Session as SessionModel, BubbleNode, StudentState
+from app.models.session import Session as SessionModel, SessionStatus, BubbleNode, StudentState
+from app.schemas.base import fast_response_from_row
 from app.schemas.session import (
     SessionCreate, SessionResponse, SessionUpdate, SessionListResponse,
     BubbleNodeCreate, BubbleNodeResponse, BubbleGraphSchema,
@@ -18,10 +21,20 @@ from app.schemas.session import (
 )
 from app.services.graph_service import GraphService
 from app.services.session_service import SessionService
+from app.services.student_state_repository import StudentStateRepository
+from app.services.bubble_node_repository import BubbleNodeRepository
+from app.services.session_edge_repository import SessionEdgeRepository
+from app.services.cache_service import get_cached_session, get_cached_student_state
 from app.api.auth import get_current_user
 
 router = APIRouter(prefix="/sessions", tags=["sessions"])
 
+# SessionUpdate fields copied straight onto the session when sent (status and
+# graph_json have their own handling)
+_SESSION_UPDATE_FIELDS = {
+    "name", "description", "max_attempts_per_bubble", "coins_per_bubble", "time_limit_minutes"
+}
+
 
 def require_instructor_or_admin(current_user: User = Depends(get_current_user)) -> User:
     """Require instructor or admin role"""
@@ -57,6 +70,48 @@ def require_instructor_access(session_id: int, current_user: User, db: Session)
     )
 
 
+def _session_response(session: SessionModel, now: datetime, student_count: int = 0) -> SessionResponse:
+    """SessionResponse for a stored session (trusted row, so built without re-validation)"""
+    schedule_status = session.status_at(now)
+    return fast_response_from_row(
+        SessionResponse, session,
+        total_bubbles=len(session.graph_json.get('nodes', [])),
+        student_count=student_count,
+        is_active=schedule_status == "active",
+        is_upcoming=schedule_status == "upcoming",
+        is_past=schedule_status == "past",
+    )
+
+
+# Encoded graph_json per (session_id, updated_at); every graph write bumps updated_at
+_graph_json_fragments: Dict[Tuple[int, Optional[datetime]], orjson.Fragment] = {}
+_GRAPH_JSON_CACHE_MAX_SIZE = 512
+
+
+def _graph_json_fragment(session: SessionModel) -> orjson.Fragment:
+    """The session's graph as pre-encoded JSON, spliced into responses as-is"""
+    key = (session.id, session.updated_at)
+    fragment = _graph_json_fragments.get(key)
+    if fragment is None:
+        if len(_graph_json_fragments) >= _GRAPH_JSON_CACHE_MAX_SIZE:
+            _graph_json_fragments.clear()
+        fragment = orjson.Fragment(orjson.dumps(session.graph_json))
+        _graph_json_fragments[key] = fragment
+    return fragment
+
+
+def _session_payload(session: SessionModel, response: SessionResponse) -> Dict[str, Any]:
+    """
+    Response body for a session, encoded by ORJSONResponse directly
+    
+    graph_json is the largest part of the body; it is neither walked by pydantic
+    serialization nor re-encoded on every request.
+    """
+    payload = response.model_dump(exclude={"graph_json"})
+    payload["graph_json"] = _graph_json_fragment(session)
+    return payload
+
+
 @router.post("/", response_model=SessionResponse)
 async def create_session(
     session_data: SessionCreate,
@@ -82,37 +137,24 @@ async def create_session(
         status="draft",
         start_time=session_data.start_time,
         end_time=session_data.end_time,
-        graph_json=session_data.graph_json.dict(),
         max_attempts_per_bubble=session_data.max_attempts_per_bubble,
         coins_per_bubble=session_data.coins_per_bubble,
         time_limit_minutes=session_data.time_limit_minutes,
-        created_at=datetime.utcnow()
     )
+    db_session.set_graph(session_data.graph_json.model_dump())
     
     db.add(db_session)
     db.commit()
     db.refresh(db_session)
     
-    # Create bubble nodes
-    for node in session_data.graph_json.nodes:
-        # Set default values for bubble node
-        bubble_node = BubbleNode(
-            session_id=db_session.id,
-            node_id=node.id,
-            type=node.type,
-            title=node.title,
-            content_md="",  # Will be filled later
-            coin_reward=session_data.coins_per_bubble,
-            created_at=datetime.utcnow()
-        )
-        db.add(bubble_node)
-    
+    # Create bubble nodes (content is filled in later through the bubble endpoints) and edges
+    BubbleNodeRepository.upsert_from_graph(db, db_session)
+    SessionEdgeRepository.replace_from_graph(db, db_session)
     db.commit()
     
-    # Return response with computed fields
-    response = SessionResponse.from_orm(db_session)
-    response.total_bubbles = len(session_data.graph_json.nodes)
-    return response
+    # Return response with computed fields (returned as a Response, so not re-validated)
+    response = _session_response(db_session, datetime.now(timezone.utc))
+    return ORJSONResponse(_session_payload(db_session, response))
 
 
 @router.get("/", response_model=SessionListResponse)
@@ -138,14 +180,7 @@ async def list_sessions(
     
     # Filter for active sessions
     if active_only:
-        now = datetime.utcnow()
-        stmt = stmt.where(
-            and_(
-                SessionModel.status == "published",
-                SessionModel.start_time <= now,
-                SessionModel.end_time >= now
-            )
-        )
+        stmt = stmt.where(SessionModel.active_at(datetime.now(timezone.utc)))
     
     # For students, only show published sessions
     if current_user.role == UserRole.STUDENT:
@@ -156,9 +191,8 @@ async def list_sessions(
         from app.models.course import Course
         stmt = stmt.join(Course).where(Course.instructor_id == current_user.id)
     
-    # Count total
-    total_stmt = stmt
-    total = len(db.exec(total_stmt).all())
+    # Count total in SQL rather than loading every matching session
+    total = db.exec(select(func.count()).select_from(stmt.subquery())).one()
     
     # Apply pagination
     offset = (page - 1) * per_page
@@ -166,12 +200,10 @@ async def list_sessions(
     
     sessions = db.exec(stmt).all()
     
-    # Convert to response
+    # Convert to response (one clock read for the whole page)
+    now = datetime.now(timezone.utc)
     session_responses = []
     for session in sessions:
-        response = SessionResponse.from_orm(session)
-        response.total_bubbles = len(session.graph_json.get('nodes', []))
-        
         # Get student count from course enrollments
         from app.models.enrollment import CourseEnrollment
         enrollment_stmt = select(CourseEnrollment).where(
@@ -179,21 +211,18 @@ async def list_sessions(
             CourseEnrollment.status == "active"
         )
         enrolled_students = db.exec(enrollment_stmt).all()
-        response.student_count = len(enrolled_students)
-        
-        # Set computed status fields
-        response.is_active = session.is_active
-        response.is_upcoming = session.is_upcoming
-        response.is_past = session.is_past
         
-        session_responses.append(response)
+        session_responses.append(
+            _session_payload(session, _session_response(session, now, len(enrolled_students)))
+        )
     
-    return SessionListResponse(
-        sessions=session_responses,
-        total=total,
-        page=page,
-        per_page=per_page
-    )
+    # Same shape as SessionListResponse, with graphs spliced in pre-encoded
+    return ORJSONResponse({
+        "sessions": session_responses,
+        "total": total,
+        "page": page,
+        "per_page": per_page
+    })
 
 
 @router.get("/{session_id}", response_model=SessionResponse)
@@ -214,10 +243,6 @@ async def get_session(
     elif current_user.role == UserRole.INSTRUCTOR:
         require_instructor_access(session_id, current_user, db)
     
-    # Build response
-    response = SessionResponse.from_orm(session)
-    response.total_bubbles = len(session.graph_json.get('nodes', []))
-    
     # Get student count from course enrollments
     from app.models.enrollment import CourseEnrollment
     enrollment_stmt = select(CourseEnrollment).where(
@@ -225,14 +250,9 @@ async def get_session(
         CourseEnrollment.status == "active"
     )
     enrolled_students = db.exec(enrollment_stmt).all()
-    response.student_count = len(enrolled_students)
-    
-    # Set computed status fields
-    response.is_active = session.is_active
-    response.is_upcoming = session.is_upcoming
-    response.is_past = session.is_past
     
-    return response
+    response = _session_response(session, datetime.now(timezone.utc), len(enrolled_students))
+    return ORJSONResponse(_session_payload(session, response))
 
 
 @router.put("/{session_id}", response_model=SessionResponse)
@@ -245,21 +265,15 @@ async def update_session(
     """Update session"""
     session = require_instructor_access(session_id, current_user, db)
     
-    # Update fields
-    if session_data.name is not None:
-        session.name = session_data.name
-    if session_data.description is not None:
-        session.description = session_data.description
-    if session_data.status is not None:
+    # Update fields present in the request; explicit nulls leave a field unchanged
+    updates = session_data.model_dump(include=_SESSION_UPDATE_FIELDS, exclude_unset=True)
+    for field, value in updates.items():
+        if value is not None:
+            setattr(session, field, value)
+    # Publishing is handled by SessionService.publish_session below
+    publishing = session_data.status == SessionStatus.PUBLISHED
+    if session_data.status is not None and not publishing:
         session.status = session_data.status
-        if session_data.status == "published":
-            session.published_at = datetime.utcnow()
-    if session_data.max_attempts_per_bubble is not None:
-        session.max_attempts_per_bubble = session_data.max_attempts_per_bubble
-    if session_data.coins_per_bubble is not None:
-        session.coins_per_bubble = session_data.coins_per_bubble
-    if session_data.time_limit_minutes is not None:
-        session.time_limit_minutes = session_data.time_limit_minutes
     
     # Update graph if provided
     if session_data.graph_json is not None:
@@ -272,16 +286,26 @@ async def update_session(
                 detail=f"Invalid graph: {', '.join(validation.errors)}"
             )
         
-        session.graph_json = session_data.graph_json.dict()
-        session.updated_at = datetime.utcnow()
+        session.set_graph(session_data.graph_json.model_dump())
+        session.updated_at = datetime.now(timezone.utc)
     
-    db.add(session)
-    db.commit()
-    db.refresh(session)
+    if publishing:
+        session = SessionService().publish_session(session, db)
+    else:
+        db.add(session)
+        if session_data.graph_json is not None:
+            SessionEdgeRepository.replace_from_graph(db, session)
+        # Keep a live session's bubbles in step with its graph
+        resync_bubbles = session_data.graph_json is not None and session.is_published
+        if resync_bubbles:
+            BubbleNodeRepository.upsert_from_graph(db, session)
+        db.commit()
+        db.refresh(session)
+        if resync_bubbles:
+            BubbleNodeRepository.invalidate()
     
-    response = SessionResponse.from_orm(session)
-    response.total_bubbles = len(session.graph_json.get('nodes', []))
-    return response
+    response = _session_response(session, datetime.now(timezone.utc))
+    return ORJSONResponse(_session_payload(session, response))
 
 
 @router.delete("/{session_id}")
@@ -305,9 +329,12 @@ async def delete_session(
     for bubble in bubbles:
         db.delete(bubble)
     
+    SessionEdgeRepository.delete_for_session(db, session_id)
+    
     # Delete session
     db.delete(session)
     db.commit()
+    BubbleNodeRepository.invalidate()
     
     return {"message": "Session deleted successfully"}
 
@@ -336,7 +363,7 @@ async def validate_graph(
     else:
         # Validate session's current graph
         session = require_instructor_access(session_id, current_user, db)
-        graph_to_validate = BubbleGraphSchema(**session.graph_json)
+        graph_to_validate = BubbleGraphSchema.model_validate(session.graph_json)
     
     graph_service = GraphService()
     return graph_service.validate_graph(graph_to_validate)
@@ -363,7 +390,7 @@ async def start_session(
     session_service = SessionService()
     student_state = session_service.start_session(current_user.id, session_id, db)
     
-    return StudentStateResponse.from_orm(student_state)
+    return ORJSONResponse(fast_response_from_row(StudentStateResponse, student_state).model_dump())
 
 
 @router.post("/{session_id}/advance", response_model=BubbleAdvanceResponse)
@@ -403,7 +430,7 @@ async def get_student_state(
     if not state:
         raise HTTPException(status_code=404, detail="Session not started")
     
-    return state
+    return ORJSONResponse(state.model_dump())
 
 
 @router.get("/{session_id}/student-state", response_model=StudentStateResponse)
@@ -450,7 +477,7 @@ async def update_current_node(
         )
     
     student_state.current_node_id = node_id
-    student_state.last_activity_at = datetime.utcnow()
+    student_state.last_activity_at = datetime.now(timezone.utc)
     db.add(student_state)
     db.commit()
     
@@ -469,35 +496,33 @@ async def create_bubble_node(
     session = require_instructor_access(session_id, current_user, db)
     
     # Check if bubble node already exists
-    stmt = select(BubbleNode).where(
-        and_(BubbleNode.session_id == session_id, BubbleNode.node_id == bubble_data.node_id)
-    )
-    existing_bubble = db.exec(stmt).first()
+    existing_bubble = BubbleNodeRepository.get(db, session_id, bubble_data.node_id)
     
     if existing_bubble:
         # Update existing
-        for field, value in bubble_data.dict(exclude_unset=True).items():
+        for field, value in bubble_data.model_dump(exclude_unset=True).items():
             setattr(existing_bubble, field, value)
-        existing_bubble.updated_at = datetime.utcnow()
+        existing_bubble.updated_at = datetime.now(timezone.utc)
         
         db.add(existing_bubble)
         db.commit()
         db.refresh(existing_bubble)
+        BubbleNodeRepository.invalidate()
         
-        return BubbleNodeResponse.from_orm(existing_bubble)
+        return BubbleNodeResponse.model_validate(existing_bubble)
     else:
         # Create new
         bubble_node = BubbleNode(
             session_id=session_id,
-            **bubble_data.dict(),
-            created_at=datetime.utcnow()
+            **bubble_data.model_dump(),
         )
         
         db.add(bubble_node)
         db.commit()
         db.refresh(bubble_node)
+        BubbleNodeRepository.invalidate()
         
-        return BubbleNodeResponse.from_orm(bubble_node)
+        return BubbleNodeResponse.model_validate(bubble_node)
 
 
 @router.get("/{session_id}/bubbles", response_model=List[BubbleNodeResponse])
@@ -520,7 +545,7 @@ async def list_bubble_nodes(
     stmt = select(BubbleNode).where(BubbleNode.session_id == session_id)
     bubbles = db.exec(stmt).all()
     
-    return [BubbleNodeResponse.from_orm(bubble) for bubble in bubbles]
+    return [BubbleNodeResponse.model_validate(bubble) for bubble in bubbles]
 
 
 @router.get("/{session_id}/bubbles/{node_id}", response_model=BubbleNodeResponse)
@@ -531,10 +556,7 @@ async def get_bubble_node(
     current_user: User = Depends(get_current_user)
 ):
     """Get specific bubble node"""
-    stmt = select(BubbleNode).where(
-        and_(BubbleNode.session_id == session_id, BubbleNode.node_id == node_id)
-    )
-    bubble = db.exec(stmt).first()
+    bubble = BubbleNodeRepository.get_cached(session_id, node_id)
     
     if not bubble:
         raise HTTPException(status_code=404, detail="Bubble node not found")
@@ -546,7 +568,7 @@ async def get_bubble_node(
     elif current_user.role == UserRole.INSTRUCTOR:
         require_instructor_access(session_id, current_user, db)
     
-    return BubbleNodeResponse.from_orm(bubble)
+    return BubbleNodeResponse.model_validate(bubble)
 
 
 @router.get("/{session_id}/bubble/{node_id}/context")
@@ -557,55 +579,39 @@ async def get_bubble_context(
     db: Session = Depends(get_db)
 ):
     """Get bubble context for AI tutor"""
-    from app.models.session import BubbleNode
-    
-    # Get session
-    session = db.get(SessionModel, session_id)
+    # Get session (read-only here, so served from cache)
+    session = get_cached_session(session_id, db)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    # Get bubble node from database (not just graph JSON)
-    bubble_stmt = select(BubbleNode).where(
-        BubbleNode.session_id == session_id,
-        BubbleNode.node_id == node_id
-    )
-    bubble_node_db = db.exec(bubble_stmt).first()
-    
-    # Also get basic info from graph JSON
-    bubble_node_graph = None
-    for node in session.graph_json.get("nodes", []):
-        if node.get("id") == node_id:
-            bubble_node_graph = node
-            break
-    
-    if not bubble_node_db and not bubble_node_graph:
+    bubble_node = find_bubble(session, node_id)
+    if not bubble_node:
         raise HTTPException(status_code=404, detail="Bubble node not found")
     
-    # Get or create student state
-    student_stmt = select(StudentState).where(
-        StudentState.student_id == current_user.id,
-        StudentState.session_id == session_id
-    )
-    student_state = db.exec(student_stmt).first()
+    # Get student state
+    student_state = get_cached_student_state(current_user.id, session_id, db)
     
     if not student_state:
         raise HTTPException(status_code=404, detail="Student not enrolled in session")
     
-    # Build bubble context using database content when available
+    # Incoming edges from session_edge; graph_json is not needed here
+    prerequisites = SessionEdgeRepository.prerequisite_ids(db, session_id, node_id)
+    
+    # Build bubble context
     bubble_context = {
         "node_id": node_id,
-        "type": str(bubble_node_db.type) if bubble_node_db else bubble_node_graph.get("type", "concept"),
-        "title": bubble_node_db.title if bubble_node_db else bubble_node_graph.get("title", node_id),
-        "content": bubble_node_db.content_md if bubble_node_db else bubble_node_graph.get("content", ""),
-        "estimated_minutes": bubble_node_graph.get("estimated_minutes", 5),  # Only from graph JSON
-        "tutor_prompt": bubble_node_db.tutor_prompt if bubble_node_db else bubble_node_graph.get("tutor_prompt", ""),
-        "hints": bubble_node_db.hints if bubble_node_db else bubble_node_graph.get("hints", []),
-        "coin_reward": bubble_node_db.coin_reward if bubble_node_db else bubble_node_graph.get("coin_reward", 10),
-        "code_template": bubble_node_db.code_template if bubble_node_db else bubble_node_graph.get("code_template", ""),
-        "expected_output": bubble_node_db.expected_output if bubble_node_db else bubble_node_graph.get("expected_output", ""),
-        "prerequisites": get_node_prerequisites(session.graph_json, node_id),
-        "is_unlocked": is_node_unlocked(session.graph_json, node_id, student_state.completed_nodes),
-        "is_completed": node_id in student_state.completed_nodes,
+        "type": bubble_node["type"],
+        "title": bubble_node["title"],
+        "content": bubble_node["content_md"],
+        "estimated_minutes": bubble_node.get("estimated_minutes", 5),  # Only graph nodes carry timing
+        "tutor_prompt": bubble_node["tutor_prompt"],
+        "hints": bubble_node["hints"],
+        "coin_reward": bubble_node["coin_reward"],
+        "code_template": bubble_node["code_template"],
+        "expected_output": bubble_node["expected_output"],
+        "prerequisites": prerequisites,
+        "is_unlocked": is_node_unlocked(prerequisites, student_state.completed_node_set()),
+        "is_completed": student_state.is_node_completed(node_id),
         "failed_attempts": student_state.failed_attempts.get(node_id, 0) if student_state.failed_attempts else 0,
         "student_progress": {
             "total_coins": student_state.total_coins,
@@ -667,16 +673,11 @@ async def validate_bubble_completion(
 ):
     """Validate bubble completion and provide feedback"""
     # Get session and bubble context
-    session = db.query(SessionModel).filter(SessionModel.id == session_id).first()
+    session = db.get(SessionModel, session_id)
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    bubble_node = None
-    for node in session.graph_json.get("nodes", []):
-        if node.get("id") == node_id:
-            bubble_node = node
-            break
-    
+    bubble_node = find_bubble(session, node_id)
     if not bubble_node:
         raise HTTPException(status_code=404, detail="Bubble node not found")
     
@@ -690,14 +691,11 @@ async def validate_bubble_completion(
         raise HTTPException(status_code=404, detail="Student not enrolled in session")
     
     # Validate based on bubble type
-    bubble_type = bubble_node.get("type", "concept")
-    validation_result = validate_submission_by_type(bubble_type, submission, bubble_node)
+    validation_result = validate_submission_by_type(bubble_node["type"], submission, bubble_node)
     
     # If validation fails, increment failed attempts
     if not validation_result["is_valid"]:
-        if not student_state.failed_attempts:
-            student_state.failed_attempts = {}
-        student_state.failed_attempts[node_id] = student_state.failed_attempts.get(node_id, 0) + 1
+        StudentStateRepository.increment_failed_attempt(db, student_state, node_id)
         db.commit()
     
     return {
@@ -708,18 +706,33 @@ async def validate_bubble_completion(
     }
 
 
-def get_node_prerequisites(graph_json: dict, node_id: str) -> list:
-    """Get prerequisite nodes for a given node"""
-    prerequisites = []
-    for edge in graph_json.get("edges", []):
-        if edge.get("to") == node_id:
-            prerequisites.append(edge.get("from"))
-    return prerequisites
+def find_bubble(session: SessionModel, node_id: str) -> Optional[Dict[str, Any]]:
+    """
+    A bubble's fields from its BubbleNode row, falling back to its graph_json node
+    for sessions whose rows were never materialized
+    """
+    bubble_node = BubbleNodeRepository.get_cached(session.id, node_id)
+    if bubble_node:
+        return {**bubble_node.model_dump(), "type": bubble_node.type.value}
+    
+    for node in session.graph_json.get("nodes", []):
+        if node.get("id") == node_id:
+            return {
+                **node,
+                "type": node.get("type", "concept"),
+                "title": node.get("title", node_id),
+                "content_md": node.get("content", ""),
+                "tutor_prompt": node.get("tutor_prompt", ""),
+                "hints": node.get("hints", []),
+                "coin_reward": node.get("coin_reward", session.coins_per_bubble),
+                "code_template": node.get("code_template", ""),
+                "expected_output": node.get("expected_output", ""),
+            }
+    return None
 
 
-def is_node_unlocked(graph_json: dict, node_id: str, completed_nodes: list) -> bool:
+def is_node_unlocked(prerequisites: List[str], completed_nodes: set) -> bool:
     """Check if a node is unlocked based on prerequisites"""
-    prerequisites = get_node_prerequisites(graph_json, node_id)
     return all(prereq in completed_nodes for prereq in prerequisites)
 
 
@@ -9,13 +9,12 @@ from sqlmodel import Session
 from datetime import datetime
 
 from app.core.database import get_db
-from app.core.security import get_current_user, require_role
-from app.models.user import User
+from app.core.security import AuthIdentity, get_current_user, require_role
 from app.models.analytics import (
     StudentSessionTracking, ChatInteraction, CodeInteraction, 
-    CodeSubmission, StruggleAnalysis, MessageType
+    CodeSubmission, StruggleAnalysis, MessageType, StudentLearningStats, CodeInteractionType
 )
-from app.services.student_tracking_service import StudentTrackingService
+from app.services.student_tracking_service import QueuedCodeInteraction, StudentTrackingService
 from pydantic import BaseModel
 
 router = APIRouter()
@@ -43,7 +42,7 @@ class CodeInteractionRequest(BaseModel):
     student_id: int
     session_id: int
     code_snapshot: str
-    interaction_type: str = "keypress"
+    interaction_type: CodeInteractionType = CodeInteractionType.KEYPRESS
     node_id: Optional[str] = None
     language: str = "python"
     previous_code: Optional[str] = None
@@ -73,7 +72,7 @@ class StruggleDetectionRequest(BaseModel):
 async def initialize_session_tracking(
     request: SessionTrackingInitRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthIdentity = Depends(get_current_user)
 ):
     """Initialize or retrieve session tracking for a student"""
     
@@ -110,7 +109,7 @@ async def initialize_session_tracking(
 async def track_chat_interaction(
     request: ChatInteractionRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthIdentity = Depends(get_current_user)
 ):
     """Track detailed chat interaction"""
     
@@ -152,7 +151,7 @@ async def track_chat_interaction(
 async def track_code_interaction(
     request: CodeInteractionRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthIdentity = Depends(get_current_user)
 ):
     """Track code changes with intelligent filtering"""
     
@@ -176,7 +175,18 @@ async def track_code_interaction(
             db=db
         )
         
-        if code_interaction:
+        if isinstance(code_interaction, QueuedCodeInteraction):
+            # Keystroke-level rows are written in batches and have no id yet
+            return {
+                "queued": True,
+                "interaction_type": code_interaction.interaction_type,
+                "characters_added": code_interaction.characters_added,
+                "characters_deleted": code_interaction.characters_deleted,
+                "is_significant_change": code_interaction.is_significant_change,
+                "completion_progress": code_interaction.completion_progress,
+                "syntax_errors": code_interaction.syntax_errors
+            }
+        elif code_interaction:
             return {
                 "id": code_interaction.id,
                 "timestamp": code_interaction.timestamp,
@@ -200,7 +210,7 @@ async def track_code_interaction(
 async def track_code_submission(
     request: CodeSubmissionRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthIdentity = Depends(get_current_user)
 ):
     """Track code submission and evaluation results"""
     
@@ -248,7 +258,7 @@ async def track_code_submission(
 async def detect_student_struggle(
     request: StruggleDetectionRequest,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthIdentity = Depends(get_current_user)
 ):
     """Analyze and detect student struggle in real-time"""
     
@@ -296,16 +306,11 @@ async def detect_student_struggle(
 async def get_session_tracking(
     session_tracking_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthIdentity = Depends(get_current_user)
 ):
     """Get comprehensive session tracking data"""
     
-    from sqlmodel import select
-    
-    statement = select(StudentSessionTracking).where(
-        StudentSessionTracking.id == session_tracking_id
-    )
-    session_tracking = db.exec(statement).first()
+    session_tracking = db.get(StudentSessionTracking, session_tracking_id)
     
     if not session_tracking:
         raise HTTPException(
@@ -346,12 +351,42 @@ async def get_session_tracking(
     }
 
 
+@router.get("/session-tracking/{session_tracking_id}/latest-code")
+async def get_latest_code(
+    session_tracking_id: int,
+    db: Session = Depends(get_db),
+    current_user: AuthIdentity = Depends(get_current_user)
+):
+    """Get the latest tracked code for a session (code playback)"""
+    
+    session_tracking = db.get(StudentSessionTracking, session_tracking_id)
+    
+    if not session_tracking:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Session tracking not found"
+        )
+    
+    # Verify user has access
+    if (current_user.role == "student" and 
+        current_user.id != session_tracking.student_id):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not authorized to access this session tracking data"
+        )
+    
+    return {
+        "session_tracking_id": session_tracking_id,
+        "code": tracking_service.get_latest_code(session_tracking_id, db)
+    }
+
+
 @router.get("/student/{student_id}/learning-profile")
 @require_role(["admin", "instructor"])
 async def get_student_learning_profile(
     student_id: int,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: AuthIdentity = Depends(get_current_user)
 ):
     """Get or generate student learning profile"""
     
@@ -360,6 +395,8 @@ async def get_student_learning_profile(
             student_id=student_id,
             db=db
         )
+        # Aggregates come from the materialized view; absent until its next refresh
+        stats = db.get(StudentLearningStats, student_id) or StudentLearningStats(student_id=student_id)
         
         return {
             "id": profile.id,
@@ -369,17 +406,17 @@ async def get_student_learning_profile(
             "learning_style": profile.learning_style,
             "learning_style_confidence": profile.learning_style_confidence,
             "preferred_time_of_day": profile.preferred_time_of_day,
-            "average_session_duration_minutes": profile.average_session_duration_minutes,
-            "average_response_time_ms": profile.average_response_time_ms,
+            "average_session_duration_minutes": stats.average_session_duration_minutes,
+            "average_response_time_ms": stats.average_response_time_ms,
             "preferred_help_method": profile.preferred_help_method,
             "common_struggle_areas": profile.common_struggle_areas,
             "struggle_recovery_methods": profile.struggle_recovery_methods,
             "resilience_score": profile.resilience_score,
             "motivation_drivers": profile.motivation_drivers,
-            "overall_success_rate": profile.overall_success_rate,
+            "overall_success_rate": stats.overall_success_rate,
             "consistency_score": profile.consistency_score,
-            "total_sessions": profile.total_sessions,
-            "total_study_time_hours": profile.total_study_time_hours,
+            "total_sessions": stats.total_sessions,
+            "total_study_time_hours": stats.total_study_time_hours,
             "ai_generated_insights": profile.ai_generated_insights,
             "personalized_recommendations": profile.personalized_recommendations
         }
@@ -387,4 +424,40 @@ async def get_student_learning_profile(
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to get learning profile: {str(e)}"
-        ) 
\ No newline at end of file
+        )
+
+
+@router.get("/student/{student_id}/similar-learners")
+@require_role(["admin", "instructor"])
+async def get_similar_learners(
+    student_id: int,
+    limit: int = 20,
+    db: Session = Depends(get_db),
+    current_user: AuthIdentity = Depends(get_current_user)
+):
+    """Find students with the most similar learning profiles"""
+    
+    try:
+        similar = tracking_service.find_similar_learners(
+            student_id=student_id,
+            db=db,
+            limit=min(limit, 100)
+        )
+        
+        return {
+            "student_id": student_id,
+            "similar_learners": [
+                {
+                    "student_id": profile.student_id,
+                    "learning_style": profile.learning_style,
+                    "common_struggle_areas": profile.common_struggle_areas,
+                    "distance": distance
+                }
+                for profile, distance in similar
+            ]
+        }
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to find similar learners: {str(e)}"
+        )
@@ -3,13 +3,15 @@ User Management API endpoints
 """
 
 from typing import List, Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from fastapi import APIRouter, Depends, HTTPException, status, Query
+from fastapi.responses import ORJSONResponse
 from sqlmodel import Session, select
 
 from app.core.database import get_db
 from app.core.security import get_password_hash
 from app.models.user import User, UserRole
+from app.schemas.base import fast_response_from_row
 from app.schemas.user import UserCreate, UserResponse
 from app.api.auth import get_current_user
 
@@ -40,6 +42,7 @@ def require_admin_or_instructor(current_user: User = Depends(get_current_user))
 async def list_users(
     role: Optional[UserRole] = Query(None, description="Filter by user role"),
     is_active: Optional[bool] = Query(None, description="Filter by active status"),
+    search: Optional[str] = Query(None, min_length=1, description="Search by full name"),
     page: int = Query(1, ge=1, description="Page number"),
     per_page: int = Query(50, ge=1, le=100, description="Items per page"),
     db: Session = Depends(get_db),
@@ -56,6 +59,10 @@ async def list_users(
     if is_active is not None:
         stmt = stmt.where(User.is_active == is_active)
     
+    if search:
+        # Served by the user_fullname_trgm trigram index
+        stmt = stmt.where(User.full_name.ilike(f"%{search}%"))
+    
     # For instructors, they can only see students and their own profile
     if current_user.role == UserRole.INSTRUCTOR:
         stmt = stmt.where(
@@ -68,7 +75,9 @@ async def list_users(
     
     users = db.exec(stmt).all()
     
-    return [UserResponse.from_orm(user) for user in users]
+    # Trusted rows: read each with one attrgetter call, and return a Response so
+    # response_model does not re-validate them
+    return ORJSONResponse([fast_response_from_row(UserResponse, user).model_dump() for user in users])
 
 
 @router.post("/", response_model=UserResponse)
@@ -107,14 +116,13 @@ async def create_user(
         role=user_data.role,
         is_active=True,
         is_verified=True,  # Admin-created users are auto-verified
-        created_at=datetime.utcnow()
     )
     
     db.add(db_user)
     db.commit()
     db.refresh(db_user)
     
-    return UserResponse.from_orm(db_user)
+    return UserResponse.model_validate(db_user)
 
 
 @router.get("/{user_id}", response_model=UserResponse)
@@ -136,7 +144,7 @@ async def get_user(
                 detail="Not authorized to view this user"
             )
     
-    return UserResponse.from_orm(user)
+    return UserResponse.model_validate(user)
 
 
 @router.put("/{user_id}", response_model=UserResponse)
@@ -160,13 +168,13 @@ async def update_user(
         if field in allowed_fields and hasattr(user, field):
             setattr(user, field, value)
     
-    user.updated_at = datetime.utcnow()
+    user.updated_at = datetime.now(timezone.utc)
     
     db.add(user)
     db.commit()
     db.refresh(user)
     
-    return UserResponse.from_orm(user)
+    return UserResponse.model_validate(user)
 
 
 @router.delete("/{user_id}")
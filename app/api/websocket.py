@@ -3,77 +3,295 @@ WebSocket API for real-time student tracking and instructor monitoring
 Provides live updates for instructor dashboard and struggle alerts
 """
 
-import json
+import asyncio
+import functools
 import logging
-from typing import Dict, List, Set, Optional, Any
+import time
+import zlib
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Dict, List, Set, Optional, Any, Tuple, Union
 from datetime import datetime
-from fastapi import WebSocket, WebSocketDisconnect, Depends, HTTPException
+from fastapi import WebSocket, WebSocketDisconnect
 from fastapi.routing import APIRouter
-from sqlmodel import Session
+from fastapi.websockets import WebSocketState
+from sqlmodel.ext.asyncio.session import AsyncSession
+import msgpack
+import orjson
 
-from app.core.database import get_db
-from app.core.security import verify_token
-from app.models.user import User
+from app.core.database import async_engine
+from app.core.security import AuthIdentity, get_cached_token, verify_token
 from app.services.student_tracking_service import StudentTrackingService
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# For clients that opted in with ?enc=deflate, broadcast frames larger than this are
+# deflated once and shared by every such recipient. Compressed frames are sent as
+# binary with a one-byte flag prefix; clients inflate the rest.
+BROADCAST_COMPRESSION_THRESHOLD = 1024
+COMPRESSED_FRAME_FLAG = b"\x01"
 
-async def authenticate_websocket_user(token: str) -> Optional[User]:
+# Outbound encodings a client can request with ?enc=; inbound messages are always JSON.
+# Plain JSON clients only ever receive text frames. MessagePack frames are binary and
+# start with a map marker, never COMPRESSED_FRAME_FLAG.
+ENCODING_JSON = "json"
+ENCODING_MSGPACK = "msgpack"
+ENCODING_DEFLATE = "deflate"
+OUTBOUND_ENCODINGS = frozenset({ENCODING_JSON, ENCODING_MSGPACK, ENCODING_DEFLATE})
+
+# Reconnect storms within this window share one session-overview query
+SESSION_OVERVIEW_TTL_SECONDS = 2.0
+
+# How often connections that closed without reaching an endpoint's finally block are reaped
+CONNECTION_SWEEP_INTERVAL_SECONDS = 60
+
+# Keep-alive reply, encoded once at import
+_PONG = orjson.dumps({"type": "pong"}).decode()
+_PING = b'{"type":"ping"}'
+
+
+@functools.cache
+def _tracking() -> StudentTrackingService:
+    """Tracking service shared by WebSocket handlers, built on first use rather than at import"""
+    return StudentTrackingService()
+
+
+def encode_broadcast(message: Dict[str, Any], recipient_count: int) -> Union[str, bytes]:
+    """
+    Serialize a broadcast message once for ENCODING_DEFLATE clients, compressing it
+    when it fans out to several of them
+    """
+    payload = orjson.dumps(message)
+    if recipient_count > 1 and len(payload) > BROADCAST_COMPRESSION_THRESHOLD:
+        return COMPRESSED_FRAME_FLAG + zlib.compress(payload, 1)
+    return payload.decode()
+
+
+def _msgpack_default(obj: Any) -> Any:
+    if isinstance(obj, datetime):
+        return obj.isoformat()
+    raise TypeError(f"Cannot serialize {type(obj).__name__} to MessagePack")
+
+
+def encode_frame(message: Dict[str, Any], encoding: str, recipient_count: int = 1) -> Union[str, bytes]:
+    """Serialize a message for clients that negotiated the given encoding"""
+    if encoding == ENCODING_MSGPACK:
+        return msgpack.packb(message, use_bin_type=True, default=_msgpack_default)
+    if encoding == ENCODING_DEFLATE:
+        return encode_broadcast(message, recipient_count)
+    return orjson.dumps(message).decode()
+
+
+def negotiated_encoding(websocket: WebSocket) -> str:
+    """Outbound encoding requested by the client via the ``enc`` query parameter"""
+    encoding = websocket.query_params.get("enc")
+    return encoding if encoding in OUTBOUND_ENCODINGS else ENCODING_JSON
+
+
+async def send_frame(websocket: WebSocket, frame: Union[str, bytes]):
+    """Send a pre-encoded frame as text or binary depending on its type"""
+    if isinstance(frame, bytes):
+        await websocket.send_bytes(frame)
+    else:
+        await websocket.send_text(frame)
+
+
+async def receive_raw(websocket: WebSocket) -> bytes:
+    """Receive the raw payload of the next text or binary frame"""
+    message = await websocket.receive()
+    if message["type"] == "websocket.disconnect":
+        raise WebSocketDisconnect(message.get("code", 1000))
+    text = message.get("text")
+    return text.encode() if text is not None else (message.get("bytes") or b"")
+
+
+def is_ping(raw: bytes) -> bool:
+    """Cheap byte-level check for a {"type": "ping"} keep-alive, without parsing JSON"""
+    return len(raw) < 32 and raw.replace(b" ", b"") == _PING
+
+
+async def receive_message(websocket: WebSocket) -> Dict[str, Any]:
+    """Receive a JSON message (text or binary frame) and parse it with orjson"""
+    return orjson.loads(await receive_raw(websocket))
+
+
+async def send_message(websocket: WebSocket, data: Dict[str, Any]):
+    """Serialize a message with orjson and send it as a text frame"""
+    await websocket.send_text(orjson.dumps(data).decode())
+
+
+async def authenticate_websocket_user(token: str) -> Optional[AuthIdentity]:
     """Authenticate user from WebSocket token"""
     if not token:
         return None
     
     try:
-        token_data = verify_token(token)
+        # Reconnecting clients hit the cache; fresh tokens are decoded off the event loop
+        token_data = get_cached_token(token)
+        if token_data is None:
+            token_data = await asyncio.get_running_loop().run_in_executor(
+                None, verify_token, token
+            )
         if not token_data:
             return None
         
-        # Create user object from token data
-        user = User(
-            id=token_data.user_id or 1,
-            username=token_data.username or "test_user",
-            email=f"{token_data.username or 'test'}@example.com", 
-            full_name=token_data.username or "Test User",
-            role=token_data.role or "student"
-        )
-        return user
+        return AuthIdentity.from_token_data(token_data)
     except Exception as e:
-        logger.error(f"WebSocket authentication error: {e}")
+        logger.error("WebSocket authentication error: %s", e)
         return None
 
 
+@dataclass
+class PeerArray:
+    """Parallel id/socket arrays with reverse indexes for O(1) lookup and swap-remove"""
+    ids: List[int] = field(default_factory=list)
+    sockets: List[WebSocket] = field(default_factory=list)
+    _index_by_id: Dict[int, int] = field(default_factory=dict, repr=False)
+    _index_by_socket: Dict[WebSocket, int] = field(default_factory=dict, repr=False)
+    
+    def __len__(self) -> int:
+        return len(self.sockets)
+    
+    def upsert(self, user_id: int, websocket: WebSocket):
+        """Add a peer, replacing any stale socket held for the same user"""
+        index = self._index_by_id.get(user_id)
+        if index is None:
+            index = len(self.sockets)
+            self._index_by_id[user_id] = index
+            self.ids.append(user_id)
+            self.sockets.append(websocket)
+        else:
+            self._index_by_socket.pop(self.sockets[index], None)
+            self.sockets[index] = websocket
+        self._index_by_socket[websocket] = index
+    
+    def remove(self, websocket: WebSocket):
+        """Remove a socket by swapping the last entry into its slot"""
+        index = self._index_by_socket.pop(websocket, None)
+        if index is None:
+            return
+        del self._index_by_id[self.ids[index]]
+        
+        last = len(self.sockets) - 1
+        if index != last:
+            moved_id, moved_socket = self.ids[last], self.sockets[last]
+            self.ids[index] = moved_id
+            self.sockets[index] = moved_socket
+            self._index_by_id[moved_id] = index
+            self._index_by_socket[moved_socket] = index
+        self.ids.pop()
+        self.sockets.pop()
+    
+    def get(self, user_id: int) -> Optional[WebSocket]:
+        """Get the socket for a connected user, if any"""
+        index = self._index_by_id.get(user_id)
+        return self.sockets[index] if index is not None else None
+
+
+@dataclass
+class SessionPeers:
+    """Connections for a single session, stored as parallel arrays for tight broadcast loops"""
+    instructors: PeerArray = field(default_factory=PeerArray)
+    students: PeerArray = field(default_factory=PeerArray)
+    
+    @property
+    def is_empty(self) -> bool:
+        return not self.instructors and not self.students
+
+
 class ConnectionManager:
     """Manages WebSocket connections for real-time communication"""
     
     def __init__(self):
-        # Instructor connections: {session_id: {instructor_id: websocket}}
-        self.instructor_connections: Dict[int, Dict[int, WebSocket]] = {}
-        
-        # Student connections: {session_id: {student_id: websocket}}
-        self.student_connections: Dict[int, Dict[int, WebSocket]] = {}
+        # Per-session peers: {session_id: SessionPeers}
+        self.peers: Dict[int, SessionPeers] = {}
         
         # Connection metadata
         self.connection_metadata: Dict[WebSocket, Dict[str, Any]] = {}
         
-        self.tracking_service = StudentTrackingService()
+        # (epoch seconds, ISO string) reused by every message built within the same tick
+        self._ts_cache: Tuple[float, str] = (0.0, "")
+        
+        # Encoded session_overview frames, kept only while the session has connections:
+        # {session_id: {encoding: (cached_at, frame)}}
+        self._overview_cache: Dict[int, Dict[str, Tuple[float, Union[str, bytes]]]] = {}
+        
+        # Background task reaping silently closed sockets
+        self._sweeper: Optional[asyncio.Task] = None
+    
+    def start_sweeper(self):
+        """Start the periodic stale-connection sweep (idempotent)"""
+        if self._sweeper is None or self._sweeper.done():
+            self._sweeper = asyncio.create_task(self._sweep_stale_connections())
+    
+    def stop_sweeper(self):
+        """Cancel the stale-connection sweep"""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            self._sweeper = None
+    
+    async def _sweep_stale_connections(self):
+        while True:
+            await asyncio.sleep(CONNECTION_SWEEP_INTERVAL_SECONDS)
+            for websocket in list(self.connection_metadata):
+                if (
+                    websocket.client_state == WebSocketState.DISCONNECTED
+                    or websocket.application_state == WebSocketState.DISCONNECTED
+                ):
+                    self.disconnect(websocket)
+    
+    async def _broadcast_to_instructors(
+        self, peers: SessionPeers, message: Dict[str, Any]
+    ) -> List[Tuple[int, Exception]]:
+        """Send one encoded frame to every instructor concurrently; drop and report failed sockets"""
+        instructor_ids, instructor_sockets = peers.instructors.ids[:], peers.instructors.sockets[:]
+        
+        # Encode once per negotiated encoding, not once per socket
+        encodings = [self._encoding(websocket) for websocket in instructor_sockets]
+        frames = {
+            encoding: encode_frame(message, encoding, count)
+            for encoding, count in Counter(encodings).items()
+        }
+        results = await asyncio.gather(
+            *(
+                send_frame(websocket, frames[encoding])
+                for websocket, encoding in zip(instructor_sockets, encodings)
+            ),
+            return_exceptions=True
+        )
+        
+        failures = []
+        for index, result in enumerate(results):
+            if isinstance(result, Exception):
+                failures.append((instructor_ids[index], result))
+                self.disconnect(instructor_sockets[index])
+        return failures
+    
+    def _encoding(self, websocket: WebSocket) -> str:
+        metadata = self.connection_metadata.get(websocket)
+        return metadata["encoding"] if metadata else ENCODING_JSON
+    
+    def _now_iso(self) -> str:
+        """Current UTC time as ISO string, cached for ~10ms to avoid re-formatting per message"""
+        now = time.time()
+        if now - self._ts_cache[0] > 0.010:
+            self._ts_cache = (now, datetime.utcfromtimestamp(now).isoformat())
+        return self._ts_cache[1]
 
     async def connect_instructor(
         self, 
         websocket: WebSocket, 
         session_id: int, 
         instructor_id: int,
-        instructor_name: str
+        instructor_name: str,
+        encoding: str = ENCODING_JSON
     ):
         """Connect instructor to session monitoring"""
         await websocket.accept()
         
-        if session_id not in self.instructor_connections:
-            self.instructor_connections[session_id] = {}
-        
-        self.instructor_connections[session_id][instructor_id] = websocket
+        self.peers.setdefault(session_id, SessionPeers()).instructors.upsert(instructor_id, websocket)
         
         # Store metadata
         self.connection_metadata[websocket] = {
@@ -81,10 +299,11 @@ class ConnectionManager:
             "session_id": session_id,
             "user_id": instructor_id,
             "user_name": instructor_name,
+            "encoding": encoding,
             "connected_at": datetime.utcnow()
         }
         
-        logger.info(f"Instructor {instructor_name} connected to session {session_id}")
+        logger.info("Instructor %s connected to session %s", instructor_name, session_id)
         
         # Send initial session state
         await self.send_session_overview(websocket, session_id)
@@ -94,15 +313,13 @@ class ConnectionManager:
         websocket: WebSocket, 
         session_id: int, 
         student_id: int,
-        student_name: str
+        student_name: str,
+        encoding: str = ENCODING_JSON
     ):
         """Connect student for real-time progress updates"""
         await websocket.accept()
         
-        if session_id not in self.student_connections:
-            self.student_connections[session_id] = {}
-        
-        self.student_connections[session_id][student_id] = websocket
+        self.peers.setdefault(session_id, SessionPeers()).students.upsert(student_id, websocket)
         
         # Store metadata
         self.connection_metadata[websocket] = {
@@ -110,66 +327,64 @@ class ConnectionManager:
             "session_id": session_id,
             "user_id": student_id,
             "user_name": student_name,
+            "encoding": encoding,
             "connected_at": datetime.utcnow()
         }
         
-        logger.info(f"Student {student_name} connected to session {session_id}")
+        logger.info("Student %s connected to session %s", student_name, session_id)
         
         # Notify instructors of student connection
         await self.notify_instructors_student_joined(session_id, student_id, student_name)
 
     def disconnect(self, websocket: WebSocket):
-        """Handle disconnection"""
+        """Drop a connection from metadata and its session's peers; safe to call more than once"""
         if websocket not in self.connection_metadata:
             return
         
         metadata = self.connection_metadata[websocket]
         session_id = metadata["session_id"]
-        user_id = metadata["user_id"]
         user_type = metadata["type"]
         user_name = metadata["user_name"]
         
         # Remove from appropriate connections
-        if user_type == "instructor":
-            if session_id in self.instructor_connections:
-                self.instructor_connections[session_id].pop(user_id, None)
-                if not self.instructor_connections[session_id]:
-                    del self.instructor_connections[session_id]
-        else:  # student
-            if session_id in self.student_connections:
-                self.student_connections[session_id].pop(user_id, None)
-                if not self.student_connections[session_id]:
-                    del self.student_connections[session_id]
+        peers = self.peers.get(session_id)
+        if peers:
+            if user_type == "instructor":
+                peers.instructors.remove(websocket)
+            else:  # student
+                peers.students.remove(websocket)
+            if peers.is_empty:
+                del self.peers[session_id]
+                self._overview_cache.pop(session_id, None)
         
         # Clean up metadata
         del self.connection_metadata[websocket]
         
-        logger.info(f"{user_type.title()} {user_name} disconnected from session {session_id}")
+        logger.info("%s %s disconnected from session %s", user_type.title(), user_name, session_id)
 
     async def send_struggle_alert(self, session_id: int, struggle_data: Dict[str, Any]):
         """Send struggle alert to all instructors monitoring the session"""
-        if session_id not in self.instructor_connections:
+        self._overview_cache.pop(session_id, None)
+        peers = self.peers.get(session_id)
+        if not peers or not peers.instructors:
             return
         
         message = {
             "type": "struggle_alert",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._now_iso(),
             "data": struggle_data
         }
         
         # Send to all instructors monitoring this session
-        disconnected_connections = []
-        for instructor_id, websocket in self.instructor_connections[session_id].items():
-            try:
-                await websocket.send_json(message)
-                logger.info(f"Struggle alert sent to instructor {instructor_id} for session {session_id}")
-            except Exception as e:
-                logger.error(f"Failed to send struggle alert to instructor {instructor_id}: {e}")
-                disconnected_connections.append(websocket)
-        
-        # Clean up disconnected connections
-        for websocket in disconnected_connections:
-            self.disconnect(websocket)
+        instructor_count = len(peers.instructors)
+        failures = await self._broadcast_to_instructors(peers, message)
+        for instructor_id, error in failures:
+            logger.error("Failed to send struggle alert to instructor %s: %s", instructor_id, error)
+        
+        logger.info(
+            "Struggle alert sent to %s instructors for session %s",
+            instructor_count - len(failures), session_id
+        )
 
     async def send_student_activity_update(
         self, 
@@ -178,12 +393,14 @@ class ConnectionManager:
         activity_data: Dict[str, Any]
     ):
         """Send real-time student activity updates to instructors"""
-        if session_id not in self.instructor_connections:
+        self._overview_cache.pop(session_id, None)
+        peers = self.peers.get(session_id)
+        if not peers or not peers.instructors:
             return
         
         message = {
             "type": "student_activity_update",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._now_iso(),
             "data": {
                 "student_id": student_id,
                 "updates": activity_data
@@ -191,11 +408,8 @@ class ConnectionManager:
         }
         
         # Send to all instructors
-        for instructor_id, websocket in self.instructor_connections[session_id].items():
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to send activity update to instructor {instructor_id}: {e}")
+        for instructor_id, error in await self._broadcast_to_instructors(peers, message):
+            logger.error("Failed to send activity update to instructor %s: %s", instructor_id, error)
 
     async def send_progress_update(
         self, 
@@ -208,36 +422,46 @@ class ConnectionManager:
         await self.send_student_activity_update(session_id, student_id, progress_data)
         
         # Send to the student
-        if (session_id in self.student_connections and 
-            student_id in self.student_connections[session_id]):
-            
+        peers = self.peers.get(session_id)
+        websocket = peers.students.get(student_id) if peers else None
+        if websocket:
             message = {
                 "type": "progress_update",
-                "timestamp": datetime.utcnow().isoformat(),
+                "timestamp": self._now_iso(),
                 "data": progress_data
             }
             
             try:
-                websocket = self.student_connections[session_id][student_id]
-                await websocket.send_json(message)
+                await send_frame(websocket, encode_frame(message, self._encoding(websocket)))
             except Exception as e:
-                logger.error(f"Failed to send progress update to student {student_id}: {e}")
+                logger.error("Failed to send progress update to student %s: %s", student_id, e)
+                self.disconnect(websocket)
 
     async def send_session_overview(self, websocket: WebSocket, session_id: int):
         """Send current session overview to newly connected instructor"""
         try:
-            # Get current session state from tracking service
-            overview = await self.tracking_service.get_session_overview(session_id)
-            
-            message = {
-                "type": "session_overview",
-                "timestamp": datetime.utcnow().isoformat(),
-                "data": overview
-            }
+            encoding = self._encoding(websocket)
+            entry = self._overview_cache.get(session_id, {}).get(encoding)
+            if entry and time.time() - entry[0] < SESSION_OVERVIEW_TTL_SECONDS:
+                frame = entry[1]
+            else:
+                # Get current session state from tracking service
+                async with AsyncSession(async_engine) as db:
+                    overview = await _tracking().get_session_overview(session_id, db)
+                
+                message = {
+                    "type": "session_overview",
+                    "timestamp": self._now_iso(),
+                    "data": overview
+                }
+                frame = encode_frame(message, encoding)
+                # Skip caching if every connection left while the overview was loading
+                if session_id in self.peers:
+                    self._overview_cache.setdefault(session_id, {})[encoding] = (time.time(), frame)
             
-            await websocket.send_json(message)
+            await send_frame(websocket, frame)
         except Exception as e:
-            logger.error(f"Failed to send session overview: {e}")
+            logger.error("Failed to send session overview: %s", e)
 
     async def notify_instructors_student_joined(
         self, 
@@ -246,35 +470,31 @@ class ConnectionManager:
         student_name: str
     ):
         """Notify instructors when a student joins the session"""
-        if session_id not in self.instructor_connections:
+        peers = self.peers.get(session_id)
+        if not peers or not peers.instructors:
             return
         
         message = {
             "type": "student_joined",
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": self._now_iso(),
             "data": {
                 "student_id": student_id,
                 "student_name": student_name
             }
         }
         
-        for instructor_id, websocket in self.instructor_connections[session_id].items():
-            try:
-                await websocket.send_json(message)
-            except Exception as e:
-                logger.error(f"Failed to notify instructor {instructor_id} of student join: {e}")
+        for instructor_id, error in await self._broadcast_to_instructors(peers, message):
+            logger.error("Failed to notify instructor %s of student join: %s", instructor_id, error)
 
     def get_connected_students(self, session_id: int) -> List[int]:
         """Get list of currently connected students for a session"""
-        if session_id not in self.student_connections:
-            return []
-        return list(self.student_connections[session_id].keys())
+        peers = self.peers.get(session_id)
+        return list(peers.students.ids) if peers else []
 
     def get_connected_instructors(self, session_id: int) -> List[int]:
         """Get list of currently connected instructors for a session"""
-        if session_id not in self.instructor_connections:
-            return []
-        return list(self.instructor_connections[session_id].keys())
+        peers = self.peers.get(session_id)
+        return list(peers.instructors.ids) if peers else []
 
 
 # Global connection manager instance
@@ -284,8 +504,7 @@ manager = ConnectionManager()
 @router.websocket("/ws/instructor/{session_id}")
 async def instructor_websocket(
     websocket: WebSocket, 
-    session_id: int,
-    db: Session = Depends(get_db)
+    session_id: int
 ):
     """WebSocket endpoint for instructor real-time monitoring"""
     user = None
@@ -312,24 +531,25 @@ async def instructor_websocket(
             websocket, 
             session_id, 
             user.id,
-            user.full_name or user.username
+            user.full_name or user.username,
+            negotiated_encoding(websocket)
         )
         
         # Keep connection alive and handle messages
         while True:
             try:
-                data = await websocket.receive_json()
-                await handle_instructor_message(data, session_id, websocket, db)
+                data = await receive_message(websocket)
+                await handle_instructor_message(data, session_id, websocket)
             except WebSocketDisconnect:
                 break
             except Exception as e:
-                logger.error(f"Error handling instructor message: {e}")
+                logger.error("Error handling instructor message: %s", e)
                 break
                 
     except WebSocketDisconnect:
-        logger.info(f"Instructor WebSocket disconnected from session {session_id}")
+        logger.info("Instructor WebSocket disconnected from session %s", session_id)
     except Exception as e:
-        logger.error(f"Instructor WebSocket error: {e}")
+        logger.error("Instructor WebSocket error: %s", e)
     finally:
         if websocket:
             manager.disconnect(websocket)
@@ -338,8 +558,7 @@ async def instructor_websocket(
 @router.websocket("/ws/student/{session_id}")
 async def student_websocket(
     websocket: WebSocket, 
-    session_id: int,
-    db: Session = Depends(get_db)
+    session_id: int
 ):
     """WebSocket endpoint for student real-time updates"""
     user = None
@@ -361,24 +580,30 @@ async def student_websocket(
             websocket, 
             session_id, 
             user.id,
-            user.full_name or user.username
+            user.full_name or user.username,
+            negotiated_encoding(websocket)
         )
         
         # Keep connection alive and handle messages
         while True:
             try:
-                data = await websocket.receive_json()
-                await handle_student_message(data, session_id, websocket, db)
+                raw = await receive_raw(websocket)
+                # Keep-alive pings dominate student traffic; answer them before JSON parsing
+                if is_ping(raw):
+                    await websocket.send_text(_PONG)
+                    continue
+                data = orjson.loads(raw)
+                await handle_student_message(data, session_id, websocket)
             except WebSocketDisconnect:
                 break
             except Exception as e:
-                logger.error(f"Error handling student message: {e}")
+                logger.error("Error handling student message: %s", e)
                 break
                 
     except WebSocketDisconnect:
-        logger.info(f"Student WebSocket disconnected from session {session_id}")
+        logger.info("Student WebSocket disconnected from session %s", session_id)
     except Exception as e:
-        logger.error(f"Student WebSocket error: {e}")
+        logger.error("Student WebSocket error: %s", e)
     finally:
         if websocket:
             manager.disconnect(websocket)
@@ -387,47 +612,49 @@ async def student_websocket(
 async def handle_instructor_message(
     data: Dict[str, Any], 
     session_id: int, 
-    websocket: WebSocket, 
-    db: Session
+    websocket: WebSocket
 ):
     """Handle incoming messages from instructors"""
     message_type = data.get("type")
     
+    # Database sessions are opened per message, only for branches that need one,
+    # so long-lived sockets do not pin pooled connections.
     if message_type == "request_student_data":
         student_id = data.get("student_id")
         if student_id:
             # Send detailed student analytics
-            student_data = await manager.tracking_service.get_detailed_student_analytics(
-                student_id, session_id, db
-            )
+            async with AsyncSession(async_engine) as db:
+                student_data = await _tracking().get_detailed_student_analytics(
+                    student_id, session_id, db
+                )
             
             response = {
                 "type": "student_analytics",
                 "data": student_data
             }
-            await websocket.send_json(response)
+            await send_message(websocket, response)
     
     elif message_type == "intervention_acknowledged":
         # Mark intervention as acknowledged
         struggle_id = data.get("struggle_id")
         if struggle_id:
-            await manager.tracking_service.acknowledge_struggle_intervention(
-                struggle_id, db
-            )
+            async with AsyncSession(async_engine) as db:
+                await _tracking().acknowledge_struggle_intervention(
+                    struggle_id, db
+                )
 
 
 async def handle_student_message(
     data: Dict[str, Any], 
     session_id: int, 
-    websocket: WebSocket, 
-    db: Session
+    websocket: WebSocket
 ):
     """Handle incoming messages from students"""
     message_type = data.get("type")
     
     if message_type == "ping":
         # Keep-alive ping
-        await websocket.send_json({"type": "pong"})
+        await websocket.send_text(_PONG)
     
     elif message_type == "request_hints":
         # Student requesting hints
@@ -2,8 +2,8 @@
 Configuration management for AI Tutor Backend
 """
 
-from typing import List, Optional
-from pydantic import validator
+from typing import Optional, Tuple
+from pydantic import ValidationInfo, field_validator
 from pydantic_settings import BaseSettings
 import os
 
@@ -41,7 +41,10 @@ class Settings(BaseSettings):
     openai_max_tokens: int = 1000
     
     # CORS
-    cors_origins: List[str] = ["http://localhost:8501", "http://localhost:3000", "http://localhost:8080", "http://localhost:5173"]
+    cors_origins: Tuple[str, ...] = ("http://localhost:8501", "http://localhost:3000", "http://localhost:8080", "http://localhost:5173")
+    
+    # Cold storage for archived telemetry partitions (local path; Parquet files)
+    cold_storage_path: str = "./cold_storage"
     
     # Code Sandbox
     code_sandbox_url: str = "http://localhost:8080"
@@ -55,19 +58,25 @@ class Settings(BaseSettings):
     log_level: str = "INFO"
     log_format: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
     
-    @validator("cors_origins", pre=True)
+    @field_validator("cors_origins", mode="before")
+    @classmethod
     def assemble_cors_origins(cls, v):
         if isinstance(v, str) and not v.startswith("["):
-            return [i.strip() for i in v.split(",")]
-        elif isinstance(v, (list, str)):
+            v = [i.strip() for i in v.split(",")]
+        elif not isinstance(v, (list, tuple, str)):
+            raise ValueError(v)
+        if isinstance(v, str):
             return v
-        raise ValueError(v)
+        # Immutable, de-duplicated allowlist (order preserved)
+        return tuple(dict.fromkeys(v))
     
-    @validator("database_url", pre=True)
-    def assemble_db_connection(cls, v, values):
+    @field_validator("database_url", mode="before")
+    @classmethod
+    def assemble_db_connection(cls, v, info: ValidationInfo):
         if isinstance(v, str) and v:
             return v
         # Fallback to component-based URL if not provided
+        values = info.data
         return (
             f"postgresql://{values.get('database_user')}:"
             f"{values.get('database_password')}@"
@@ -3,27 +3,86 @@ Database connection and session management
 """
 
 from sqlmodel import SQLModel, create_engine, Session
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import text
-from typing import Generator
+from sqlalchemy.ext.asyncio import create_async_engine
+from typing import Any, AsyncGenerator, Generator
 import logging
+import orjson
 
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
+
+def _json_serializer(value: Any) -> str:
+    """Encode JSON/JSONB column values with orjson (non-str keys allowed, as with json.dumps)"""
+    return orjson.dumps(value, option=orjson.OPT_NON_STR_KEYS).decode()
+
+
+def _sync_database_url(url: str) -> str:
+    """Translate the configured PostgreSQL URL to its psycopg (v3) driver form"""
+    scheme, _, rest = url.partition("://")
+    if scheme.startswith("postgres"):
+        return f"postgresql+psycopg://{rest}"
+    return url
+
+
+# psycopg 3 PREPAREs a statement server-side once a connection has run it this many
+# times (driver default: 5). Pooled connections live for pool_recycle and the app
+# replays a small set of ORM statements, so prepare from the second execution on
+PREPARE_THRESHOLD = 1
+
 # Create database engine
 engine = create_engine(
-    settings.database_url,
+    _sync_database_url(settings.database_url),
+    echo=settings.debug,
+    pool_size=20,
+    max_overflow=40,
+    pool_pre_ping=True,
+    pool_recycle=1800,
+    connect_args={"prepare_threshold": PREPARE_THRESHOLD},
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
+
+
+def _async_database_url(url: str) -> str:
+    """Translate the configured PostgreSQL URL to its asyncpg driver form"""
+    scheme, _, rest = url.partition("://")
+    if scheme.startswith("postgres"):
+        return f"postgresql+asyncpg://{rest}"
+    return url
+
+
+def libpq_database_url(url: str) -> str:
+    """The configured PostgreSQL URL without a SQLAlchemy driver suffix, for direct psycopg connections"""
+    scheme, _, rest = url.partition("://")
+    if scheme.startswith("postgres"):
+        return f"postgresql://{rest}"
+    return url
+
+
+# Async engine for code running on the event loop (WebSocket handlers)
+async_engine = create_async_engine(
+    _async_database_url(settings.database_url),
     echo=settings.debug,
     pool_pre_ping=True,
     pool_recycle=300,
+    pool_size=20,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+    # Batched telemetry inserts are sent as multi-row VALUES pages of this size
+    insertmanyvalues_page_size=1000,
 )
 
 
 def create_db_and_tables():
     """Create database tables"""
     try:
-        SQLModel.metadata.create_all(engine)
+        # View-backed models (info["is_view"]) are created by migrations
+        tables = [table for table in SQLModel.metadata.sorted_tables if not table.info.get("is_view")]
+        SQLModel.metadata.create_all(engine, tables=tables)
         logger.info("Database tables created successfully")
     except Exception as e:
         logger.error(f"Error creating database tables: {e}")
@@ -43,6 +102,17 @@ def get_session() -> Generator[Session, None, None]:
             session.close()
 
 
+async def get_async_session() -> AsyncGenerator[AsyncSession, None]:
+    """Get async database session"""
+    async with AsyncSession(async_engine) as session:
+        try:
+            yield session
+        except Exception as e:
+            logger.error(f"Async database session error: {e}")
+            await session.rollback()
+            raise
+
+
 # Alias for FastAPI dependency injection
 def get_db() -> Generator[Session, None, None]:
     """Get database session for FastAPI dependency injection"""
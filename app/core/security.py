@@ -3,8 +3,13 @@ Security utilities for authentication and authorization
 """
 
 from datetime import datetime, timedelta
-from typing import Optional, Union, List
-from functools import wraps
+from typing import Dict, Optional, Tuple, Union, List
+from dataclasses import dataclass
+from functools import cache, wraps
+import hashlib
+import hmac
+import time
+import redis
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from pydantic import BaseModel
@@ -31,14 +36,66 @@ class TokenData(BaseModel):
     role: Optional[str] = None
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    """Verify a password against its hash"""
-    return pwd_context.verify(plain_password, hashed_password)
+@dataclass(slots=True, frozen=True)
+class AuthIdentity:
+    """Request-scoped identity derived from a verified token (not a database row)"""
+    id: int
+    username: str
+    email: str
+    full_name: str
+    role: str
+    
+    @classmethod
+    def from_token_data(cls, token_data: TokenData) -> "AuthIdentity":
+        return cls(
+            id=token_data.user_id or 1,
+            username=token_data.username or "test_user",
+            email=f"{token_data.username or 'test'}@example.com",
+            full_name=token_data.username or "Test User",
+            role=token_data.role or "student"
+        )
+
+
+# Successful password checks are remembered briefly so repeated logins skip bcrypt
+PASSWORD_VERIFY_CACHE_TTL_SECONDS = 30
+
+
+@cache
+def _redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.redis_url, decode_responses=False)
 
 
-def get_password_hash(password: str) -> str:
-    """Get password hash"""
-    return pwd_context.hash(password)
+def _password_verify_key(plain_password: str, hashed_password: bytes) -> str:
+    # Keyed with the server secret: Redis never sees anything usable offline, and
+    # a password change (new hash) never matches an old entry
+    digest = hmac.new(
+        settings.secret_key.encode(), plain_password.encode() + b"\0" + hashed_password, hashlib.sha256
+    ).hexdigest()
+    return f"pwv:{digest}"
+
+
+def verify_password(plain_password: str, hashed_password: bytes) -> bool:
+    """Verify a password against its hash (bcrypt, with a short-lived cache of successes)"""
+    key = _password_verify_key(plain_password, hashed_password)
+    try:
+        if _redis().get(key) is not None:
+            return True
+    except redis.RedisError as e:
+        logger.warning(f"Password verify cache unavailable: {e}")
+    
+    if not pwd_context.verify(plain_password, hashed_password):
+        return False
+    
+    try:
+        _redis().setex(key, PASSWORD_VERIFY_CACHE_TTL_SECONDS, b"1")
+    except redis.RedisError as e:
+        logger.warning(f"Password verify cache unavailable: {e}")
+    return True
+
+
+def get_password_hash(password: str) -> bytes:
+    """Get password hash (stored as bytea)"""
+    return pwd_context.hash(password).encode()
 
 
 def create_access_token(
@@ -60,8 +117,45 @@ def create_access_token(
     return encoded_jwt
 
 
+# Verified token cache: {blake2b(token): (expires_at_epoch, TokenData)}
+_token_cache: Dict[bytes, Tuple[float, TokenData]] = {}
+_TOKEN_CACHE_MAX_SIZE = 10000
+
+
+def _token_cache_key(token: str) -> bytes:
+    return hashlib.blake2b(token.encode(), digest_size=16).digest()
+
+
+def get_cached_token(token: str) -> Optional[TokenData]:
+    """Return previously verified token data if it has not expired yet"""
+    entry = _token_cache.get(_token_cache_key(token))
+    if entry and entry[0] > time.time():
+        return entry[1]
+    return None
+
+
+def _cache_token(token: str, token_data: TokenData, exp: Optional[int]):
+    """Remember a verified token until its expiry (bounded by the access token lifetime)"""
+    now = time.time()
+    expires_at = now + settings.access_token_expire_minutes * 60
+    if exp is not None:
+        expires_at = min(expires_at, float(exp))
+    
+    if len(_token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+        for key in [k for k, (expiry, _) in _token_cache.items() if expiry <= now]:
+            _token_cache.pop(key, None)
+        if len(_token_cache) >= _TOKEN_CACHE_MAX_SIZE:
+            _token_cache.clear()
+    
+    _token_cache[_token_cache_key(token)] = (expires_at, token_data)
+
+
 def verify_token(token: str) -> Optional[TokenData]:
     """Verify and decode JWT token"""
+    cached = get_cached_token(token)
+    if cached is not None:
+        return cached
+    
     try:
         payload = jwt.decode(
             token, settings.secret_key, algorithms=[settings.algorithm]
@@ -76,6 +170,7 @@ def verify_token(token: str) -> Optional[TokenData]:
         token_data = TokenData(
             username=username, user_id=user_id, role=role
         )
+        _cache_token(token, token_data, payload.get("exp"))
         return token_data
     except JWTError as e:
         logger.error(f"JWT verification error: {e}")
@@ -113,17 +208,8 @@ async def get_current_user(
         if token_data is None:
             raise credentials_exception
             
-        # For now, return a mock user object
-        # In a real implementation, you would fetch from database
-        from app.models.user import User
-        user = User(
-            id=token_data.user_id or 1,
-            username=token_data.username or "test_user",
-            email=f"{token_data.username or 'test'}@example.com",
-            full_name=token_data.username or "Test User",
-            role=token_data.role or "student"
-        )
-        return user
+        # Identity comes from the token alone; no database lookup
+        return AuthIdentity.from_token_data(token_data)
         
     except Exception as e:
         logger.error(f"Error getting current user: {e}")
@@ -142,16 +228,7 @@ async def get_current_user_optional(
         if token_data is None:
             return None
             
-        # Return mock user for testing
-        from app.models.user import User
-        user = User(
-            id=token_data.user_id or 1,
-            username=token_data.username or "test_user", 
-            email=f"{token_data.username or 'test'}@example.com",
-            full_name=token_data.username or "Test User",
-            role=token_data.role or "student"
-        )
-        return user
+        return AuthIdentity.from_token_data(token_data)
         
     except Exception as e:
         logger.error(f"Error getting optional user: {e}")
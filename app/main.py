@@ -4,12 +4,19 @@ AI Tutor Backend - Main FastAPI Application
 
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.openapi.docs import get_redoc_html, get_swagger_ui_html
+from fastapi.openapi.utils import get_openapi
+from fastapi.responses import ORJSONResponse, Response
+import asyncio
+import functools
 import logging
+import time
+import orjson
 import uvicorn
 
 from app.core.config import settings
 from app.core.database import create_db_and_tables, test_connection
+from app.schemas._examples import SCHEMA_EXAMPLES
 
 # Configure logging
 logging.basicConfig(
@@ -18,12 +25,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+OPENAPI_URL = "/openapi.json"
+
 # Create FastAPI app
 app = FastAPI(
     title=settings.app_name,
     version=settings.app_version,
     description="Interactive learning platform with bubble graph navigation",
     debug=settings.debug,
+    # Encode every JSON response with orjson
+    default_response_class=ORJSONResponse,
+    # The OpenAPI document and its UIs are served below from cached bytes
+    openapi_url=None,
+    docs_url=None,
+    redoc_url=None,
 )
 
 # Add CORS middleware
@@ -62,6 +77,28 @@ async def startup_event():
     # Store in app state for dependency injection
     app.state.tracking_service = tracking_service
     app.state.websocket_manager = manager
+    manager.start_sweeper()
+    
+    # Batched telemetry writes
+    from app.services.event_ingest_service import (
+        event_ingest, code_interaction_ingest, coin_transaction_ingest, event_staging_mover
+    )
+    event_ingest.start()
+    code_interaction_ingest.start()
+    coin_transaction_ingest.start()
+    event_staging_mover.start()
+    
+    # Upcoming monthly telemetry partitions (also where pg_cron is unavailable)
+    from app.services.partition_maintenance_service import partition_maintenance
+    partition_maintenance.start()
+    
+    # student_learning_stats refresh (where pg_cron is unavailable)
+    from app.services.learning_stats_service import learning_stats_refresher
+    learning_stats_refresher.start()
+    
+    # Cache invalidation pushed from Postgres triggers
+    from app.services.cache_service import cache_invalidation_listener
+    cache_invalidation_listener.start()
     
     logger.info("Application startup complete")
 
@@ -70,32 +107,70 @@ async def startup_event():
 async def shutdown_event():
     """Cleanup on application shutdown"""
     logger.info("Shutting down application")
+    
+    from app.api.websocket import manager
+    manager.stop_sweeper()
+    
+    from app.services.event_ingest_service import (
+        event_ingest, code_interaction_ingest, coin_transaction_ingest, event_staging_mover
+    )
+    await event_ingest.stop()
+    await code_interaction_ingest.stop()
+    await coin_transaction_ingest.stop()
+    await event_staging_mover.stop()
+    
+    from app.services.partition_maintenance_service import partition_maintenance
+    await partition_maintenance.stop()
+    
+    from app.services.learning_stats_service import learning_stats_refresher
+    await learning_stats_refresher.stop()
+    
+    from app.services.cache_service import cache_invalidation_listener
+    await cache_invalidation_listener.stop()
+
+
+# Static root payload, encoded once at import
+_ROOT_BYTES = orjson.dumps({
+    "message": f"Welcome to {settings.app_name}",
+    "version": settings.app_version,
+    "status": "running",
+    "docs": "/docs"
+})
+
+# Probes within this window reuse the last database check
+HEALTH_CHECK_TTL_SECONDS = 1.0
+_health_cache = (0.0, b"")
 
 
 @app.get("/")
 async def root():
     """Root endpoint - health check"""
-    return {
-        "message": f"Welcome to {settings.app_name}",
-        "version": settings.app_version,
-        "status": "running",
-        "docs": "/docs"
-    }
+    return Response(content=_ROOT_BYTES, media_type="application/json")
 
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
+    global _health_cache
+    
+    checked_at, body = _health_cache
+    now = time.monotonic()
+    if now - checked_at < HEALTH_CHECK_TTL_SECONDS:
+        return Response(content=body, media_type="application/json")
+    
     try:
-        db_status = test_connection()
-        return {
+        # test_connection() is blocking; keep it off the event loop
+        db_status = await asyncio.get_running_loop().run_in_executor(None, test_connection)
+        body = orjson.dumps({
             "status": "healthy" if db_status else "unhealthy",
             "database": "connected" if db_status else "disconnected",
             "version": settings.app_version
-        }
+        })
+        _health_cache = (now, body)
+        return Response(content=body, media_type="application/json")
     except Exception as e:
         logger.error(f"Health check failed: {e}")
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
@@ -121,10 +196,57 @@ app.include_router(ai_analytics_router, prefix="/api/v1", tags=["AI Analytics"])
 app.include_router(websocket_router, tags=["WebSocket"])
 
 
+def custom_openapi():
+    """Build the OpenAPI document once, attaching the central schema examples"""
+    if app.openapi_schema:
+        return app.openapi_schema
+    
+    openapi_schema = get_openapi(
+        title=app.title,
+        version=app.version,
+        description=app.description,
+        routes=app.routes,
+    )
+    for name, component in openapi_schema.get("components", {}).get("schemas", {}).items():
+        # Models with distinct input/output schemas are split into Name-Input/Name-Output
+        example = SCHEMA_EXAMPLES.get(name.removesuffix("-Input").removesuffix("-Output"))
+        if example is not None:
+            component["example"] = example
+    
+    app.openapi_schema = openapi_schema
+    return app.openapi_schema
+
+
+app.openapi = custom_openapi
+
+
+@functools.cache
+def openapi_bytes() -> bytes:
+    """The OpenAPI document, encoded once"""
+    return orjson.dumps(app.openapi())
+
+
+@app.get(OPENAPI_URL, include_in_schema=False)
+async def openapi_json():
+    return Response(content=openapi_bytes(), media_type="application/json")
+
+
+@app.get("/docs", include_in_schema=False)
+async def swagger_ui():
+    return get_swagger_ui_html(openapi_url=OPENAPI_URL, title=f"{app.title} - Swagger UI")
+
+
+@app.get("/redoc", include_in_schema=False)
+async def redoc():
+    return get_redoc_html(openapi_url=OPENAPI_URL, title=f"{app.title} - ReDoc")
+
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
         host="0.0.0.0",
         port=8000,
         reload=settings.debug,
+        # Broadcasts are compressed once in the connection manager, not per socket
+        ws_per_message_deflate=False,
     ) 
\ No newline at end of file
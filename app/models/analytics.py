@@ -3,9 +3,26 @@ Analytics and gamification models
 """
 
 from typing import Optional, Dict, Any, List
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column
+from sqlmodel import SQLModel, Field, Relationship, Column, Session
+from sqlalchemy import (
+    REAL, BigInteger, CheckConstraint, Computed, DateTime, Index, Integer, LargeBinary, SmallInteger,
+    String, TypeDecorator, func, text
+)
+from sqlalchemy.dialects.postgresql import ARRAY, JSONB
+from pgvector.sqlalchemy import Vector
 from datetime import datetime
 from enum import Enum
+from functools import cache
+
+from app.utils.code_snapshots import decompress_snapshot
+
+# Generated-column expressions derived from ChatInteraction.content
+# (word count matches Python's len(content.split()))
+CHARACTER_COUNT_SQL = "length(content)"
+WORD_COUNT_SQL = (
+    r"CASE WHEN content ~ '^\s*$' THEN 0 "
+    r"ELSE array_length(regexp_split_to_array(regexp_replace(content, '^\s+|\s+$', '', 'g'), '\s+'), 1) END"
+)
 
 
 class EventType(str, Enum):
@@ -52,19 +69,124 @@ class MessageType(str, Enum):
     ENCOURAGEMENT = "encouragement"
 
 
+class CodeInteractionType(str, Enum):
+    """Kinds of code editor interaction"""
+    KEYPRESS = "keypress"
+    PASTE = "paste"
+    DELETE = "delete"
+    RUN = "run"
+    SUBMIT = "submit"
+
+
+@cache
+def enum_code(member: Enum) -> int:
+    """SMALLINT code stored for an enum member: its 1-based declaration position"""
+    return list(type(member)).index(member) + 1
+
+
+def enum_codes(enum_class) -> Dict[Enum, int]:
+    """
+    Member -> SMALLINT code table for a str Enum
+    
+    str Enum members hash and compare equal to their values, so the table
+    resolves raw strings too, without constructing the Enum.
+    """
+    return {member: enum_code(member) for member in enum_class}
+
+
+class SmallIntEnum(TypeDecorator):
+    """
+    Store a str Enum as a SMALLINT code instead of a Postgres enum label
+    
+    Codes are the members' 1-based declaration order, so enum members must only
+    ever be appended. Python and API values stay the string enums.
+    """
+    
+    impl = SmallInteger
+    cache_ok = True
+    
+    def __init__(self, enum_class):
+        super().__init__()
+        self.enum_class = enum_class
+        self._members = list(enum_class)
+        self._codes = enum_codes(enum_class)
+    
+    def process_bind_param(self, value, dialect):
+        if value is None:
+            return None
+        # Members and raw string values both resolve here; no Enum() coercion
+        try:
+            return self._codes[value]
+        except KeyError:
+            raise ValueError(f"{value!r} is not a valid {self.enum_class.__name__}") from None
+    
+    def process_result_value(self, value, dialect):
+        if value is None:
+            return None
+        return self._members[value - 1]
+
+
+def utc_now_column(**kwargs) -> Column:
+    """
+    Naive-UTC timestamp column stamped by Postgres on insert
+    
+    Matches datetime.utcnow() semantics, so leave the field unset (None) and the
+    value is loaded back after flush.
+    """
+    return Column(DateTime, server_default=text("timezone('utc', now())"), nullable=False, **kwargs)
+
+
+def timestamptz_column(**kwargs) -> Column:
+    """Timezone-aware (TIMESTAMPTZ) timestamp column; values load back as aware UTC datetimes"""
+    return Column(DateTime(timezone=True), **kwargs)
+
+
+def now_tz_column(**kwargs) -> Column:
+    """
+    TIMESTAMPTZ column stamped with now() by Postgres on insert
+    
+    Leave the field unset (None) and the value is loaded back after refresh.
+    """
+    return timestamptz_column(server_default=func.now(), nullable=False, **kwargs)
+
+
+# Resolved once at import for raw-SQL/COPY writers that bypass SmallIntEnum
+EVENT_TYPE_CODES = enum_codes(EventType)
+TRANSACTION_TYPE_CODES = enum_codes(TransactionType)
+MESSAGE_TYPE_CODES = enum_codes(MessageType)
+STRUGGLE_SEVERITY_CODES = enum_codes(StruggleSeverity)
+CODE_INTERACTION_TYPE_CODES = enum_codes(CodeInteractionType)
+
+
 class EventLog(SQLModel, table=True):
     """Track all student interactions and events for analytics"""
     
-    id: Optional[int] = Field(default=None, primary_key=True)
+    # Range-partitioned by month on timestamp; queries should bound timestamp so partitions prune
+    __table_args__ = (
+        Index(
+            "eventlog_payload_gin", "payload",
+            postgresql_using="gin", postgresql_ops={"payload": "jsonb_path_ops"}
+        ),
+        Index("ix_eventlog_student_session_ts", "student_id", "session_id", text('"timestamp" DESC')),
+        Index(
+            "ix_eventlog_student_ts_covering", "student_id", text('"timestamp" DESC'),
+            postgresql_include=["event_type", "success", "score"]
+        ),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    
+    id: Optional[int] = Field(
+        default=None, primary_key=True, sa_type=BigInteger, sa_column_kwargs={"autoincrement": True}
+    )
     
     # Event details
-    event_type: EventType
+    event_type: EventType = Field(sa_column=Column(SmallIntEnum(EventType), nullable=False))
     student_id: int = Field(foreign_key="user.id")
     session_id: Optional[int] = Field(default=None, foreign_key="session.id")
     node_id: Optional[str] = Field(default=None)
     
     # Event data
-    payload: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    payload: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
     
     # Performance metrics
     response_time_ms: Optional[int] = Field(default=None)
@@ -75,28 +197,12 @@ class EventLog(SQLModel, table=True):
     user_agent: Optional[str] = Field(default=None)
     ip_address: Optional[str] = Field(default=None)
     
-    # Timestamp
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # Timestamp (partition key, so part of the primary key)
+    timestamp: Optional[datetime] = Field(default=None, sa_column=utc_now_column(primary_key=True))
     
     # Relationships
     student: "User" = Relationship(back_populates="event_logs")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "event_type": "bubble_success",
-                "node_id": "c_major_chord",
-                "payload": {
-                    "attempts": 2,
-                    "time_spent": 45,
-                    "hints_used": 1
-                },
-                "response_time_ms": 250,
-                "success": True,
-                "score": 85.5
-            }
-        }
-    
     def __repr__(self):
         return f"<EventLog(id={self.id}, event_type={self.event_type}, student_id={self.student_id})>"
 
@@ -104,6 +210,16 @@ class EventLog(SQLModel, table=True):
 class StudentSessionTracking(SQLModel, table=True):
     """Enhanced session-level tracking building on EventLog foundation"""
     
+    __table_args__ = (
+        # Serves "completed node X" lookups: nodes_completed @> ARRAY[...] / :node = ANY(...)
+        Index("studentsessiontracking_nodes_completed_gin", "nodes_completed", postgresql_using="gin"),
+        # Analytics gathers: a student's trackings started since a cutoff
+        Index("ix_studentsessiontracking_student_start", "student_id", text("start_time DESC")),
+        CheckConstraint("progress_percentage BETWEEN 0 AND 100", name="ck_studentsessiontracking_progress"),
+        CheckConstraint("success_rate BETWEEN 0 AND 100", name="ck_studentsessiontracking_success_rate"),
+        CheckConstraint("current_struggle_score BETWEEN 0 AND 100", name="ck_studentsessiontracking_struggle"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Core identifiers
@@ -117,9 +233,10 @@ class StudentSessionTracking(SQLModel, table=True):
     
     # Progress tracking
     current_node_id: Optional[str] = None
-    progress_percentage: float = Field(default=0.0)
-    nodes_completed: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    nodes_attempted: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    # Bounded scores are REAL (4 bytes); per-session small counters are SMALLINT
+    progress_percentage: float = Field(default=0.0, sa_column=Column(REAL, nullable=False))
+    nodes_completed: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
+    nodes_attempted: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
     
     # Engagement metrics
     total_interactions: int = Field(default=0)
@@ -129,19 +246,19 @@ class StudentSessionTracking(SQLModel, table=True):
     total_code_changes: int = Field(default=0)
     
     # Performance metrics
-    success_rate: float = Field(default=0.0)
+    success_rate: float = Field(default=0.0, sa_column=Column(REAL, nullable=False))
     average_response_time_ms: float = Field(default=0.0)
-    hints_used: int = Field(default=0)
-    help_requests: int = Field(default=0)
+    hints_used: int = Field(default=0, sa_column=Column(SmallInteger, nullable=False))
+    help_requests: int = Field(default=0, sa_column=Column(SmallInteger, nullable=False))
     
-    # Struggle detection
-    current_struggle_score: float = Field(default=0.0)
-    struggle_alerts_triggered: int = Field(default=0)
-    consecutive_failures: int = Field(default=0)
+    # Struggle detection (0-100)
+    current_struggle_score: float = Field(default=0.0, sa_column=Column(REAL, nullable=False))
+    struggle_alerts_triggered: int = Field(default=0, sa_column=Column(SmallInteger, nullable=False))
+    consecutive_failures: int = Field(default=0, sa_column=Column(SmallInteger, nullable=False))
     
     # Learning insights
-    learning_style_indicators: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
-    engagement_patterns: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    learning_style_indicators: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
+    engagement_patterns: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
     
     # Relationships
     student: "User" = Relationship()
@@ -156,6 +273,10 @@ class StudentSessionTracking(SQLModel, table=True):
 class ChatInteraction(SQLModel, table=True):
     """Detailed chat interaction tracking"""
     
+    __table_args__ = (
+        Index("ix_chatinteraction_tracking_ts", "session_tracking_id", text('"timestamp" DESC')),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Core identifiers
@@ -164,15 +285,20 @@ class ChatInteraction(SQLModel, table=True):
     session_id: int = Field(foreign_key="session.id")
     
     # Message details
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
-    message_type: MessageType
+    timestamp: Optional[datetime] = Field(default=None, sa_column=utc_now_column())
+    message_type: MessageType = Field(sa_column=Column(SmallIntEnum(MessageType), nullable=False))
     content: str = Field(max_length=5000)
     node_id: Optional[str] = None
     
     # Response metrics
     response_time_ms: Optional[int] = None
-    character_count: int = Field(default=0)
-    word_count: int = Field(default=0)
+    # Computed by Postgres (GENERATED ALWAYS ... STORED); never written by the app
+    character_count: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, Computed(CHARACTER_COUNT_SQL, persisted=True))
+    )
+    word_count: Optional[int] = Field(
+        default=None, sa_column=Column(Integer, Computed(WORD_COUNT_SQL, persisted=True))
+    )
     
     # Context and analysis
     emotional_tone: Optional[str] = None  # positive, negative, neutral, frustrated, confused
@@ -184,7 +310,7 @@ class ChatInteraction(SQLModel, table=True):
     requires_human_intervention: bool = Field(default=False)
     
     # Additional metadata
-    additional_metadata: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    additional_metadata: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
     
     # Relationships
     session_tracking: StudentSessionTracking = Relationship(back_populates="chat_interactions")
@@ -196,21 +322,33 @@ class ChatInteraction(SQLModel, table=True):
 class CodeInteraction(SQLModel, table=True):
     """Detailed code interaction and change tracking"""
     
-    id: Optional[int] = Field(default=None, primary_key=True)
+    # Range-partitioned by month on timestamp; queries should bound timestamp so partitions prune
+    __table_args__ = (
+        # Covering, so per-session metric scans are index-only
+        Index(
+            "ix_codeinteraction_tracking_ts", "session_tracking_id", "timestamp",
+            postgresql_include=["characters_added", "execution_success"]
+        ),
+        CheckConstraint("completion_progress BETWEEN 0 AND 1", name="ck_codeinteraction_completion_progress"),
+        {"postgresql_partition_by": "RANGE (timestamp)"},
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True, sa_column_kwargs={"autoincrement": True})
     
     # Core identifiers
     session_tracking_id: int = Field(foreign_key="studentsessiontracking.id")
     student_id: int = Field(foreign_key="user.id")
     session_id: int = Field(foreign_key="session.id")
     
-    # Code details
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    # Code details (timestamp is the partition key, so part of the primary key)
+    timestamp: Optional[datetime] = Field(default=None, sa_column=utc_now_column(primary_key=True))
     node_id: Optional[str] = None
-    interaction_type: str = Field(default="keypress")  # keypress, paste, delete, run, submit
+    interaction_type: CodeInteractionType = Field(
+        default=CodeInteractionType.KEYPRESS,
+        sa_column=Column(SmallIntEnum(CodeInteractionType), nullable=False)
+    )
     
-    # Code content
-    code_snapshot: str = Field(max_length=10000)
-    code_diff: Optional[str] = Field(default=None, max_length=2000)
+    # Code content lives in CodeInteractionBlob, keeping this table narrow for metric scans
     language: str = Field(default="python")
     
     # Metrics
@@ -219,28 +357,71 @@ class CodeInteraction(SQLModel, table=True):
     lines_of_code: int = Field(default=0)
     
     # Analysis
-    syntax_errors: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    syntax_errors: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
     execution_result: Optional[str] = Field(default=None, max_length=2000)
     execution_success: Optional[bool] = None
     execution_time_ms: Optional[int] = None
     
     # Progress indicators
     is_significant_change: bool = Field(default=False)  # More than just typos
-    completion_progress: float = Field(default=0.0)  # 0-1 estimate of task completion
+    completion_progress: float = Field(default=0.0, sa_column=Column(REAL, nullable=False))  # 0-1 estimate of task completion
     
     # Additional metadata
-    additional_metadata: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    additional_metadata: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
     
     # Relationships
     session_tracking: StudentSessionTracking = Relationship(back_populates="code_interactions")
+    # Loaded only when accessed (playback); metric queries never touch the blob table
+    blob: Optional["CodeInteractionBlob"] = Relationship(
+        sa_relationship_kwargs={
+            "primaryjoin": "foreign(CodeInteractionBlob.interaction_id) == CodeInteraction.id",
+            "uselist": False,
+        }
+    )
+    
+    @property
+    def code_snapshot(self) -> Optional[str]:
+        """Decompressed code snapshot, if this interaction stored one"""
+        return self.blob.code_snapshot if self.blob else None
     
     def __repr__(self):
         return f"<CodeInteraction(id={self.id}, student_id={self.student_id}, interaction_type={self.interaction_type})>"
 
 
+class CodeInteractionBlob(SQLModel, table=True):
+    """Code content of a CodeInteraction, joined 1:1 on its id"""
+    
+    __tablename__ = "code_interaction_blob"
+    
+    # No foreign key: codeinteraction's key includes its partition column, and ids
+    # are unique on their own
+    interaction_id: int = Field(primary_key=True, sa_column_kwargs={"autoincrement": False})
+    
+    # zstd-compressed full snapshot; code_diff is a line delta from the client's
+    # previous code, for display only (see app.utils.code_snapshots)
+    code_snapshot_zst: Optional[bytes] = Field(default=None, sa_column=Column(LargeBinary))
+    code_diff: Optional[str] = Field(default=None, max_length=2000)
+    
+    @property
+    def code_snapshot(self) -> Optional[str]:
+        """Decompressed code snapshot, if this row stored one"""
+        if self.code_snapshot_zst is None:
+            return None
+        return decompress_snapshot(self.code_snapshot_zst)
+    
+    def __repr__(self):
+        return f"<CodeInteractionBlob(interaction_id={self.interaction_id}, has_snapshot={self.code_snapshot_zst is not None})>"
+
+
 class CodeSubmission(SQLModel, table=True):
     """Track code submissions and evaluation results"""
     
+    __table_args__ = (
+        # Attempt count and latest attempt per node are single index seeks
+        Index("ix_codesubmission_tracking_node_ts", "session_tracking_id", "node_id", text('"timestamp" DESC')),
+        Index("ix_codesubmission_student_node_ts", "student_id", "node_id", text('"timestamp" DESC')),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Core identifiers
@@ -250,7 +431,7 @@ class CodeSubmission(SQLModel, table=True):
     node_id: str
     
     # Submission details
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: Optional[datetime] = Field(default=None, sa_column=utc_now_column())
     submission_number: int = Field(default=1)  # 1st attempt, 2nd attempt, etc.
     
     # Code content
@@ -260,20 +441,20 @@ class CodeSubmission(SQLModel, table=True):
     # Evaluation results
     is_correct: bool = Field(default=False)
     score: Optional[float] = None  # 0-100 score if partial credit
-    test_results: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    test_results: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
     
     # Performance metrics
     execution_time_ms: Optional[int] = None
     memory_usage_mb: Optional[float] = None
     
     # Error analysis
-    compilation_errors: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    runtime_errors: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    logic_errors: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    compilation_errors: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
+    runtime_errors: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
+    logic_errors: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
     
     # AI feedback
     ai_feedback: Optional[str] = Field(default=None, max_length=2000)
-    suggested_improvements: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    suggested_improvements: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
     
     # Time tracking
     time_since_start_seconds: int = Field(default=0)
@@ -289,6 +470,10 @@ class CodeSubmission(SQLModel, table=True):
 class StruggleAnalysis(SQLModel, table=True):
     """Real-time struggle detection and analysis"""
     
+    __table_args__ = (
+        Index("ix_struggleanalysis_tracking", "session_tracking_id"),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Core identifiers
@@ -298,12 +483,14 @@ class StruggleAnalysis(SQLModel, table=True):
     node_id: Optional[str] = None
     
     # Detection details
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: Optional[datetime] = Field(default=None, sa_column=utc_now_column())
     struggle_score: float = Field(default=0.0)  # 0-100 scale
-    severity: StruggleSeverity = Field(default=StruggleSeverity.LOW)
+    severity: StruggleSeverity = Field(
+        default=StruggleSeverity.LOW, sa_column=Column(SmallIntEnum(StruggleSeverity), nullable=False)
+    )
     
     # Struggle indicators
-    indicators: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
+    indicators: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
     # Example indicators:
     # {
     #   "repetitive_questions": 3,
@@ -315,7 +502,7 @@ class StruggleAnalysis(SQLModel, table=True):
     
     # AI analysis
     ai_analysis: Optional[str] = Field(default=None, max_length=1000)
-    recommendations: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    recommendations: List[str] = Field(default_factory=list, sa_column=Column(JSONB))
     intervention_suggested: bool = Field(default=False)
     
     # Resolution tracking
@@ -334,9 +521,23 @@ class StruggleAnalysis(SQLModel, table=True):
         return f"<StruggleAnalysis(id={self.id}, student_id={self.student_id}, severity={self.severity}, score={self.struggle_score})>"
 
 
+# Dimensions of StudentLearningProfile.embedding
+PROFILE_EMBEDDING_DIMENSIONS = 384
+
+
 class StudentLearningProfile(SQLModel, table=True):
     """Aggregated learning insights and patterns for each student"""
     
+    __table_args__ = (
+        # Approximate nearest-neighbour search for "similar learners" (cosine distance)
+        Index(
+            "ix_studentlearningprofile_embedding", "embedding",
+            postgresql_using="ivfflat",
+            postgresql_with={"lists": 100},
+            postgresql_ops={"embedding": "vector_cosine_ops"}
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Core identifiers
@@ -352,36 +553,31 @@ class StudentLearningProfile(SQLModel, table=True):
     
     # Performance patterns
     preferred_time_of_day: Optional[str] = None  # morning, afternoon, evening
-    average_session_duration_minutes: float = Field(default=0.0)
     optimal_session_length_minutes: Optional[int] = None
     
     # Interaction patterns
-    average_response_time_ms: float = Field(default=0.0)
     preferred_help_method: Optional[str] = None  # hints, chat, examples
     collaboration_preference: Optional[str] = None  # independent, collaborative
     
     # Struggle patterns
-    common_struggle_areas: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    struggle_recovery_methods: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    common_struggle_areas: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
+    struggle_recovery_methods: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
     resilience_score: float = Field(default=50.0)  # 0-100 scale
     
     # Motivation patterns
-    motivation_drivers: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    engagement_triggers: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    motivation_drivers: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
+    engagement_triggers: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
     
-    # Progress metrics
-    overall_success_rate: float = Field(default=0.0)
+    # Progress metrics (aggregates live in StudentLearningStats)
     average_completion_time_ratio: float = Field(default=1.0)  # actual/expected time
     consistency_score: float = Field(default=50.0)  # 0-100 scale
     
     # AI insights
-    ai_generated_insights: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSON))
-    personalized_recommendations: List[str] = Field(default_factory=list, sa_column=Column(JSON))
+    ai_generated_insights: Dict[str, Any] = Field(default_factory=dict, sa_column=Column(JSONB))
+    personalized_recommendations: List[str] = Field(default_factory=list, sa_column=Column(ARRAY(String)))
     
-    # Statistical data
-    total_sessions: int = Field(default=0)
-    total_study_time_hours: float = Field(default=0.0)
-    last_activity_date: Optional[datetime] = None
+    # Embedding of the profile's style/insight fields, for similarity search
+    embedding: Optional[List[float]] = Field(default=None, sa_column=Column(Vector(PROFILE_EMBEDDING_DIMENSIONS)))
     
     # Relationships
     student: "User" = Relationship()
@@ -390,14 +586,41 @@ class StudentLearningProfile(SQLModel, table=True):
         return f"<StudentLearningProfile(id={self.id}, student_id={self.student_id}, learning_style={self.learning_style})>"
 
 
+class StudentLearningStats(SQLModel, table=True):
+    """Per-student aggregates, read from the student_learning_stats materialized view"""
+    
+    __tablename__ = "student_learning_stats"
+    # Created and refreshed by migrations/pg_cron, never by create_all
+    __table_args__ = {"info": {"is_view": True}}
+    
+    student_id: int = Field(primary_key=True)
+    
+    # Session aggregates (studentsessiontracking)
+    total_sessions: int = Field(default=0)
+    total_study_time_hours: float = Field(default=0.0)
+    average_session_duration_minutes: float = Field(default=0.0)
+    last_activity_date: Optional[datetime] = None
+    
+    # Event aggregates (eventlog)
+    average_response_time_ms: float = Field(default=0.0)
+    overall_success_rate: float = Field(default=0.0)
+    
+    def __repr__(self):
+        return f"<StudentLearningStats(student_id={self.student_id}, total_sessions={self.total_sessions})>"
+
+
 class CoinTransaction(SQLModel, table=True):
     """Track coin transactions for gamification"""
     
+    __table_args__ = (
+        Index("ix_cointransaction_student_created", "student_id", text("created_at DESC")),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     
     # Transaction details
     student_id: int = Field(foreign_key="user.id")
-    transaction_type: TransactionType
+    transaction_type: TransactionType = Field(sa_column=Column(SmallIntEnum(TransactionType), nullable=False))
     amount: int  # Can be positive (earned) or negative (spent)
     
     # Context
@@ -406,34 +629,18 @@ class CoinTransaction(SQLModel, table=True):
     description: str = Field(max_length=200)
     
     # Transaction metadata
-    transaction_metadata: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    transaction_metadata: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
     
     # Balances (for easier queries)
     balance_before: int = Field(default=0)
     balance_after: int = Field(default=0)
     
     # Timestamp
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: Optional[datetime] = Field(default=None, sa_column=utc_now_column())
     
     # Relationships
     student: "User" = Relationship(back_populates="coin_transactions")
     
-    class Config:
-        json_schema_extra = {
-            "example": {
-                "transaction_type": "earned",
-                "amount": 15,
-                "node_id": "c_major_chord",
-                "description": "Completed C Major Chord task",
-                "balance_before": 25,
-                "balance_after": 40,
-                "transaction_metadata": {
-                    "bonus_multiplier": 1.5,
-                    "completion_time": 30
-                }
-            }
-        }
-    
     def __repr__(self):
         return f"<CoinTransaction(id={self.id}, student_id={self.student_id}, amount={self.amount}, type={self.transaction_type})>"
     
@@ -445,4 +652,24 @@ class CoinTransaction(SQLModel, table=True):
     @property
     def is_spending(self) -> bool:
         """Check if this is a spending transaction"""
-        return self.transaction_type == TransactionType.SPENT 
\ No newline at end of file
+        return self.transaction_type == TransactionType.SPENT
+
+
+class StudentBalance(SQLModel, table=True):
+    """Current coin balance per student, maintained by a trigger on cointransaction inserts"""
+    
+    __tablename__ = "student_balance"
+    
+    student_id: int = Field(foreign_key="user.id", primary_key=True)
+    balance: int = Field(default=0)
+    version: int = Field(default=0)  # Number of transactions applied
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<StudentBalance(student_id={self.student_id}, balance={self.balance})>"
+
+
+def get_coin_balance(student_id: int, db: Session) -> int:
+    """Current coin balance for a student (0 before their first transaction)"""
+    balance = db.get(StudentBalance, student_id)
+    return balance.balance if balance else 0 
\ No newline at end of file
@@ -38,23 +38,6 @@ class Course(SQLModel, table=True):
     instructor: "User" = Relationship(back_populates="created_courses")
     sessions: List["Session"] = Relationship(back_populates="course")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "name": "Guitar Chords 101",
-                "description": "Learn basic guitar chords through interactive lessons",
-                "subject": "Music",
-                "difficulty_level": "beginner",
-                "estimated_duration": 120,
-                "learning_objectives": [
-                    "Master basic major and minor chords",
-                    "Understand chord progressions",
-                    "Play simple songs"
-                ],
-                "tags": {"instrument": "guitar", "style": "acoustic"}
-            }
-        }
-    
     def __repr__(self):
         return f"<Course(id={self.id}, name={self.name}, instructor_id={self.instructor_id})>"
     
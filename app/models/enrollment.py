@@ -4,12 +4,26 @@ Course enrollment model
 
 from typing import Optional
 from sqlmodel import SQLModel, Field, Relationship
+from sqlalchemy import Index, text
 from datetime import datetime
 
+# Columns the enrollment list reads, carried in enrollment_list_idx so the page
+# query is an index-only scan
+ENROLLMENT_LIST_COLUMNS = (
+    "id", "student_id", "status", "progress_percentage", "completed_at", "last_accessed_at"
+)
+
 
 class CourseEnrollment(SQLModel, table=True):
     """Track student enrollments in courses"""
     
+    __table_args__ = (
+        Index(
+            "enrollment_list_idx", "course_id", text("enrolled_at DESC"),
+            postgresql_include=list(ENROLLMENT_LIST_COLUMNS)
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key="user.id")
     course_id: int = Field(foreign_key="course.id") 
@@ -27,15 +41,5 @@ class CourseEnrollment(SQLModel, table=True):
     student: "User" = Relationship()
     course: "Course" = Relationship()
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "student_id": 1,
-                "course_id": 1,
-                "status": "active",
-                "progress_percentage": 0.0
-            }
-        }
-    
     def __repr__(self):
         return f"<CourseEnrollment(student_id={self.student_id}, course_id={self.course_id}, status={self.status})>" 
\ No newline at end of file
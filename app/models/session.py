@@ -3,11 +3,16 @@ Session, BubbleNode, and StudentState models
 Core models for the bubble graph learning experience
 """
 
-from typing import Optional, List, Dict, Any
-from sqlmodel import SQLModel, Field, Relationship, JSON, Column
-from datetime import datetime
+from typing import Optional, List, Dict, Any, Literal, Set
+from sqlmodel import SQLModel, Field, Relationship, Column
+from sqlalchemy import Index, TypeDecorator, UniqueConstraint, and_, text
+from sqlalchemy.dialects.postgresql import JSONB
+from datetime import datetime, timezone
 from enum import Enum
 
+from app.models.analytics import now_tz_column, timestamptz_column
+from app.utils.graph_packing import pack_graph, unpack_graph
+
 
 class BubbleType(str, Enum):
     """Types of learning bubbles"""
@@ -25,9 +30,45 @@ class SessionStatus(str, Enum):
     ARCHIVED = "archived"
 
 
+class PackedGraphJSON(TypeDecorator):
+    """
+    JSONB holding a bubble graph in the short-key layout of pack_graph()
+    
+    The application always sees the full layout; bound values (including @>
+    probes) are packed on the way in.
+    """
+    
+    impl = JSONB
+    cache_ok = True
+    
+    def process_bind_param(self, value, dialect):
+        return pack_graph(value)
+    
+    def process_result_value(self, value, dialect):
+        return unpack_graph(value)
+
+
 class Session(SQLModel, table=True):
     """Learning session with bubble graph structure"""
     
+    __table_args__ = (
+        # Serves graph containment (@>) lookups, e.g. Session.has_node()
+        Index(
+            "session_graph_json_gin", "graph_json",
+            postgresql_using="gin", postgresql_ops={"graph_json": "jsonb_path_ops"}
+        ),
+        # Range scans for Session.active_at(); status is stored by enum name
+        Index(
+            "session_active_idx", "start_time", "end_time",
+            postgresql_where=text("status = 'PUBLISHED'")
+        ),
+        # Per-course listings and counts, index-only
+        Index(
+            "session_list_idx", "course_id", text("start_time DESC"),
+            postgresql_include=["name", "status"]
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     name: str = Field(min_length=1, max_length=200)
     description: Optional[str] = Field(default=None, max_length=1000)
@@ -37,44 +78,33 @@ class Session(SQLModel, table=True):
     status: SessionStatus = Field(default=SessionStatus.DRAFT)
     
     # Session scheduling
-    start_time: datetime = Field(description="When the session starts")
-    end_time: datetime = Field(description="When the session ends")
-    
-    # Bubble graph structure stored as JSON
-    graph_json: Dict[str, Any] = Field(sa_column=Column(JSON))
+    start_time: datetime = Field(
+        sa_column=timestamptz_column(nullable=False), description="When the session starts"
+    )
+    end_time: datetime = Field(
+        sa_column=timestamptz_column(nullable=False), description="When the session ends"
+    )
+    
+    # Bubble graph structure stored as JSONB
+    graph_json: Dict[str, Any] = Field(sa_column=Column(PackedGraphJSON))
+    # Navigation index derived from graph_json whenever it is written (see build_graph_index)
+    graph_index_json: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
     
     # Session settings
     max_attempts_per_bubble: int = Field(default=3)
     coins_per_bubble: int = Field(default=10)
     time_limit_minutes: Optional[int] = Field(default=None)
     
-    # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = Field(default=None)
-    published_at: Optional[datetime] = Field(default=None)
+    # Timestamps (TIMESTAMPTZ; created_at is set by Postgres)
+    created_at: Optional[datetime] = Field(default=None, sa_column=now_tz_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=timestamptz_column())
+    published_at: Optional[datetime] = Field(default=None, sa_column=timestamptz_column())
     
     # Relationships
     course: "Course" = Relationship(back_populates="sessions")
     bubble_nodes: List["BubbleNode"] = Relationship(back_populates="session")
     student_states: List["StudentState"] = Relationship(back_populates="session")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "name": "Basic Chord Progression",
-                "description": "Learn C-Am-F-G chord progression",
-                "graph_json": {
-                    "nodes": [
-                        {"id": "start", "type": "concept", "title": "Welcome"},
-                        {"id": "c_chord", "type": "task", "title": "C Major Chord"}
-                    ],
-                    "edges": [
-                        {"from": "start", "to": "c_chord"}
-                    ]
-                }
-            }
-        }
-    
     def __repr__(self):
         return f"<Session(id={self.id}, name={self.name}, course_id={self.course_id})>"
     
@@ -83,36 +113,97 @@ class Session(SQLModel, table=True):
         """Check if session is published"""
         return self.status == SessionStatus.PUBLISHED
     
+    def status_at(self, now: datetime) -> Literal["active", "upcoming", "past", "draft"]:
+        """Schedule state at `now`; list endpoints read the clock once and pass it in"""
+        if now > self.end_time:
+            return "past"
+        if not self.is_published:
+            return "draft"
+        if now < self.start_time:
+            return "upcoming"
+        return "active"
+    
+    # Single-instance display helpers; not for bulk use (filter with active_at() instead)
     @property
     def is_active(self) -> bool:
         """Check if session is currently active"""
-        now = datetime.utcnow()
-        return self.is_published and self.start_time <= now <= self.end_time
+        return self.status_at(datetime.now(timezone.utc)) == "active"
     
     @property
     def is_upcoming(self) -> bool:
         """Check if session is upcoming"""
-        now = datetime.utcnow()
-        return self.is_published and now < self.start_time
+        return self.status_at(datetime.now(timezone.utc)) == "upcoming"
     
     @property
     def is_past(self) -> bool:
         """Check if session is past"""
-        now = datetime.utcnow()
-        return now > self.end_time
+        return self.status_at(datetime.now(timezone.utc)) == "past"
+    
+    @classmethod
+    def active_at(cls, now: datetime):
+        """SQL filter for sessions active at `now` (served by session_active_idx)"""
+        return and_(
+            cls.status == SessionStatus.PUBLISHED,
+            cls.start_time <= now,
+            cls.end_time >= now
+        )
+    
+    @classmethod
+    def has_node(cls, node_id: str):
+        """SQL filter for sessions whose graph contains node_id (index-backed containment)"""
+        return cls.graph_json.contains({"nodes": [{"id": node_id}]})
+    
+    @staticmethod
+    def build_graph_index(graph_json: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Build the navigation index for a graph:
+        {"start": start_node, "adj": {node_id: [next_ids]}, "types": {node_id: type}}
+        """
+        graph_json = graph_json or {}
+        nodes = graph_json.get("nodes", [])
+        adjacency: Dict[str, List[str]] = {node["id"]: [] for node in nodes}
+        for edge in graph_json.get("edges", []):
+            adjacency.setdefault(edge["from_node"], []).append(edge["to_node"])
+        return {
+            "start": graph_json.get("start_node"),
+            "adj": adjacency,
+            "types": {node["id"]: node.get("type") for node in nodes},
+        }
+    
+    def set_graph(self, graph_json: Dict[str, Any]):
+        """Replace the graph and its navigation index together"""
+        self.graph_json = graph_json
+        self.graph_index_json = self.build_graph_index(graph_json)
+    
+    @property
+    def graph_index(self) -> Dict[str, Any]:
+        """Navigation index, built on the fly for rows written before it existed"""
+        return self.graph_index_json or self.build_graph_index(self.graph_json)
     
     def get_start_node_id(self) -> Optional[str]:
         """Get the starting node ID from graph"""
-        if not self.graph_json or "start_node" not in self.graph_json:
-            return None
-        return self.graph_json["start_node"]
+        return self.graph_index["start"]
 
 
 class BubbleNode(SQLModel, table=True):
     """Individual learning bubble/node in a session"""
     
+    __table_args__ = (
+        # Every lookup is by (session_id, node_id); node_id is only unique per session
+        Index("ix_bubble_session_node", "session_id", "node_id", unique=True),
+        # Containment (@>) lookups on task metadata, e.g. BubbleNode.test_cases_contain()
+        Index(
+            "bubblenode_testcases_gin", "test_cases",
+            postgresql_using="gin", postgresql_ops={"test_cases": "jsonb_path_ops"}
+        ),
+        Index(
+            "bubblenode_hints_gin", "hints",
+            postgresql_using="gin", postgresql_ops={"hints": "jsonb_path_ops"}
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
-    node_id: str = Field(index=True)  # Unique within session
+    node_id: str  # Unique within session
     session_id: int = Field(foreign_key="session.id")
     
     # Node configuration
@@ -122,9 +213,9 @@ class BubbleNode(SQLModel, table=True):
     
     # Task-specific fields
     code_template: Optional[str] = Field(default=None)
-    test_cases: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    test_cases: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
     expected_output: Optional[str] = Field(default=None)
-    hints: Optional[List[str]] = Field(default=None, sa_column=Column(JSON))
+    hints: Optional[List[str]] = Field(default=None, sa_column=Column(JSONB))
     
     # AI tutor prompts
     tutor_prompt: Optional[str] = Field(default=None)
@@ -133,41 +224,75 @@ class BubbleNode(SQLModel, table=True):
     
     # Gamification
     coin_reward: int = Field(default=10)
-    bonus_conditions: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSON))
+    bonus_conditions: Optional[Dict[str, Any]] = Field(default=None, sa_column=Column(JSONB))
     
-    # Timestamps
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = Field(default=None)
+    # Timestamps (TIMESTAMPTZ; created_at is set by Postgres)
+    created_at: Optional[datetime] = Field(default=None, sa_column=now_tz_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=timestamptz_column())
     
     # Relationships
     session: Session = Relationship(back_populates="bubble_nodes")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "node_id": "c_major_chord",
-                "type": "task",
-                "title": "Learn C Major Chord",
-                "content_md": "Place your fingers on the 1st fret of B string, 2nd fret of D string, and 3rd fret of A string.",
-                "hints": ["Start with the easiest finger placement", "Practice the transition slowly"]
-            }
-        }
+    @classmethod
+    def test_cases_contain(cls, fragment: Dict[str, Any]):
+        """SQL filter for bubbles whose test_cases contain `fragment` (index-backed containment)"""
+        return cls.test_cases.contains(fragment)
+    
+    @classmethod
+    def has_hint(cls, hint: str):
+        """SQL filter for bubbles with `hint` among their hints (index-backed containment)"""
+        return cls.hints.contains([hint])
     
     def __repr__(self):
         return f"<BubbleNode(id={self.id}, node_id={self.node_id}, type={self.type})>"
 
 
+class SessionEdge(SQLModel, table=True):
+    """Graph edge of a session, materialized from graph_json for direct lookups"""
+    
+    __tablename__ = "session_edge"
+    __table_args__ = (
+        # Successors of a node
+        Index("ix_session_edge_from", "session_id", "from_node"),
+        # Prerequisites of a node
+        Index("ix_session_edge_to", "session_id", "to_node"),
+    )
+    
+    id: Optional[int] = Field(default=None, primary_key=True)
+    session_id: int = Field(foreign_key="session.id")
+    from_node: str
+    to_node: str
+    
+    def __repr__(self):
+        return f"<SessionEdge(session_id={self.session_id}, {self.from_node} -> {self.to_node})>"
+
+
 class StudentState(SQLModel, table=True):
     """Track student progress through a session"""
     
+    __table_args__ = (
+        # One state per student per session; also the bulk upsert conflict target
+        UniqueConstraint("student_id", "session_id", name="uq_studentstate_student_session"),
+        # Containment lookups: completed_nodes @> '["x"]', failed_attempts @> '{"x": n}'
+        Index(
+            "studentstate_completed_gin", "completed_nodes",
+            postgresql_using="gin", postgresql_ops={"completed_nodes": "jsonb_path_ops"}
+        ),
+        Index(
+            "studentstate_failed_gin", "failed_attempts",
+            postgresql_using="gin", postgresql_ops={"failed_attempts": "jsonb_path_ops"}
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     student_id: int = Field(foreign_key="user.id")
     session_id: int = Field(foreign_key="session.id")
     
     # Progress tracking
     current_node_id: Optional[str] = Field(default=None)
-    completed_nodes: List[str] = Field(default_factory=list, sa_column=Column(JSON))
-    failed_attempts: Dict[str, int] = Field(default_factory=dict, sa_column=Column(JSON))
+    # Persisted updates go through StudentStateRepository (atomic jsonb updates)
+    completed_nodes: List[str] = Field(default_factory=list, sa_column=Column(JSONB))
+    failed_attempts: Dict[str, int] = Field(default_factory=dict, sa_column=Column(JSONB))
     
     # Session state
     total_coins: int = Field(default=0)
@@ -175,31 +300,43 @@ class StudentState(SQLModel, table=True):
     completion_percentage: float = Field(default=0.0)
     
     # Timing
-    started_at: datetime = Field(default_factory=datetime.utcnow)
-    last_activity_at: datetime = Field(default_factory=datetime.utcnow)
-    completed_at: Optional[datetime] = Field(default=None)
+    # TIMESTAMPTZ; started_at/last_activity_at default to now() in Postgres
+    started_at: Optional[datetime] = Field(default=None, sa_column=now_tz_column())
+    last_activity_at: Optional[datetime] = Field(default=None, sa_column=now_tz_column())
+    completed_at: Optional[datetime] = Field(default=None, sa_column=timestamptz_column())
     total_time_spent: int = Field(default=0)  # in seconds
     
     # Relationships
     student: "User" = Relationship(back_populates="student_states")
     session: Session = Relationship(back_populates="student_states")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "current_node_id": "c_major_chord",
-                "completed_nodes": ["welcome", "intro"],
-                "total_coins": 20,
-                "completion_percentage": 25.0
-            }
-        }
-    
     def __repr__(self):
         return f"<StudentState(student_id={self.student_id}, session_id={self.session_id}, progress={self.completion_percentage}%)>"
     
+    def completed_node_set(self) -> Set[str]:
+        """
+        Set view of completed_nodes for O(1) membership checks
+        
+        Kept outside the model fields (it is never serialized) and rebuilt only when
+        the completed_nodes list itself is replaced, e.g. after a load or an update
+        through StudentStateRepository.
+        """
+        cached = self.__dict__.get("_completed_set")
+        if cached is None or cached[0] is not self.completed_nodes:
+            cached = (self.completed_nodes, set(self.completed_nodes))
+            # Bypass model __setattr__: this is a transient cache, not a field
+            self.__dict__["_completed_set"] = cached
+        return cached[1]
+    
+    def is_node_completed(self, node_id: str) -> bool:
+        """Check if a node is completed"""
+        return node_id in self.completed_node_set()
+    
     def add_completed_node(self, node_id: str):
         """Mark a node as completed"""
-        if node_id not in self.completed_nodes:
+        completed = self.completed_node_set()
+        if node_id not in completed:
+            completed.add(node_id)
             self.completed_nodes.append(node_id)
     
     def increment_failed_attempt(self, node_id: str):
@@ -3,10 +3,19 @@ User model and related schemas
 """
 
 from typing import Optional, List
-from sqlmodel import SQLModel, Field, Relationship
+from sqlmodel import SQLModel, Field, Relationship, Column
+from sqlalchemy import Computed, Index, LargeBinary, String
 from datetime import datetime
 from enum import Enum
 
+from app.models.analytics import now_tz_column, timestamptz_column
+
+# Generated-column expression for User.full_name ("First Last", else the username)
+FULL_NAME_SQL = (
+    "CASE WHEN coalesce(first_name, '') <> '' AND coalesce(last_name, '') <> '' "
+    "THEN first_name || ' ' || last_name ELSE username END"
+)
+
 
 class UserRole(str, Enum):
     """User roles in the system"""
@@ -18,23 +27,37 @@ class UserRole(str, Enum):
 class User(SQLModel, table=True):
     """User model for authentication and authorization"""
     
+    __table_args__ = (
+        # Fuzzy / ILIKE search by name
+        Index(
+            "user_fullname_trgm", "full_name",
+            postgresql_using="gin", postgresql_ops={"full_name": "gin_trgm_ops"}
+        ),
+    )
+    
     id: Optional[int] = Field(default=None, primary_key=True)
     username: str = Field(unique=True, index=True, min_length=3, max_length=50)
     email: str = Field(unique=True, index=True)
-    hashed_password: str
+    # bcrypt hash, stored as raw bytes rather than text
+    hashed_password: bytes = Field(sa_column=Column(LargeBinary, nullable=False))
     role: UserRole = Field(default=UserRole.STUDENT)
     
     # Profile information
     first_name: Optional[str] = Field(default=None, max_length=50)
     last_name: Optional[str] = Field(default=None, max_length=50)
     avatar_url: Optional[str] = Field(default=None)
+    # Generated by Postgres from the name fields; loaded back after refresh
+    full_name: Optional[str] = Field(
+        default=None, sa_column=Column(String, Computed(FULL_NAME_SQL, persisted=True))
+    )
     
     # Status and timestamps
     is_active: bool = Field(default=True)
     is_verified: bool = Field(default=False)
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: Optional[datetime] = Field(default=None)
-    last_login: Optional[datetime] = Field(default=None)
+    # TIMESTAMPTZ; created_at is set by Postgres
+    created_at: Optional[datetime] = Field(default=None, sa_column=now_tz_column())
+    updated_at: Optional[datetime] = Field(default=None, sa_column=timestamptz_column())
+    last_login: Optional[datetime] = Field(default=None, sa_column=timestamptz_column())
     
     # Relationships
     created_courses: List["Course"] = Relationship(back_populates="instructor")
@@ -42,27 +65,9 @@ class User(SQLModel, table=True):
     event_logs: List["EventLog"] = Relationship(back_populates="student")
     coin_transactions: List["CoinTransaction"] = Relationship(back_populates="student")
     
-    class Config:
-        schema_extra = {
-            "example": {
-                "username": "john_doe",
-                "email": "john@example.com",
-                "role": "student",
-                "first_name": "John",
-                "last_name": "Doe"
-            }
-        }
-    
     def __repr__(self):
         return f"<User(id={self.id}, username={self.username}, role={self.role})>"
     
-    @property
-    def full_name(self) -> str:
-        """Get user's full name"""
-        if self.first_name and self.last_name:
-            return f"{self.first_name} {self.last_name}"
-        return self.username
-    
     def is_instructor_or_admin(self) -> bool:
         """Check if user has instructor or admin privileges"""
         return self.role in [UserRole.INSTRUCTOR, UserRole.ADMIN] 
\ No newline at end of file
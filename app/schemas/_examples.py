@@ -0,0 +1,365 @@
+"""
+OpenAPI examples for API schemas and models
+Attached to the generated component schemas once, when app/main.py first builds
+the OpenAPI document, instead of being declared on every class
+"""
+
+from types import MappingProxyType
+from typing import Any, Dict, Mapping
+
+
+# Component schema name -> example payload (read-only)
+SCHEMA_EXAMPLES: Mapping[str, Dict[str, Any]] = MappingProxyType({
+    # app.models.user
+    "User": {
+        "username": "john_doe",
+        "email": "john@example.com",
+        "role": "student",
+        "first_name": "John",
+        "last_name": "Doe"
+    },
+    # app.models.course
+    "Course": {
+        "name": "Guitar Chords 101",
+        "description": "Learn basic guitar chords through interactive lessons",
+        "subject": "Music",
+        "difficulty_level": "beginner",
+        "estimated_duration": 120,
+        "learning_objectives": [
+            "Master basic major and minor chords",
+            "Understand chord progressions",
+            "Play simple songs"
+        ],
+        "tags": {"instrument": "guitar", "style": "acoustic"}
+    },
+    # app.models.session
+    "Session": {
+        "name": "Basic Chord Progression",
+        "description": "Learn C-Am-F-G chord progression",
+        "graph_json": {
+            "nodes": [
+                {"id": "start", "type": "concept", "title": "Welcome"},
+                {"id": "c_chord", "type": "task", "title": "C Major Chord"}
+            ],
+            "edges": [
+                {"from": "start", "to": "c_chord"}
+            ]
+        }
+    },
+    "BubbleNode": {
+        "node_id": "c_major_chord",
+        "type": "task",
+        "title": "Learn C Major Chord",
+        "content_md": "Place your fingers on the 1st fret of B string, 2nd fret of D string, and 3rd fret of A string.",
+        "hints": ["Start with the easiest finger placement", "Practice the transition slowly"]
+    },
+    "StudentState": {
+        "current_node_id": "c_major_chord",
+        "completed_nodes": ["welcome", "intro"],
+        "total_coins": 20,
+        "completion_percentage": 25.0
+    },
+    # app.models.enrollment
+    "CourseEnrollment": {
+        "student_id": 1,
+        "course_id": 1,
+        "status": "active",
+        "progress_percentage": 0.0
+    },
+    # app.models.analytics
+    "EventLog": {
+        "event_type": "bubble_success",
+        "node_id": "c_major_chord",
+        "payload": {
+            "attempts": 2,
+            "time_spent": 45,
+            "hints_used": 1
+        },
+        "response_time_ms": 250,
+        "success": True,
+        "score": 85.5
+    },
+    "CoinTransaction": {
+        "transaction_type": "earned",
+        "amount": 15,
+        "node_id": "c_major_chord",
+        "description": "Completed C Major Chord task",
+        "balance_before": 25,
+        "balance_after": 40,
+        "transaction_metadata": {
+            "bonus_multiplier": 1.5,
+            "completion_time": 30
+        }
+    },
+    # app.schemas.ai_tutor
+    "TutorRequest": {
+        "question": "How do I implement a recursive function?",
+        "bubble_id": "programming_basics_recursion",
+        "bubble_type": "concept",
+        "current_attempt": "def factorial(n): return n * factorial(n-1)",
+        "context": {"difficulty": "beginner"}
+    },
+    "TutorResponse": {
+        "response": "Great start! Your recursive function needs a base case to prevent infinite recursion. Try adding a condition like 'if n <= 1: return 1'",
+        "confidence": 0.9,
+        "suggestions": ["Add base case", "Test with small values"],
+        "next_steps": ["Practice with different recursive problems", "Learn about tail recursion"]
+    },
+    "HintRequest": {
+        "bubble_id": "algebra_quadratic_equations",
+        "question": "Solve x² - 5x + 6 = 0",
+        "current_attempt": "x = 5 ± √25 - 24",
+        "hint_level": 2,
+        "previous_hints": ["Try using the quadratic formula"]
+    },
+    "HintResponse": {
+        "hint": "You're on the right track! Now simplify what's under the square root and solve for both possible values.",
+        "hint_level": 2,
+        "cost_coins": 10
+    },
+    "CodeFeedbackRequest": {
+        "code": "def fibonacci(n):\n    if n <= 1:\n        return n\n    return fibonacci(n-1) + fibonacci(n-2)",
+        "language": "python",
+        "bubble_id": "algorithms_fibonacci",
+        "expected_output": "[0, 1, 1, 2, 3, 5, 8]",
+        "test_cases": [
+            {"input": 0, "expected": 0},
+            {"input": 5, "expected": 5}
+        ]
+    },
+    "CodeFeedbackResponse": {
+        "feedback": "Your Fibonacci implementation is correct but not optimal for larger values.",
+        "is_correct": True,
+        "suggestions": ["Consider using memoization", "Try iterative approach"],
+        "explanation": "Recursive solution works but has exponential time complexity. Each call recalculates the same values.",
+        "performance_notes": "O(2^n) time complexity - consider O(n) alternatives"
+    },
+    "LearningPathSuggestion": {
+        "title": "Master Array Algorithms",
+        "description": "Focus on array manipulation and searching algorithms to strengthen your foundation",
+        "priority": "high",
+        "estimated_time": 45,
+        "prerequisites": ["Basic loops", "Array indexing"],
+        "resources": ["Array tutorial", "Practice problems"]
+    },
+    "LearningPathResponse": {
+        "suggestions": [
+            {
+                "title": "Practice Problem Solving",
+                "description": "Work on algorithmic thinking with guided exercises",
+                "priority": "high",
+                "estimated_time": 30
+            }
+        ],
+        "current_level": "intermediate",
+        "strengths": ["Quick learner", "Good with syntax"],
+        "areas_for_improvement": ["Algorithm design", "Complex problem solving"],
+        "motivation_message": "You're making excellent progress! Focus on problem-solving strategies next."
+    },
+    "AdaptiveQuestionRequest": {
+        "topic": "Python Functions",
+        "difficulty_level": "intermediate",
+        "student_performance": {"success_rate": 0.75, "avg_time": 120},
+        "question_type": "coding",
+        "previous_questions": ["Write a function to calculate factorial"]
+    },
+    "AdaptiveQuestionResponse": {
+        "question": "Write a function that takes a list of integers and returns the second largest number. Handle edge cases appropriately.",
+        "question_type": "coding",
+        "difficulty_level": "intermediate",
+        "expected_answer": "def second_largest(nums): ...",
+        "grading_criteria": ["Handles empty list", "Finds correct value", "Efficient solution"],
+        "hints": ["Consider sorting", "Think about edge cases", "What if all numbers are the same?"],
+        "estimated_time": 15
+    },
+    "StudentProgressAnalysis": {
+        "student_id": 123,
+        "overall_progress": 0.67,
+        "learning_velocity": 2.5,
+        "knowledge_gaps": ["Advanced algorithms", "System design"],
+        "mastered_topics": ["Variables", "Loops", "Functions"],
+        "learning_style_assessment": {
+            "visual": 0.8,
+            "auditory": 0.4,
+            "kinesthetic": 0.6
+        },
+        "engagement_metrics": {
+            "session_frequency": 4.2,
+            "avg_session_duration": 45,
+            "help_requests": 0.3
+        }
+    },
+    "TutorSessionSummary": {
+        "session_id": "session_456",
+        "duration_minutes": 32,
+        "topics_covered": ["Functions", "Recursion", "Base cases"],
+        "questions_asked": 7,
+        "hints_provided": 3,
+        "success_rate": 0.71,
+        "key_insights": ["Student grasps recursion concept", "Needs practice with base cases"],
+        "recommended_followup": ["More recursion practice", "Review tree traversal"]
+    },
+    # app.schemas.progress_tracking
+    "PerformanceMetrics": {
+        "overall_score": 0.75,
+        "accuracy": 0.82,
+        "speed_score": 0.68,
+        "consistency": 0.71,
+        "improvement_rate": 0.85,
+        "engagement_score": 0.73
+    },
+    "LearningPattern": {
+        "pattern_type": "temporal",
+        "description": "Most active during evening hours (6-9 PM)",
+        "confidence": 0.85,
+        "frequency": 0.73
+    },
+    "SkillAssessment": {
+        "skill_domain": "problem_solving",
+        "current_level": 0.72,
+        "progress_rate": 0.15,
+        "strengths": ["Logical thinking", "Pattern recognition"],
+        "weaknesses": ["Complex algorithm design"],
+        "next_milestones": ["Master dynamic programming", "Learn graph algorithms"],
+        "confidence_score": 0.85
+    },
+    "LearningStyleProfile": {
+        "visual": 0.85,
+        "auditory": 0.45,
+        "kinesthetic": 0.62,
+        "reading_writing": 0.73,
+        "dominant_style": "visual",
+        "confidence": 0.78
+    },
+    "MasteryLevel": {
+        "topic": "recursion",
+        "level": "proficient",
+        "score": 0.78,
+        "consistency": 0.82,
+        "last_practiced": "2024-01-15T14:30:00Z"
+    },
+    "ProgressTrend": {
+        "metric": "overall_performance",
+        "direction": "increasing",
+        "magnitude": 0.12,
+        "period": "week",
+        "confidence": 0.85
+    },
+    "LearningGoal": {
+        "title": "Improve Problem Solving Skills",
+        "description": "Focus on algorithmic thinking and solution optimization",
+        "target_metric": "problem_solving_score",
+        "current_value": 0.65,
+        "target_value": 0.80,
+        "deadline": "2024-02-15T00:00:00Z",
+        "priority": "high",
+        "progress": 0.30
+    },
+    "AchievementBadge": {
+        "name": "Problem Solver",
+        "description": "Successfully solved 50 programming problems",
+        "category": "achievement",
+        "earned_date": "2024-01-20T15:45:00Z",
+        "points": 150
+    },
+    "StudySession": {
+        "session_id": "session_123",
+        "start_time": "2024-01-20T14:00:00Z",
+        "end_time": "2024-01-20T15:30:00Z",
+        "duration_minutes": 90,
+        "topics_covered": ["arrays", "sorting", "searching"],
+        "activities_completed": 12,
+        "success_rate": 0.83,
+        "hints_used": 3,
+        "engagement_score": 0.78
+    },
+    "DifficultyRecommendation": {
+        "topic": "binary_search",
+        "current_level": "intermediate",
+        "recommended_level": "increase",
+        "confidence": 0.85,
+        "reasoning": "High success rate and low hint usage indicate readiness for more challenge",
+        "expected_improvement": 0.15
+    },
+    "ProgressAnalysis": {
+        "student_id": 123,
+        "analysis_period": "30 days",
+        "performance_metrics": {
+            "overall_score": 0.75,
+            "accuracy": 0.82,
+            "speed_score": 0.68,
+            "consistency": 0.71,
+            "improvement_rate": 0.85,
+            "engagement_score": 0.73
+        },
+        "recommendations": [
+            "Focus on consistency in daily practice",
+            "Try more challenging problems in strong areas",
+            "Review fundamental concepts in weak areas"
+        ]
+    },
+    "LearningInsight": {
+        "insight_type": "learning_plateau",
+        "title": "Performance Plateau Detected",
+        "description": "Student's performance has remained stable for the past 2 weeks, suggesting need for new challenges",
+        "importance": "medium",
+        "actionable": True,
+        "related_metrics": ["overall_score", "improvement_rate"]
+    },
+    "AdaptivePath": {
+        "path_id": "adaptive_algorithms_path",
+        "title": "Personalized Algorithms Journey",
+        "description": "Tailored algorithm learning path based on your strengths and interests",
+        "estimated_duration": 40,
+        "difficulty_progression": ["beginner", "intermediate", "advanced"],
+        "topics": ["sorting", "searching", "dynamic_programming", "graph_algorithms"],
+        "prerequisites": ["basic_programming", "data_structures"],
+        "personalization_factors": ["visual_learner", "prefers_examples", "strong_in_logic"]
+    },
+    "InterventionSuggestion": {
+        "intervention_type": "difficulty_adjustment",
+        "trigger": "Three consecutive sessions with <40% success rate",
+        "urgency": "high",
+        "suggested_actions": [
+            "Reduce problem difficulty",
+            "Provide additional scaffolding",
+            "Review prerequisite concepts"
+        ],
+        "expected_outcome": "Improved confidence and success rate",
+        "monitoring_metrics": ["success_rate", "engagement_score", "hint_usage"]
+    },
+    "CompetencyMap": {
+        "student_id": 123,
+        "competency_scores": {
+            "problem_decomposition": 0.78,
+            "algorithm_design": 0.65,
+            "code_implementation": 0.82,
+            "debugging": 0.71,
+            "optimization": 0.58
+        },
+        "skill_relationships": {
+            "algorithm_design": ["problem_decomposition", "optimization"],
+            "debugging": ["code_implementation", "problem_decomposition"]
+        },
+        "growth_areas": ["optimization", "algorithm_design"],
+        "strength_areas": ["code_implementation", "problem_decomposition"]
+    },
+    "PredictiveModel": {
+        "model_type": "performance_prediction",
+        "predictions": {
+            "next_week_score": 0.78,
+            "time_to_mastery": 45,
+            "optimal_difficulty": "intermediate"
+        },
+        "confidence_intervals": {
+            "next_week_score": [0.73, 0.83]
+        },
+        "feature_importance": {
+            "recent_performance": 0.35,
+            "consistency": 0.28,
+            "engagement": 0.25,
+            "learning_style": 0.12
+        },
+        "model_accuracy": 0.85
+    },
+})
@@ -0,0 +1,77 @@
+"""
+Shared base for API schemas
+"""
+
+import functools
+from operator import attrgetter
+from typing import Annotated, Any, Callable, FrozenSet, Tuple, Type, TypeVar
+
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class FastBase(BaseModel):
+    """
+    Base model for request/response schemas
+    
+    Validation runs entirely in pydantic-core: unknown keys are dropped rather than
+    stored, assignments are not re-validated, and only core types are allowed.
+    Validators and serializers are built on first use, so schemas that no route
+    or service touches cost nothing at import.
+    """
+    model_config = ConfigDict(
+        extra="ignore",
+        validate_assignment=False,
+        arbitrary_types_allowed=False,
+        defer_build=True,
+    )
+
+
+# Score/rate/confidence in [0, 1]; one shared constrained type for every such field
+UnitFloat = Annotated[float, Field(ge=0.0, le=1.0)]
+
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def fast_response(cls: Type[M], **data: Any) -> M:
+    """
+    Build a schema instance WITHOUT validation, for trusted data only
+    
+    Opt-in fast path for responses assembled from our own ORM rows or computed
+    results. Values are stored as given (no coercion, no constraint checks, nested
+    dicts stay dicts); missing fields take their defaults. Never use it for request
+    payloads or anything derived from them.
+    """
+    return cls.model_construct(**data)
+
+
+@functools.cache
+def _row_reader(
+    cls: Type[BaseModel], row_type: type, skipped: FrozenSet[str]
+) -> Tuple[Tuple[str, ...], Callable[[Any], tuple]]:
+    """Field names a row type provides for cls, and one attrgetter reading them all"""
+    # Columns and properties live on the class; plain model fields only in model_fields
+    row_fields = getattr(row_type, "model_fields", {})
+    names = tuple(
+        name for name in cls.model_fields
+        if name not in skipped and (name in row_fields or hasattr(row_type, name))
+    )
+    if len(names) == 1:
+        getter = attrgetter(names[0])
+        return names, lambda row: (getter(row),)
+    return names, attrgetter(*names) if names else (lambda row: ())
+
+
+def fast_response_from_row(cls: Type[M], row: Any, **overrides: Any) -> M:
+    """
+    fast_response() with the schema's fields read from an ORM row
+    
+    Fields given in overrides are not read from the row, so computed row
+    properties that the caller sets itself are never evaluated. The fields a row
+    type provides are resolved once per (schema, row type, overrides) and read
+    with a single attrgetter call.
+    """
+    names, read = _row_reader(cls, type(row), frozenset(overrides))
+    data = dict(zip(names, read(row)))
+    data.update(overrides)
+    return cls.model_construct(**data)
@@ -3,7 +3,7 @@ Course-related Pydantic schemas
 """
 
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -57,8 +57,7 @@ class CourseResponse(CourseBase):
     total_sessions: int = 0
     student_count: int = 0
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class CourseListResponse(BaseModel):
@@ -3,7 +3,7 @@ Enrollment-related Pydantic schemas
 """
 
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from datetime import datetime
 
 
@@ -29,8 +29,7 @@ class EnrollmentResponse(BaseModel):
     student_email: Optional[str] = None
     course_name: Optional[str] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
 class BulkEnrollmentResponse(BaseModel):
@@ -3,13 +3,14 @@ Session and Bubble Graph related Pydantic schemas
 """
 
 from typing import Optional, List, Dict, Any
-from pydantic import BaseModel, Field, validator
+from pydantic import ConfigDict, Field, model_validator
 from datetime import datetime
 
 from app.models.session import BubbleType, SessionStatus
+from app.schemas.base import FastBase
 
 
-class BubbleNodeSchema(BaseModel):
+class BubbleNodeSchema(FastBase):
     """Schema for bubble node in graph JSON"""
     id: str = Field(..., min_length=1)
     type: BubbleType
@@ -22,8 +23,10 @@ class BubbleNodeSchema(BaseModel):
     height: Optional[float] = 80
     color: Optional[str] = None
 
+    model_config = ConfigDict(frozen=True)
 
-class GraphEdgeSchema(BaseModel):
+
+class GraphEdgeSchema(FastBase):
     """Schema for graph edge"""
     from_node: str
     to_node: str
@@ -32,44 +35,32 @@ class GraphEdgeSchema(BaseModel):
     label: Optional[str] = None
     condition: Optional[str] = None  # For conditional edges
 
+    model_config = ConfigDict(frozen=True)
+
 
-class BubbleGraphSchema(BaseModel):
+class BubbleGraphSchema(FastBase):
     """Schema for complete bubble graph"""
     start_node: str = Field(..., min_length=1)
-    nodes: List[BubbleNodeSchema] = Field(..., min_items=1)
+    nodes: List[BubbleNodeSchema] = Field(..., min_length=1)
     edges: List[GraphEdgeSchema] = Field(default_factory=list)
     
-    @validator('nodes')
-    def validate_nodes(cls, v):
-        """Validate nodes have unique IDs"""
-        node_ids = [node.id for node in v]
-        if len(node_ids) != len(set(node_ids)):
+    @model_validator(mode='after')
+    def validate_graph_references(self):
+        """Validate unique node IDs and that start_node/edges reference existing nodes (one pass)"""
+        node_ids = {node.id for node in self.nodes}
+        if len(node_ids) != len(self.nodes):
             raise ValueError("Node IDs must be unique")
-        return v
-    
-    @validator('start_node')
-    def validate_start_node(cls, v, values):
-        """Validate start_node exists in nodes"""
-        if 'nodes' in values:
-            node_ids = [node.id for node in values['nodes']]
-            if v not in node_ids:
-                raise ValueError("start_node must exist in nodes")
-        return v
-    
-    @validator('edges')
-    def validate_edges(cls, v, values):
-        """Validate edges reference existing nodes"""
-        if 'nodes' in values:
-            node_ids = [node.id for node in values['nodes']]
-            for edge in v:
-                if edge.from_node not in node_ids:
-                    raise ValueError(f"Edge from_node '{edge.from_node}' not found in nodes")
-                if edge.to_node not in node_ids:
-                    raise ValueError(f"Edge to_node '{edge.to_node}' not found in nodes")
-        return v
-
-
-class BubbleNodeCreate(BaseModel):
+        if self.start_node not in node_ids:
+            raise ValueError("start_node must exist in nodes")
+        for edge in self.edges:
+            if edge.from_node not in node_ids:
+                raise ValueError(f"Edge from_node '{edge.from_node}' not found in nodes")
+            if edge.to_node not in node_ids:
+                raise ValueError(f"Edge to_node '{edge.to_node}' not found in nodes")
+        return self
+
+
+class BubbleNodeCreate(FastBase):
     """Schema for creating a bubble node"""
     node_id: str = Field(..., min_length=1)
     type: BubbleType
@@ -99,11 +90,10 @@ class BubbleNodeResponse(BubbleNodeCreate):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class SessionCreate(BaseModel):
+class SessionCreate(FastBase):
     """Schema for session creation"""
     name: str = Field(..., min_length=1, max_length=200)
     description: Optional[str] = Field(None, max_length=1000)
@@ -121,15 +111,15 @@ class SessionCreate(BaseModel):
     coins_per_bubble: int = Field(10, ge=0)
     time_limit_minutes: Optional[int] = Field(None, gt=0)
     
-    @validator('end_time')
-    def validate_end_time(cls, v, values):
+    @model_validator(mode='after')
+    def validate_end_time(self):
         """Validate end_time is after start_time"""
-        if 'start_time' in values and v <= values['start_time']:
+        if self.end_time <= self.start_time:
             raise ValueError("end_time must be after start_time")
-        return v
+        return self
 
 
-class SessionUpdate(BaseModel):
+class SessionUpdate(FastBase):
     """Schema for session updates"""
     name: Optional[str] = Field(None, min_length=1, max_length=200)
     description: Optional[str] = Field(None, max_length=1000)
@@ -142,7 +132,7 @@ class SessionUpdate(BaseModel):
     time_limit_minutes: Optional[int] = Field(None, gt=0)
 
 
-class SessionResponse(BaseModel):
+class SessionResponse(FastBase):
     """Schema for session response"""
     id: int
     name: str
@@ -167,11 +157,10 @@ class SessionResponse(BaseModel):
     is_upcoming: bool = False
     is_past: bool = False
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class StudentStateResponse(BaseModel):
+class StudentStateResponse(FastBase):
     """Schema for student state response"""
     id: int
     student_id: int
@@ -187,11 +176,10 @@ class StudentStateResponse(BaseModel):
     completed_at: Optional[datetime] = None
     total_time_spent: int  # seconds
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class GraphValidationResponse(BaseModel):
+class GraphValidationResponse(FastBase):
     """Schema for graph validation response"""
     is_valid: bool
     errors: List[str] = Field(default_factory=list)
@@ -202,7 +190,7 @@ class GraphValidationResponse(BaseModel):
     unreachable_nodes: List[str] = Field(default_factory=list)
 
 
-class SessionListResponse(BaseModel):
+class SessionListResponse(FastBase):
     """Schema for session list response"""
     sessions: List[SessionResponse]
     total: int
@@ -210,7 +198,7 @@ class SessionListResponse(BaseModel):
     per_page: int
 
 
-class BubbleAdvanceRequest(BaseModel):
+class BubbleAdvanceRequest(FastBase):
     """Schema for advancing to next bubble"""
     node_id: str
     student_response: str
@@ -218,7 +206,7 @@ class BubbleAdvanceRequest(BaseModel):
     time_spent: Optional[int] = None  # seconds
 
 
-class BubbleAdvanceResponse(BaseModel):
+class BubbleAdvanceResponse(FastBase):
     """Schema for bubble advancement response"""
     success: bool
     next_node_id: Optional[str] = None
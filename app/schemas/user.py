@@ -3,13 +3,14 @@ User-related Pydantic schemas
 """
 
 from typing import Optional
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import ConfigDict, EmailStr, Field
 from datetime import datetime
 
 from app.models.user import UserRole
+from app.schemas.base import FastBase
 
 
-class UserBase(BaseModel):
+class UserBase(FastBase):
     """Base user schema"""
     username: str = Field(..., min_length=3, max_length=50)
     email: EmailStr
@@ -23,13 +24,13 @@ class UserCreate(UserBase):
     role: UserRole = UserRole.STUDENT
 
 
-class UserLogin(BaseModel):
+class UserLogin(FastBase):
     """Schema for user login"""
     username: str
     password: str
 
 
-class UserUpdate(BaseModel):
+class UserUpdate(FastBase):
     """Schema for user updates"""
     email: Optional[EmailStr] = None
     first_name: Optional[str] = Field(None, max_length=50)
@@ -39,6 +40,8 @@ class UserUpdate(BaseModel):
 
 class UserResponse(UserBase):
     """Schema for user response"""
+    # Stored emails were validated on the way in; don't re-run EmailStr per response
+    email: str
     id: int
     role: UserRole
     avatar_url: Optional[str] = None
@@ -47,11 +50,10 @@ class UserResponse(UserBase):
     created_at: datetime
     last_login: Optional[datetime] = None
 
-    class Config:
-        from_attributes = True
+    model_config = ConfigDict(from_attributes=True)
 
 
-class TokenResponse(BaseModel):
+class TokenResponse(FastBase):
     """Schema for authentication token response"""
     access_token: str
     token_type: str = "bearer"
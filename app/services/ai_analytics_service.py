@@ -3,6 +3,8 @@ AI-Powered Analytics Service - Advanced learning analytics with AI insights
 Processes comprehensive tracking data to generate intelligent insights and predictions
 """
 
+import asyncio
+import heapq
 import json
 import logging
 from typing import Dict, List, Optional, Any, Tuple
@@ -10,9 +12,12 @@ from datetime import datetime, timedelta
 from collections import defaultdict, Counter
 from sqlmodel import Session, select, and_, or_, func
 from sqlalchemy import desc
+from sqlmodel.ext.asyncio.session import AsyncSession
 import numpy as np
 from dataclasses import dataclass
+from enum import IntEnum
 
+from app.core.database import async_engine
 from app.models.analytics import (
     StudentSessionTracking, ChatInteraction, CodeInteraction, CodeSubmission,
     StruggleAnalysis, StudentLearningProfile, EventLog, EventType,
@@ -23,31 +28,89 @@ from app.models.session import Session as SessionModel
 
 logger = logging.getLogger(__name__)
 
+# Look-back window for student risk assessment
+RISK_WINDOW = timedelta(days=14)
 
-@dataclass
+# Chat messages that count as asking for help
+HELP_REQUEST_MESSAGE_TYPES = frozenset({MessageType.HINT_REQUEST, MessageType.STUDENT_QUESTION})
+
+# db.info key of the per-request tracking data memo, keyed by (student_id, time_period)
+_TRACKING_DATA_MEMO = "ai_analytics_tracking_data"
+
+# Submission counts of a student with no submissions (see _submission_counts_statement)
+EMPTY_SUBMISSION_COUNTS = {"total": 0, "correct": 0, "first_half_total": 0, "first_half_correct": 0}
+
+
+# Plain-Python statistics for the short per-student/per-cohort lists used here,
+# where building an ndarray costs more than the arithmetic
+def _mean(values: List[float]) -> float:
+    return sum(values) / len(values) if values else 0.0
+
+
+async def _fetch_all(statement) -> list:
+    """Run one read-only statement on its own AsyncSession (so several can be gathered)"""
+    async with AsyncSession(async_engine) as db:
+        return (await db.exec(statement)).all()
+
+
+def _batch_predict(
+    progress: np.ndarray, interactions: np.ndarray, struggle: np.ndarray, success: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Completion and struggle probabilities for many session trackings at once
+    
+    Completion is the mean of the progress, engagement (only when the student has
+    interacted, normalized to 50 interactions), inverted struggle and success
+    factors; struggle probability is the struggle score as a fraction.
+    """
+    engaged = interactions > 0
+    engagement = np.minimum(1.0, interactions / 50)
+    factor_sum = (
+        progress / 100
+        + np.where(engaged, engagement, 0.0)
+        + np.maximum(0.0, 1.0 - struggle / 100)
+        + success
+    )
+    completion = factor_sum / np.where(engaged, 4, 3)
+    return completion, struggle / 100
+
+
+class Priority(IntEnum):
+    """Insight priority and student risk level; orders as an int, serialized as its lowercase name"""
+    LOW = 1
+    MEDIUM = 2
+    HIGH = 3
+    CRITICAL = 4
+    
+    @property
+    def label(self) -> str:
+        return self.name.lower()
+
+
+@dataclass(slots=True, frozen=True)
 class LearningInsight:
     """Structured learning insight"""
     insight_type: str  # "performance", "behavior", "prediction", "recommendation"
     title: str
     description: str
     confidence: float  # 0-1 confidence score
-    priority: str  # "low", "medium", "high", "critical"
+    priority: Priority
     action_items: List[str]
     supporting_data: Dict[str, Any]
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class StudentRiskAssessment:
     """Student risk assessment for early intervention"""
     student_id: int
-    risk_level: str  # "low", "medium", "high", "critical"
+    risk_level: Priority
     risk_factors: List[str]
     predicted_outcome: str
     intervention_suggestions: List[str]
     confidence: float
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class LearningPathRecommendation:
     """Personalized learning path recommendation"""
     student_id: int
@@ -104,14 +167,19 @@ class AIAnalyticsService:
         self,
         student_id: int,
         session_id: Optional[int] = None,
-        db: Session = None
+        db: Session = None,
+        tracking_data: Optional[Dict[str, Any]] = None
     ) -> StudentRiskAssessment:
-        """Assess student risk for early intervention"""
+        """
+        Assess student risk for early intervention
+        
+        tracking_data, if given, is the student's RISK_WINDOW data already gathered
+        (e.g. by _gather_cohort_tracking_data); otherwise it is loaded here.
+        """
         
         # Gather recent data for risk assessment
-        tracking_data = await self._gather_student_tracking_data(
-            student_id, timedelta(days=14), db
-        )
+        if tracking_data is None:
+            tracking_data = await self._gather_student_tracking_data(student_id, RISK_WINDOW, db)
         
         risk_factors = []
         risk_score = 0.0
@@ -149,13 +217,13 @@ class AIAnalyticsService:
         
         # Determine risk level
         if risk_score >= 0.7:
-            risk_level = "critical"
+            risk_level = Priority.CRITICAL
         elif risk_score >= 0.5:
-            risk_level = "high"
+            risk_level = Priority.HIGH
         elif risk_score >= 0.3:
-            risk_level = "medium"
+            risk_level = Priority.MEDIUM
         else:
-            risk_level = "low"
+            risk_level = Priority.LOW
         
         # Generate intervention suggestions
         intervention_suggestions = self._generate_intervention_suggestions(
@@ -242,14 +310,17 @@ class AIAnalyticsService:
         performance_distribution = await self._analyze_cohort_performance(session_trackings)
         cohort_analysis["performance_distribution"] = performance_distribution
         
-        # Identify at-risk students
+        # Identify at-risk students; recent data for the whole cohort in one batch
+        cohort_data = await self._gather_cohort_tracking_data(student_ids, RISK_WINDOW, db)
         at_risk_students = []
         for student_id in student_ids:
-            risk_assessment = await self.assess_student_risk(student_id, session_id, db)
-            if risk_assessment.risk_level in ["high", "critical"]:
+            risk_assessment = await self.assess_student_risk(
+                student_id, session_id, db, tracking_data=cohort_data[student_id]
+            )
+            if risk_assessment.risk_level >= Priority.HIGH:
                 at_risk_students.append({
                     "student_id": student_id,
-                    "risk_level": risk_assessment.risk_level,
+                    "risk_level": risk_assessment.risk_level.label,
                     "risk_factors": risk_assessment.risk_factors,
                     "intervention_suggestions": risk_assessment.intervention_suggestions
                 })
@@ -290,45 +361,37 @@ class AIAnalyticsService:
     ) -> Dict[str, Any]:
         """Predict session outcomes and completion rates"""
         
-        # Get current session data
-        statement = select(StudentSessionTracking).where(
-            StudentSessionTracking.session_id == session_id
-        )
-        session_trackings = db.exec(statement).all()
+        # Get current session data: only the four predictor columns
+        statement = select(
+            StudentSessionTracking.progress_percentage,
+            StudentSessionTracking.total_interactions,
+            StudentSessionTracking.current_struggle_score,
+            StudentSessionTracking.success_rate,
+        ).where(StudentSessionTracking.session_id == session_id)
+        rows = db.exec(statement).all()
         
         predictions = {
             "session_id": session_id,
             "prediction_horizon_days": prediction_horizon_days,
             "prediction_timestamp": datetime.utcnow().isoformat(),
-            "total_students": len(session_trackings)
+            "total_students": len(rows)
         }
         
-        if not session_trackings:
+        if not rows:
             return predictions
         
-        # Predict completion rates
-        completion_predictions = []
-        struggle_predictions = []
-        
-        for tracking in session_trackings:
-            # Predict individual completion probability
-            completion_prob = self._predict_completion_probability(tracking)
-            completion_predictions.append(completion_prob)
-            
-            # Predict struggle likelihood
-            struggle_prob = self._predict_struggle_probability(tracking)
-            struggle_predictions.append(struggle_prob)
-        
-        # Aggregate predictions
-        predicted_completion_rate = np.mean(completion_predictions)
-        predicted_struggle_rate = np.mean(struggle_predictions)
+        # Predict every student's completion and struggle probability at once
+        progress, interactions, struggle, success = np.array(rows, dtype=np.float64).T
+        completion_predictions, struggle_predictions = _batch_predict(
+            progress, interactions, struggle, success
+        )
         
         predictions.update({
-            "predicted_completion_rate": round(predicted_completion_rate, 2),
-            "predicted_struggle_rate": round(predicted_struggle_rate, 2),
-            "high_completion_probability_students": len([p for p in completion_predictions if p > 0.8]),
-            "at_risk_completion_students": len([p for p in completion_predictions if p < 0.3]),
-            "confidence": self._calculate_prediction_confidence(session_trackings)
+            "predicted_completion_rate": round(float(completion_predictions.mean()), 2),
+            "predicted_struggle_rate": round(float(struggle_predictions.mean()), 2),
+            "high_completion_probability_students": int((completion_predictions > 0.8).sum()),
+            "at_risk_completion_students": int((completion_predictions < 0.3).sum()),
+            "confidence": self._calculate_prediction_confidence(int(interactions.sum()))
         })
         
         return predictions
@@ -342,62 +405,170 @@ class AIAnalyticsService:
         db: Session
     ) -> Dict[str, Any]:
         """Gather comprehensive tracking data for a student"""
+        cohort_data = await self._gather_cohort_tracking_data([student_id], time_period, db)
+        return cohort_data[student_id]
+    
+    async def _gather_cohort_tracking_data(
+        self,
+        student_ids: List[int],
+        time_period: timedelta,
+        db: Session
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Tracking data for many students, memoized on the request's db session
+        
+        Risk, insight and recommendation calls for the same student and period
+        within one request share a single load.
+        """
+        memo = db.info.setdefault(_TRACKING_DATA_MEMO, {})
+        missing = [
+            student_id for student_id in dict.fromkeys(student_ids)
+            if (student_id, time_period) not in memo
+        ]
+        if missing:
+            loaded = await self._load_cohort_tracking_data(missing, time_period, db)
+            memo.update(((student_id, time_period), data) for student_id, data in loaded.items())
+        
+        return {student_id: memo[(student_id, time_period)] for student_id in student_ids}
+    
+    async def _load_cohort_tracking_data(
+        self,
+        student_ids: List[int],
+        time_period: timedelta,
+        db: Session
+    ) -> Dict[int, Dict[str, Any]]:
+        """
+        Tracking data for many students with five queries in total
+        
+        The trackings are read on db; the four per-tracking lookups then run
+        concurrently, each on its own async connection.
+        
+        Returns one _gather_student_tracking_data-shaped dict per student id
+        (empty lists for students without recent sessions).
+        """
         
         cutoff_date = datetime.utcnow() - time_period
         
         # Get session trackings
         statement = select(StudentSessionTracking).where(
             and_(
-                StudentSessionTracking.student_id == student_id,
+                StudentSessionTracking.student_id.in_(set(student_ids)),
                 StudentSessionTracking.start_time >= cutoff_date
             )
         )
         session_trackings = db.exec(statement).all()
         
-        # Get related data
-        tracking_ids = [t.id for t in session_trackings] if session_trackings else []
+        # Related rows are keyed by session tracking; map them back to students
+        student_of_tracking = {t.id: t.student_id for t in session_trackings}
+        tracking_ids = list(student_of_tracking)
         
-        chat_interactions = []
-        code_interactions = []
-        code_submissions = []
-        struggles = []
+        grouped: Dict[str, Dict[int, list]] = {
+            key: defaultdict(list)
+            for key in ("session_trackings", "chat_interactions", "code_interactions", "recent_struggles")
+        }
+        submission_counts: Dict[int, Dict[str, int]] = {}
+        for tracking in session_trackings:
+            grouped["session_trackings"][tracking.student_id].append(tracking)
         
         if tracking_ids:
-            # Get chat interactions
-            chat_statement = select(ChatInteraction).where(
-                ChatInteraction.session_tracking_id.in_(tracking_ids)
-            )
-            chat_interactions = db.exec(chat_statement).all()
-            
-            # Get code interactions
-            code_statement = select(CodeInteraction).where(
-                CodeInteraction.session_tracking_id.in_(tracking_ids)
-            )
-            code_interactions = db.exec(code_statement).all()
+            related_statements = {
+                # Get chat interactions
+                "chat_interactions": select(ChatInteraction).where(
+                    ChatInteraction.session_tracking_id.in_(tracking_ids)
+                ),
+                # Get code interactions
+                "code_interactions": select(CodeInteraction).where(
+                    CodeInteraction.session_tracking_id.in_(tracking_ids),
+                    CodeInteraction.timestamp >= cutoff_date
+                ),
+                # Get struggle analyses
+                "recent_struggles": select(StruggleAnalysis).where(
+                    StruggleAnalysis.session_tracking_id.in_(tracking_ids)
+                ),
+            }
+            # Submissions are only ever counted, so count them in SQL
+            statements = [*related_statements.values(), self._submission_counts_statement(tracking_ids)]
             
-            # Get submissions
-            submission_statement = select(CodeSubmission).where(
-                CodeSubmission.session_tracking_id.in_(tracking_ids)
+            # The four lookups only depend on the tracking ids; one AsyncSession
+            # can't run statements concurrently, so each gets its own connection
+            *related_rows, submission_rows = await asyncio.gather(
+                *(_fetch_all(statement) for statement in statements)
             )
-            code_submissions = db.exec(submission_statement).all()
+            for key, rows in zip(related_statements, related_rows):
+                for row in rows:
+                    grouped[key][student_of_tracking[row.session_tracking_id]].append(row)
             
-            # Get struggle analyses
-            struggle_statement = select(StruggleAnalysis).where(
-                StruggleAnalysis.session_tracking_id.in_(tracking_ids)
-            )
-            struggles = db.exec(struggle_statement).all()
+            submission_counts = {
+                row.student_id: {
+                    "total": row.total,
+                    "correct": row.correct,
+                    "first_half_total": row.first_half_total,
+                    "first_half_correct": row.first_half_correct,
+                }
+                for row in submission_rows
+            }
         
         # Process and structure the data
+        return {
+            student_id: self._build_tracking_data(
+                student_id,
+                time_period,
+                session_trackings=grouped["session_trackings"].get(student_id, []),
+                chat_interactions=grouped["chat_interactions"].get(student_id, []),
+                code_interactions=grouped["code_interactions"].get(student_id, []),
+                submission_counts=submission_counts.get(student_id, EMPTY_SUBMISSION_COUNTS),
+                struggles=grouped["recent_struggles"].get(student_id, []),
+            )
+            for student_id in student_ids
+        }
+    
+    def _submission_counts_statement(self, tracking_ids: List[int]):
+        """
+        Per-student submission counts for the given session trackings, in one query
+        
+        total/correct cover all submissions; first_half_total/first_half_correct
+        cover the student's earliest floor(total / 2) submissions by timestamp.
+        """
+        ordered = select(
+            CodeSubmission.student_id,
+            CodeSubmission.is_correct,
+            func.row_number().over(
+                partition_by=CodeSubmission.student_id,
+                order_by=(CodeSubmission.timestamp, CodeSubmission.id)
+            ).label("position"),
+            func.count().over(partition_by=CodeSubmission.student_id).label("student_total"),
+        ).where(CodeSubmission.session_tracking_id.in_(tracking_ids)).subquery()
+        
+        first_half = ordered.c.position * 2 <= ordered.c.student_total
+        return select(
+            ordered.c.student_id,
+            func.count().label("total"),
+            func.count().filter(ordered.c.is_correct).label("correct"),
+            func.count().filter(first_half).label("first_half_total"),
+            func.count().filter(and_(first_half, ordered.c.is_correct)).label("first_half_correct"),
+        ).group_by(ordered.c.student_id)
+    
+    def _build_tracking_data(
+        self,
+        student_id: int,
+        time_period: timedelta,
+        session_trackings: list,
+        chat_interactions: list,
+        code_interactions: list,
+        submission_counts: Dict[str, int],
+        struggles: list
+    ) -> Dict[str, Any]:
+        """One student's tracking data with the derived engagement/trend metrics"""
         return {
             "student_id": student_id,
             "time_period_days": time_period.days,
             "session_trackings": session_trackings,
             "chat_interactions": chat_interactions,
             "code_interactions": code_interactions,
-            "code_submissions": code_submissions,
+            "submission_counts": submission_counts,
             "recent_struggles": struggles,
             "engagement_score": self._calculate_engagement_score(session_trackings, chat_interactions, code_interactions),
-            "performance_trend": self._calculate_performance_trend(code_submissions),
+            "performance_trend": self._calculate_performance_trend(submission_counts),
             "session_consistency": self._calculate_session_consistency(session_trackings),
             "help_request_ratio": self._calculate_help_request_ratio(chat_interactions)
         }
@@ -406,12 +577,13 @@ class AIAnalyticsService:
         """Analyze performance patterns and generate insights"""
         insights = []
         
-        submissions = tracking_data.get("code_submissions", [])
-        if not submissions:
+        counts = tracking_data.get("submission_counts", EMPTY_SUBMISSION_COUNTS)
+        total_submissions = counts["total"]
+        if not total_submissions:
             return insights
         
         # Success rate analysis
-        success_rate = len([s for s in submissions if s.is_correct]) / len(submissions)
+        success_rate = counts["correct"] / total_submissions
         
         if success_rate > 0.8:
             insights.append(LearningInsight(
@@ -419,12 +591,12 @@ class AIAnalyticsService:
                 title="High Performance Achievement",
                 description=f"Student demonstrates excellent performance with {success_rate:.1%} success rate",
                 confidence=0.9,
-                priority="medium",
+                priority=Priority.MEDIUM,
                 action_items=[
                     "Consider advancing to more challenging content",
                     "Explore advanced topics in areas of strength"
                 ],
-                supporting_data={"success_rate": success_rate, "total_submissions": len(submissions)}
+                supporting_data={"success_rate": success_rate, "total_submissions": total_submissions}
             ))
         elif success_rate < 0.5:
             insights.append(LearningInsight(
@@ -432,13 +604,13 @@ class AIAnalyticsService:
                 title="Performance Improvement Needed",
                 description=f"Student showing challenges with {success_rate:.1%} success rate",
                 confidence=0.85,
-                priority="high",
+                priority=Priority.HIGH,
                 action_items=[
                     "Provide additional foundational support",
                     "Consider one-on-one tutoring sessions",
                     "Review prerequisite concepts"
                 ],
-                supporting_data={"success_rate": success_rate, "total_submissions": len(submissions)}
+                supporting_data={"success_rate": success_rate, "total_submissions": total_submissions}
             ))
         
         return insights
@@ -452,8 +624,9 @@ class AIAnalyticsService:
         
         if session_trackings:
             # Session duration patterns
-            avg_session_duration = np.mean([
-                (t.end_time or datetime.utcnow() - t.start_time).total_seconds() / 60
+            now = datetime.utcnow()
+            avg_session_duration = _mean([
+                ((t.end_time or now) - t.start_time).total_seconds() / 60
                 for t in session_trackings
             ])
             
@@ -463,7 +636,7 @@ class AIAnalyticsService:
                     title="Extended Learning Sessions",
                     description=f"Student engages in long learning sessions (avg {avg_session_duration:.0f} min)",
                     confidence=0.8,
-                    priority="low",
+                    priority=Priority.LOW,
                     action_items=[
                         "Consider breaking content into smaller chunks",
                         "Add regular break reminders"
@@ -476,7 +649,7 @@ class AIAnalyticsService:
                     title="Short Learning Sessions",
                     description=f"Student has brief learning sessions (avg {avg_session_duration:.0f} min)",
                     confidence=0.8,
-                    priority="medium",
+                    priority=Priority.MEDIUM,
                     action_items=[
                         "Investigate engagement barriers",
                         "Provide incentives for longer engagement"
@@ -486,8 +659,9 @@ class AIAnalyticsService:
         
         # Communication patterns
         if chat_interactions:
-            question_ratio = len([c for c in chat_interactions 
-                                if c.message_type == MessageType.STUDENT_QUESTION]) / len(chat_interactions)
+            question_ratio = sum(
+                1 for c in chat_interactions if c.message_type == MessageType.STUDENT_QUESTION
+            ) / len(chat_interactions)
             
             if question_ratio > 0.6:
                 insights.append(LearningInsight(
@@ -495,7 +669,7 @@ class AIAnalyticsService:
                     title="High Question Frequency",
                     description="Student asks many questions, showing active engagement",
                     confidence=0.75,
-                    priority="low",
+                    priority=Priority.LOW,
                     action_items=[
                         "Encourage continued curiosity",
                         "Provide comprehensive resources"
@@ -521,7 +695,7 @@ class AIAnalyticsService:
                     title="Syntax Mastery Challenge Predicted",
                     description="High syntax error frequency suggests potential struggle with language fundamentals",
                     confidence=0.7,
-                    priority="medium",
+                    priority=Priority.MEDIUM,
                     action_items=[
                         "Provide syntax reference materials",
                         "Include syntax-focused exercises",
@@ -537,12 +711,14 @@ class AIAnalyticsService:
         if not sessions:
             return 0.0
         
-        # Simple engagement calculation based on multiple factors
-        total_interactions = sum(s.total_interactions for s in sessions)
-        avg_active_time_ratio = np.mean([
-            s.active_time_seconds / max(1, (s.end_time or datetime.utcnow() - s.start_time).total_seconds())
-            for s in sessions
-        ])
+        # Simple engagement calculation based on multiple factors, in one pass
+        now = datetime.utcnow()
+        total_interactions = 0
+        active_time_ratio_sum = 0.0
+        for s in sessions:
+            total_interactions += s.total_interactions
+            active_time_ratio_sum += s.active_time_seconds / max(1, ((s.end_time or now) - s.start_time).total_seconds())
+        avg_active_time_ratio = active_time_ratio_sum / len(sessions)
         
         # Normalize and combine metrics
         interaction_score = min(1.0, total_interactions / 100)  # Normalize to 100 interactions
@@ -550,18 +726,16 @@ class AIAnalyticsService:
         
         return (interaction_score + time_score) / 2
     
-    def _calculate_performance_trend(self, submissions) -> str:
-        """Calculate performance trend over time"""
-        if len(submissions) < 3:
+    def _calculate_performance_trend(self, submission_counts: Dict[str, int]) -> str:
+        """Calculate performance trend over time (first vs second half of submissions)"""
+        total = submission_counts["total"]
+        if total < 3:
             return "insufficient_data"
         
-        # Sort by timestamp and analyze success rate over time
-        sorted_submissions = sorted(submissions, key=lambda x: x.timestamp)
-        first_half = sorted_submissions[:len(sorted_submissions)//2]
-        second_half = sorted_submissions[len(sorted_submissions)//2:]
-        
-        first_success_rate = len([s for s in first_half if s.is_correct]) / len(first_half)
-        second_success_rate = len([s for s in second_half if s.is_correct]) / len(second_half)
+        first_total = submission_counts["first_half_total"]
+        first_correct = submission_counts["first_half_correct"]
+        first_success_rate = first_correct / first_total
+        second_success_rate = (submission_counts["correct"] - first_correct) / (total - first_total)
         
         if second_success_rate > first_success_rate + 0.1:
             return "improving"
@@ -575,18 +749,19 @@ class AIAnalyticsService:
         if len(sessions) < 2:
             return 1.0
         
-        # Analyze time gaps between sessions
-        sorted_sessions = sorted(sessions, key=lambda x: x.start_time)
-        gaps = []
-        for i in range(1, len(sorted_sessions)):
-            gap = (sorted_sessions[i].start_time - sorted_sessions[i-1].start_time).days
-            gaps.append(gap)
-        
-        if not gaps:
-            return 1.0
+        # Analyze whole-day gaps between consecutive session starts; running
+        # (Welford) mean/variance so no gap list is built
+        start_times = sorted(s.start_time for s in sessions)
+        gap_mean = 0.0
+        gap_m2 = 0.0
+        for count, (previous, current) in enumerate(zip(start_times, start_times[1:]), start=1):
+            gap = (current - previous).days
+            delta = gap - gap_mean
+            gap_mean += delta / count
+            gap_m2 += delta * (gap - gap_mean)
         
         # Lower variance = higher consistency
-        gap_variance = np.var(gaps)
+        gap_variance = gap_m2 / (len(start_times) - 1)
         consistency = max(0.0, 1.0 - gap_variance / 100)  # Normalize variance
         
         return consistency
@@ -596,42 +771,34 @@ class AIAnalyticsService:
         if not chat_interactions:
             return 0.0
         
-        help_requests = len([c for c in chat_interactions 
-                           if c.message_type in [MessageType.HINT_REQUEST, MessageType.STUDENT_QUESTION]])
+        help_requests = sum(1 for c in chat_interactions if c.message_type in HELP_REQUEST_MESSAGE_TYPES)
         
         return help_requests / len(chat_interactions)
     
     def _prioritize_insights(self, insights: List[LearningInsight]) -> List[LearningInsight]:
         """Prioritize insights by confidence and priority"""
         # Filter by confidence threshold
-        filtered_insights = [i for i in insights if i.confidence >= self.confidence_threshold]
-        
-        # Sort by priority and confidence
-        priority_order = {"critical": 4, "high": 3, "medium": 2, "low": 1}
+        filtered_insights = (i for i in insights if i.confidence >= self.confidence_threshold)
         
-        filtered_insights.sort(
-            key=lambda x: (priority_order.get(x.priority, 0), x.confidence),
-            reverse=True
-        )
-        
-        return filtered_insights[:10]  # Return top 10 insights
+        # Top 10 by priority and confidence (same order as a full descending sort)
+        return heapq.nlargest(10, filtered_insights, key=lambda x: (x.priority, x.confidence))
     
     def _generate_intervention_suggestions(
         self,
-        risk_level: str,
+        risk_level: Priority,
         risk_factors: List[str],
         tracking_data: Dict[str, Any]
     ) -> List[str]:
         """Generate intervention suggestions based on risk assessment"""
         suggestions = []
         
-        if risk_level == "critical":
+        if risk_level == Priority.CRITICAL:
             suggestions.extend([
                 "Immediate instructor intervention recommended",
                 "Schedule one-on-one support session",
                 "Consider peer tutoring or study group"
             ])
-        elif risk_level == "high":
+        elif risk_level == Priority.HIGH:
             suggestions.extend([
                 "Proactive instructor check-in within 48 hours",
                 "Provide additional learning resources",
@@ -668,61 +835,30 @@ class AIAnalyticsService:
         if not session_trackings:
             return {}
         
-        progress_scores = [t.progress_percentage for t in session_trackings]
-        struggle_scores = [t.current_struggle_score for t in session_trackings]
+        # One array per metric, reused by every statistic below
+        n = len(session_trackings)
+        progress = np.fromiter((t.progress_percentage for t in session_trackings), np.float64, n)
+        struggle = np.fromiter((t.current_struggle_score for t in session_trackings), np.float64, n)
+        quartiles = np.percentile(progress, [25, 50, 75])
         
         return {
             "progress_distribution": {
-                "mean": np.mean(progress_scores),
-                "median": np.median(progress_scores),
-                "std_dev": np.std(progress_scores),
-                "quartiles": np.percentile(progress_scores, [25, 50, 75]).tolist()
+                "mean": float(progress.mean()),
+                "median": float(quartiles[1]),
+                "std_dev": float(progress.std()),
+                "quartiles": quartiles.tolist()
             },
             "struggle_distribution": {
-                "mean": np.mean(struggle_scores),
-                "students_struggling": len([s for s in struggle_scores if s > 70]),
-                "high_performers": len([p for p in progress_scores if p > 80])
+                "mean": float(struggle.mean()),
+                "students_struggling": int((struggle > 70).sum()),
+                "high_performers": int((progress > 80).sum())
             }
         }
     
-    def _predict_completion_probability(self, tracking: StudentSessionTracking) -> float:
-        """Predict probability of successful completion for a student"""
-        # Simple prediction based on current metrics
-        factors = []
-        
-        # Progress factor
-        progress_factor = tracking.progress_percentage / 100
-        factors.append(progress_factor)
-        
-        # Engagement factor
-        if tracking.total_interactions > 0:
-            engagement_factor = min(1.0, tracking.total_interactions / 50)  # Normalize to 50 interactions
-            factors.append(engagement_factor)
-        
-        # Struggle factor (inverted)
-        struggle_factor = max(0.0, 1.0 - tracking.current_struggle_score / 100)
-        factors.append(struggle_factor)
-        
-        # Success rate factor
-        success_factor = tracking.success_rate
-        factors.append(success_factor)
-        
-        return np.mean(factors) if factors else 0.5
-    
-    def _predict_struggle_probability(self, tracking: StudentSessionTracking) -> float:
-        """Predict probability of future struggle"""
-        return tracking.current_struggle_score / 100
-    
-    def _calculate_prediction_confidence(self, session_trackings) -> float:
-        """Calculate confidence in predictions based on data quality"""
-        if not session_trackings:
-            return 0.0
-        
-        # Confidence based on data volume and recency
-        total_interactions = sum(t.total_interactions for t in session_trackings)
-        confidence = min(1.0, total_interactions / 100)  # More interactions = higher confidence
-        
-        return confidence
+    def _calculate_prediction_confidence(self, total_interactions: int) -> float:
+        """Calculate confidence in predictions based on data volume"""
+        # More interactions = higher confidence
+        return min(1.0, total_interactions / 100)
     
     def _generate_instructor_recommendations(self, cohort_analysis, at_risk_students) -> List[str]:
         """Generate recommendations for instructors"""
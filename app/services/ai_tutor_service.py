@@ -6,7 +6,7 @@ Provides personalized learning assistance and adaptive responses
 import json
 import logging
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, timedelta
 from openai import OpenAI
 from sqlmodel import Session
 
@@ -14,6 +14,7 @@ from app.core.config import settings
 from app.models.session import BubbleNode, StudentState
 from app.models.analytics import EventLog, EventType, MessageType
 from app.services.student_tracking_service import StudentTrackingService
+from app.services.event_ingest_service import event_ingest
 from app.utils.ai_utils import ask_gpt, is_ai_available
 from app.schemas.ai_tutor import (
     TutorRequest, TutorResponse, HintRequest, HintResponse,
@@ -22,6 +23,9 @@ from app.schemas.ai_tutor import (
 
 logger = logging.getLogger(__name__)
 
+# EventLog is partitioned by month; recent-event lookups stay within this window
+RECENT_EVENTS_WINDOW_DAYS = 30
+
 # AI utilities are now imported from app.utils.ai_utils
 
 
@@ -370,13 +374,19 @@ class AITutorService:
         base_cost = 5
         return base_cost * hint_level
     
-    def _get_recent_events(self, student_id: int, db: Session) -> List[EventLog]:
+    def _get_recent_events(
+        self, student_id: int, db: Session, since: Optional[datetime] = None
+    ) -> List[EventLog]:
         """Get recent student events for analysis"""
         from sqlmodel import select
         
+        if since is None:
+            since = datetime.utcnow() - timedelta(days=RECENT_EVENTS_WINDOW_DAYS)
+        
         try:
             stmt = (select(EventLog)
                     .where(EventLog.student_id == student_id)
+                    .where(EventLog.timestamp >= since)
                     .order_by(EventLog.timestamp.desc())
                     .limit(20))
             
@@ -469,8 +479,8 @@ class AITutorService:
             # Calculate response time
             response_time_ms = int((datetime.utcnow() - start_time).total_seconds() * 1000)
             
-            # Traditional EventLog for backward compatibility
-            event = EventLog(
+            # Traditional EventLog for backward compatibility (written in batches)
+            event_ingest.submit(
                 event_type=EventType.TUTOR_INTERACTION,
                 student_id=student_context.get("student_id", 1),
                 session_id=student_context.get("session_id"),
@@ -482,12 +492,9 @@ class AITutorService:
                     "suggestions_count": len(response.suggestions),
                     "response_time_ms": response_time_ms
                 },
-                response_time_ms=response_time_ms,
-                timestamp=datetime.utcnow()
+                response_time_ms=response_time_ms
             )
             
-            db.add(event)
-            
             # Enhanced tracking if session tracking is available
             if session_tracking:
                 await self.tracking_service.track_chat_interaction(
@@ -543,7 +550,7 @@ class AITutorService:
         """Log AI tutor interaction for analytics (legacy method)"""
         
         try:
-            event = EventLog(
+            event_ingest.submit(
                 event_type=EventType.TUTOR_INTERACTION,
                 student_id=student_context.get("student_id", 1),
                 session_id=student_context.get("session_id"),
@@ -553,12 +560,8 @@ class AITutorService:
                     "response_length": len(response.response),
                     "confidence": response.confidence,
                     "suggestions_count": len(response.suggestions)
-                },
-                timestamp=datetime.utcnow()
+                }
             )
-            
-            db.add(event)
-            db.commit()
         except Exception as e:
             logger.error(f"Error logging tutor interaction: {e}")
     
@@ -0,0 +1,172 @@
+"""
+Archive Service - Columnar cold storage for aged telemetry partitions
+Monthly eventlog/codeinteraction partitions past the hot window are exported to
+Parquet (hive-partitioned by month, and by event_type for eventlog), then detached
+and dropped. Longitudinal analytics read the archive through DuckDB.
+"""
+
+import logging
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+import duckdb
+import orjson
+import pyarrow as pa
+import pyarrow.parquet as pq
+from sqlalchemy import text
+from sqlmodel import Session
+
+from app.core.config import settings
+from app.core.database import engine
+from app.models.analytics import CodeInteractionType, EventType
+
+logger = logging.getLogger(__name__)
+
+# Partitions stay in Postgres until their month ended this long ago. Hot queries
+# look back up to 90 days (progress tracking), so archive only beyond that.
+ARCHIVE_AFTER_DAYS = 90
+
+# Rows fetched from Postgres and written per Parquet row group
+ARCHIVE_BATCH_ROWS = 50_000
+
+# Per-table export shape: the select/cleanup SQL for one partition, JSONB columns
+# stored as JSON text, SMALLINT enum codes decoded back to their string values,
+# and partition_cols that become hive directories under month=YYYY-MM
+ARCHIVED_TABLES: Dict[str, Dict[str, Any]] = {
+    "eventlog": {
+        "select": 'SELECT * FROM "{partition}"',
+        "cleanup": None,
+        "json_columns": ("payload",),
+        "enum_columns": {"event_type": list(EventType)},
+        "partition_cols": ["event_type"],
+    },
+    "codeinteraction": {
+        # Code content is archived alongside its metrics, then removed from the blob table
+        "select": (
+            'SELECT p.*, b.code_snapshot_zst, b.code_diff FROM "{partition}" p '
+            'LEFT JOIN code_interaction_blob b ON b.interaction_id = p.id'
+        ),
+        "cleanup": 'DELETE FROM code_interaction_blob b USING "{partition}" p WHERE b.interaction_id = p.id',
+        "json_columns": ("additional_metadata",),
+        "enum_columns": {"interaction_type": list(CodeInteractionType)},
+        "partition_cols": [],
+    },
+}
+
+
+def archive_root(table: str) -> Path:
+    """Directory holding a table's Parquet archive"""
+    return Path(settings.cold_storage_path) / table
+
+
+def archive_glob(table: str) -> str:
+    """read_parquet() glob covering every archived file of a table"""
+    return str(archive_root(table) / "**" / "*.parquet")
+
+
+def archivable_partitions(db: Session, table: str, today: Optional[date] = None) -> List[str]:
+    """Monthly partitions of `table` whose month ended more than ARCHIVE_AFTER_DAYS ago"""
+    cutoff = (today or date.today()) - timedelta(days=ARCHIVE_AFTER_DAYS)
+    partitions = db.execute(text("""
+        SELECT child.relname
+        FROM pg_inherits
+        JOIN pg_class parent ON parent.oid = pg_inherits.inhparent
+        JOIN pg_class child ON child.oid = pg_inherits.inhrelid
+        WHERE parent.relname = :table
+        ORDER BY child.relname
+    """).bindparams(table=table)).scalars().all()
+
+    archivable = []
+    for partition in partitions:
+        month_start = _partition_month(table, partition)
+        # The default partition and anything not named <table>_YYYY_MM is left alone
+        if month_start is None:
+            continue
+        next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        if next_month <= cutoff:
+            archivable.append(partition)
+    return archivable
+
+
+def _partition_month(table: str, partition: str) -> Optional[date]:
+    try:
+        return datetime.strptime(partition, f"{table}_%Y_%m").date()
+    except ValueError:
+        return None
+
+
+def _to_arrow(rows: Sequence[Dict[str, Any]], shape: Dict[str, Any], month: str) -> pa.Table:
+    columns: Dict[str, List[Any]] = {name: [row[name] for row in rows] for name in rows[0]}
+    for name in shape["json_columns"]:
+        columns[name] = [orjson.dumps(value).decode() if value is not None else None for value in columns[name]]
+    for name, members in shape["enum_columns"].items():
+        columns[name] = [members[code - 1].value if code is not None else None for code in columns[name]]
+    columns["month"] = [month] * len(rows)
+    return pa.table(columns)
+
+
+def archive_partition(db: Session, table: str, partition: str) -> int:
+    """
+    Export one monthly partition to Parquet, then detach and drop it
+
+    Returns the number of rows archived. The partition is only dropped after
+    every batch has been written.
+    """
+    shape = ARCHIVED_TABLES[table]
+    month = _partition_month(table, partition).strftime("%Y-%m")
+    root = archive_root(table)
+
+    result = db.connection().execution_options(
+        stream_results=True, yield_per=ARCHIVE_BATCH_ROWS
+    ).execute(text(shape["select"].format(partition=partition)))
+
+    archived = 0
+    for batch_number, batch in enumerate(result.mappings().partitions()):
+        pq.write_to_dataset(
+            _to_arrow(batch, shape, month),
+            root_path=str(root),
+            partition_cols=["month", *shape["partition_cols"]],
+            basename_template=f"{partition}-{batch_number}-{{i}}.parquet",
+            existing_data_behavior="overwrite_or_ignore",
+        )
+        archived += len(batch)
+
+    if shape["cleanup"]:
+        db.execute(text(shape["cleanup"].format(partition=partition)))
+    db.execute(text(f'ALTER TABLE {table} DETACH PARTITION "{partition}"'))
+    db.execute(text(f'DROP TABLE "{partition}"'))
+    db.commit()
+
+    logger.info("Archived %s rows from %s to %s", archived, partition, root)
+    return archived
+
+
+def archive_cold_partitions(today: Optional[date] = None) -> Dict[str, int]:
+    """Archive every eligible partition; returns rows archived per partition"""
+    archived: Dict[str, int] = {}
+    with Session(engine) as db:
+        for table in ARCHIVED_TABLES:
+            for partition in archivable_partitions(db, table, today):
+                try:
+                    archived[partition] = archive_partition(db, table, partition)
+                except Exception as e:
+                    db.rollback()
+                    logger.error("Failed to archive %s: %s", partition, e)
+    return archived
+
+
+def query_archive(table: str, where: str = "TRUE", params: Optional[List[Any]] = None,
+                  columns: str = "*") -> List[tuple]:
+    """
+    Query a table's Parquet archive with DuckDB
+
+    Only the selected columns are read from disk. `where` may use ? placeholders
+    bound from `params`, and can filter on the month/event_type hive columns to
+    skip whole directories.
+    """
+    with duckdb.connect() as con:
+        return con.execute(
+            f"SELECT {columns} FROM read_parquet(?, hive_partitioning = true) WHERE {where}",
+            [archive_glob(table), *(params or [])],
+        ).fetchall()
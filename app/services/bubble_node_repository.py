@@ -0,0 +1,94 @@
+"""
+Bubble Node Repository - Cached (session_id, node_id) lookups for BubbleNode
+BubbleNode rows are the runtime source of truth for bubble content: they are
+materialized from the session graph when it is created or published. Bubble
+content is read on every advance and tutor request but edited rarely, so
+lookups are served from an in-process LRU cache of detached rows
+"""
+
+import time
+from functools import lru_cache
+from typing import Optional
+
+from sqlalchemy import func
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import Session, select
+
+from app.core.database import engine
+from app.models.session import BubbleNode, BubbleType, Session as SessionModel
+
+BUBBLE_CACHE_SIZE = 4096
+
+# Entries are keyed by a time bucket of this length, so edits made through other
+# worker processes are picked up within one bucket
+BUBBLE_CACHE_TTL_SECONDS = 60
+
+
+@lru_cache(maxsize=BUBBLE_CACHE_SIZE)
+def _load_bubble(session_id: int, node_id: str, ttl_bucket: int) -> Optional[BubbleNode]:
+    with Session(engine) as db:
+        return db.exec(select(BubbleNode).where(
+            BubbleNode.session_id == session_id,
+            BubbleNode.node_id == node_id
+        )).first()
+
+
+class BubbleNodeRepository:
+    """Lookups for BubbleNode rows by their (session_id, node_id) key"""
+    
+    @staticmethod
+    def get_cached(session_id: int, node_id: str) -> Optional[BubbleNode]:
+        """
+        A bubble by session and node id, from the in-process cache
+        
+        The row is shared between requests and detached: treat it as read-only and
+        load through get() when it will be modified.
+        """
+        return _load_bubble(session_id, node_id, int(time.monotonic() // BUBBLE_CACHE_TTL_SECONDS))
+    
+    @staticmethod
+    def get(db: Session, session_id: int, node_id: str) -> Optional[BubbleNode]:
+        """A bubble by session and node id, attached to db"""
+        return db.exec(select(BubbleNode).where(
+            BubbleNode.session_id == session_id,
+            BubbleNode.node_id == node_id
+        )).first()
+    
+    @staticmethod
+    def upsert_from_graph(db: Session, session: SessionModel) -> int:
+        """
+        Insert or update a BubbleNode row for every node in session.graph_json
+        
+        One INSERT ... ON CONFLICT (session_id, node_id) statement; existing rows only
+        take the graph's type and title, so authored content is kept. Does not
+        commit. Returns the number of graph nodes.
+        """
+        nodes = (session.graph_json or {}).get("nodes", [])
+        if not nodes:
+            return 0
+        
+        statement = insert(BubbleNode.__table__).values([
+            {
+                "session_id": session.id,
+                "node_id": node["id"],
+                "type": BubbleType(node["type"]),
+                "title": node["title"],
+                "content_md": "",  # Filled in through the bubble endpoints
+                "coin_reward": session.coins_per_bubble,
+            }
+            for node in nodes
+        ])
+        db.execute(statement.on_conflict_do_update(
+            index_elements=["session_id", "node_id"],
+            set_={
+                "type": statement.excluded.type,
+                "title": statement.excluded.title,
+                "updated_at": func.now(),
+            }
+        ))
+        return len(nodes)
+    
+    @staticmethod
+    def invalidate():
+        """Drop this process's cached bubbles; call after bubbles are changed or deleted"""
+        _load_bubble.cache_clear()
@@ -0,0 +1,214 @@
+"""
+Cache Service - Redis read-through cache for hot Session and StudentState rows
+Cached rows are detached copies for read-only use; writes go through the ORM and
+invalidate their keys when the transaction commits. Writes made anywhere else
+(other services, SQL, migrations) are picked up from Postgres NOTIFY triggers by
+CacheInvalidationListener; TTLs remain as a safety net.
+"""
+
+import asyncio
+import functools
+import logging
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import orjson
+import psycopg
+import redis
+import redis.asyncio
+from sqlalchemy import event
+from sqlmodel import Session, select
+
+from app.core.config import settings
+from app.core.database import libpq_database_url
+from app.models.session import Session as SessionModel, StudentState
+from app.services.bubble_node_repository import BubbleNodeRepository
+
+logger = logging.getLogger(__name__)
+
+SESSION_CACHE_TTL_SECONDS = 60
+STUDENT_STATE_CACHE_TTL_SECONDS = 5
+
+# Keys to DEL once the owning transaction commits
+_PENDING_INVALIDATIONS = "cache_invalidations"
+
+# NOTIFY channels raised by the session/studentstate triggers; payloads are
+# "<session_id>" and "<student_id>:<session_id>"
+SESSION_CHANGES_CHANNEL = "session_changes"
+STUDENT_STATE_CHANGES_CHANNEL = "studentstate_changes"
+LISTENER_RECONNECT_SECONDS = 5.0
+
+
+@functools.cache
+def _redis() -> redis.Redis:
+    return redis.Redis.from_url(settings.redis_url, decode_responses=False)
+
+
+def session_key(session_id: int) -> str:
+    return f"session:{session_id}"
+
+
+def student_state_key(student_id: int, session_id: int) -> str:
+    return f"ss:{student_id}:{session_id}"
+
+
+def _cache_key(instance) -> Optional[str]:
+    if isinstance(instance, SessionModel):
+        return session_key(instance.id)
+    if isinstance(instance, StudentState):
+        return student_state_key(instance.student_id, instance.session_id)
+    return None
+
+
+def invalidate_on_commit(db: Session, *keys: str):
+    """Drop keys from the cache when db's current transaction commits"""
+    db.info.setdefault(_PENDING_INVALIDATIONS, set()).update(keys)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_invalidations(db, flush_context):
+    keys = {
+        key for instance in (*db.new, *db.dirty, *db.deleted)
+        if (key := _cache_key(instance)) is not None
+    }
+    if keys:
+        invalidate_on_commit(db, *keys)
+
+
+@event.listens_for(Session, "after_commit")
+def _apply_invalidations(db):
+    keys = db.info.pop(_PENDING_INVALIDATIONS, None)
+    if not keys:
+        return
+    try:
+        _redis().delete(*keys)
+    except redis.RedisError as e:
+        # Entries expire on their own TTL
+        logger.warning("Failed to invalidate %s cache keys: %s", len(keys), e)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_invalidations(db):
+    db.info.pop(_PENDING_INVALIDATIONS, None)
+
+
+def _mget(keys: List[str]) -> List[Optional[bytes]]:
+    try:
+        return _redis().mget(keys)
+    except redis.RedisError as e:
+        logger.warning("Cache read failed, falling back to the database: %s", e)
+        return [None] * len(keys)
+
+
+def _set_many(entries: Iterable[Tuple[str, bytes]], ttl_seconds: int):
+    try:
+        pipeline = _redis().pipeline(transaction=False)
+        for key, value in entries:
+            pipeline.set(key, value, ex=ttl_seconds)
+        pipeline.execute()
+    except redis.RedisError as e:
+        logger.warning("Cache write failed: %s", e)
+
+
+def get_cached_sessions(session_ids: List[int], db: Session) -> Dict[int, SessionModel]:
+    """Sessions by id (read-only copies), fetched with one MGET plus one query for misses"""
+    if not session_ids:
+        return {}
+
+    sessions: Dict[int, SessionModel] = {}
+    for session_id, cached in zip(session_ids, _mget([session_key(i) for i in session_ids])):
+        if cached is not None:
+            sessions[session_id] = SessionModel.model_validate(orjson.loads(cached))
+
+    missing = [session_id for session_id in session_ids if session_id not in sessions]
+    if missing:
+        loaded = db.exec(select(SessionModel).where(SessionModel.id.in_(missing))).all()
+        _set_many(
+            ((session_key(s.id), orjson.dumps(s.model_dump())) for s in loaded),
+            SESSION_CACHE_TTL_SECONDS
+        )
+        sessions.update({s.id: s for s in loaded})
+    return sessions
+
+
+def get_cached_session(session_id: int, db: Session) -> Optional[SessionModel]:
+    """Session by id (read-only copy on a cache hit)"""
+    return get_cached_sessions([session_id], db).get(session_id)
+
+
+def get_cached_student_state(student_id: int, session_id: int, db: Session) -> Optional[StudentState]:
+    """A student's state for a session (read-only copy on a cache hit)"""
+    key = student_state_key(student_id, session_id)
+    cached = _mget([key])[0]
+    if cached is not None:
+        return StudentState.model_validate(orjson.loads(cached))
+
+    state = db.exec(select(StudentState).where(
+        StudentState.student_id == student_id,
+        StudentState.session_id == session_id
+    )).first()
+    if state is not None:
+        _set_many([(key, orjson.dumps(state.model_dump()))], STUDENT_STATE_CACHE_TTL_SECONDS)
+    return state
+
+
+def _key_for_notification(channel: str, payload: str) -> Optional[str]:
+    if channel == SESSION_CHANGES_CHANNEL:
+        return session_key(int(payload))
+    if channel == STUDENT_STATE_CHANGES_CHANNEL:
+        student_id, session_id = payload.split(":")
+        return student_state_key(int(student_id), int(session_id))
+    return None
+
+
+class CacheInvalidationListener:
+    """LISTENs for session/studentstate change notifications and drops the cached rows"""
+
+    def __init__(self, reconnect_seconds: float = LISTENER_RECONNECT_SECONDS):
+        self.reconnect_seconds = reconnect_seconds
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start listening (idempotent)"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _run(self):
+        cache = redis.asyncio.Redis.from_url(settings.redis_url)
+        try:
+            while True:
+                try:
+                    await self._listen(cache)
+                except (psycopg.Error, redis.RedisError, OSError) as e:
+                    # Missed notifications are covered by the cache TTLs
+                    logger.warning("Cache invalidation listener disconnected: %s", e)
+                await asyncio.sleep(self.reconnect_seconds)
+        finally:
+            await cache.aclose()
+
+    async def _listen(self, cache: "redis.asyncio.Redis"):
+        async with await psycopg.AsyncConnection.connect(
+            libpq_database_url(settings.database_url), autocommit=True
+        ) as connection:
+            await connection.execute(f"LISTEN {SESSION_CHANGES_CHANNEL}")
+            await connection.execute(f"LISTEN {STUDENT_STATE_CHANGES_CHANNEL}")
+            async for notification in connection.notifies():
+                key = _key_for_notification(notification.channel, notification.payload)
+                if key is None:
+                    continue
+                await cache.delete(key)
+                if notification.channel == SESSION_CHANGES_CHANNEL:
+                    # Bubbles are cached per process and rewritten on publish
+                    BubbleNodeRepository.invalidate()
+
+
+# Global listener, started with the application
+cache_invalidation_listener = CacheInvalidationListener()
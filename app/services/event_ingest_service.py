@@ -0,0 +1,405 @@
+"""
+Event Ingest Service - Batched, append-only telemetry writes
+EventLog and keystroke-level CodeInteraction rows are queued in-process and flushed
+in batches: EventLog via PostgreSQL COPY into an UNLOGGED staging table (ORM insert
+for small batches), CodeInteraction and its blob via Core executemany inserts plus
+one session-tracking metrics update, and CoinTransaction via one INSERT ... SELECT
+that computes running balances
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import orjson
+from sqlalchemy import Integer, SmallInteger, String, bindparam, insert, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.exc import DBAPIError, InterfaceError, OperationalError
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import async_engine
+from app.models.analytics import (
+    EVENT_TYPE_CODES, TRANSACTION_TYPE_CODES, CodeInteraction, CodeInteractionBlob, CoinTransaction,
+    EventLog, StudentBalance, StudentSessionTracking
+)
+
+logger = logging.getLogger(__name__)
+
+# Flush when this many rows are queued or the oldest queued row is this old
+EVENT_BATCH_SIZE = 500
+EVENT_FLUSH_INTERVAL_SECONDS = 0.2
+
+# Keystroke snapshots are larger and less urgent; batch them more aggressively
+CODE_INTERACTION_BATCH_SIZE = 1000
+CODE_INTERACTION_FLUSH_INTERVAL_SECONDS = 0.5
+
+# Large batches are COPYed into this UNLOGGED table (no WAL) and moved into the
+# durable, partitioned eventlog by EventStagingMover
+EVENTLOG_STAGING_TABLE = "eventlog_staging"
+STAGING_MOVE_INTERVAL_SECONDS = 1.0
+
+# COPY has fixed setup cost; below this many rows an ORM insert is cheaper
+COPY_MIN_ROWS = 100
+
+# Coin transactions are user-visible balances; keep the batching window short
+COIN_TRANSACTION_BATCH_SIZE = 200
+COIN_TRANSACTION_FLUSH_INTERVAL_SECONDS = 0.1
+
+# Coin awards are balances, not telemetry: a batch that failed on a connection
+# error is retried after this delay instead of dropped
+COIN_TRANSACTION_RETRY_SECONDS = 1.0
+
+# Row keys written to code_interaction_blob rather than codeinteraction
+CODE_INTERACTION_BLOB_FIELDS = ("code_snapshot_zst", "code_diff")
+
+EVENTLOG_COPY_COLUMNS = (
+    "event_type", "student_id", "session_id", "node_id", "payload",
+    "response_time_ms", "success", "score", "user_agent", "ip_address"
+)
+
+
+def _copy_record(row: Dict[str, Any]) -> tuple:
+    """Convert an EventLog row dict into a COPY record in EVENTLOG_COPY_COLUMNS order"""
+    payload = row.get("payload")
+    return (
+        # COPY bypasses SmallIntEnum, so encode the SMALLINT here
+        EVENT_TYPE_CODES[row["event_type"]],
+        row["student_id"],
+        row.get("session_id"),
+        row.get("node_id"),
+        orjson.dumps(payload).decode() if payload is not None else None,
+        row.get("response_time_ms"),
+        row.get("success"),
+        row.get("score"),
+        row.get("user_agent"),
+        row.get("ip_address"),
+    )
+
+
+async def copy_event_logs(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """Write EventLog rows (large batches via COPY into staging) and commit; returns the row count"""
+    if not rows:
+        return 0
+
+    if len(rows) < COPY_MIN_ROWS:
+        session.add_all([EventLog(**row) for row in rows])
+    else:
+        connection = await session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            EVENTLOG_STAGING_TABLE,
+            records=[_copy_record(row) for row in rows],
+            columns=EVENTLOG_COPY_COLUMNS
+        )
+
+    await session.commit()
+    return len(rows)
+
+
+async def move_staged_event_logs(session: AsyncSession) -> int:
+    """Move staged rows into eventlog in one transaction; returns the number of rows moved"""
+    result = await session.execute(text(
+        f"WITH moved AS (DELETE FROM {EVENTLOG_STAGING_TABLE} RETURNING *) "
+        f"INSERT INTO {EventLog.__tablename__} SELECT * FROM moved"
+    ))
+    await session.commit()
+    return result.rowcount
+
+
+# Buffered code interactions bump their session tracking's change counter and
+# activity time once per batch, in the same transaction as the insert
+BUMP_SESSION_CODE_METRICS_SQL = text(f"""
+    UPDATE {StudentSessionTracking.__tablename__} t
+    SET total_code_changes = t.total_code_changes + c.changes,
+        last_activity = greatest(t.last_activity, timezone('utc', now()))
+    FROM unnest(:tracking_ids, :changes) AS c(id, changes)
+    WHERE t.id = c.id
+""").bindparams(
+    bindparam("tracking_ids", type_=ARRAY(Integer)),
+    bindparam("changes", type_=ARRAY(Integer)),
+)
+
+
+async def insert_code_interactions(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """
+    Insert CodeInteraction rows and their blobs with Core executemany (insertmanyvalues),
+    update their session trackings' code metrics and commit; rows carry both metric
+    and CODE_INTERACTION_BLOB_FIELDS keys
+    """
+    if not rows:
+        return 0
+
+    metric_rows = [
+        {key: value for key, value in row.items() if key not in CODE_INTERACTION_BLOB_FIELDS}
+        for row in rows
+    ]
+    table = CodeInteraction.__table__
+    result = await session.execute(
+        insert(table).returning(table.c.id, sort_by_parameter_order=True), metric_rows
+    )
+    blob_rows = [
+        {"interaction_id": interaction_id, **{key: row.get(key) for key in CODE_INTERACTION_BLOB_FIELDS}}
+        for interaction_id, row in zip(result.scalars().all(), rows)
+    ]
+    await session.execute(insert(CodeInteractionBlob.__table__), blob_rows)
+    changes = Counter(row["session_tracking_id"] for row in rows)
+    await session.execute(BUMP_SESSION_CODE_METRICS_SQL, {
+        "tracking_ids": list(changes),
+        "changes": list(changes.values()),
+    })
+    await session.commit()
+    return len(rows)
+
+
+# Every worker runs its own flusher, so a batch first locks its students'
+# student_balance rows (creating missing ones), in student_id order so
+# concurrent batches can't deadlock. A concurrent batch for the same student
+# then waits for this transaction and reads the balance it leaves behind.
+ENSURE_STUDENT_BALANCES_SQL = text(f"""
+    INSERT INTO {StudentBalance.__tablename__} (student_id)
+    SELECT DISTINCT student_id FROM unnest(:student_ids) AS s(student_id)
+    ORDER BY student_id
+    ON CONFLICT (student_id) DO NOTHING
+""").bindparams(bindparam("student_ids", type_=ARRAY(Integer)))
+
+LOCK_STUDENT_BALANCES_SQL = text(f"""
+    SELECT student_id FROM {StudentBalance.__tablename__}
+    WHERE student_id = ANY(:student_ids)
+    ORDER BY student_id
+    FOR UPDATE
+""").bindparams(bindparam("student_ids", type_=ARRAY(Integer)))
+
+# One statement for the whole batch: each row's balance_after is the student's
+# current (locked) balance plus a running SUM over the batch, in submission
+# order. student_balance is updated by a statement-level trigger after the insert.
+INSERT_COIN_TRANSACTIONS_SQL = text(f"""
+    INSERT INTO {CoinTransaction.__tablename__} (
+        student_id, transaction_type, amount, session_id, node_id, description,
+        transaction_metadata, balance_before, balance_after
+    )
+    SELECT
+        b.student_id, b.transaction_type, b.amount, b.session_id, b.node_id, b.description,
+        b.transaction_metadata, b.balance_after - b.amount, b.balance_after
+    FROM (
+        SELECT
+            s.*,
+            coalesce(sb.balance, 0)
+                + sum(s.amount) OVER (PARTITION BY s.student_id ORDER BY s.ord)
+                AS balance_after
+        FROM unnest(
+            :student_ids, :transaction_types, :amounts, :session_ids, :node_ids,
+            :descriptions, CAST(:transaction_metadata AS jsonb[])
+        ) WITH ORDINALITY AS s(
+            student_id, transaction_type, amount, session_id, node_id,
+            description, transaction_metadata, ord
+        )
+        LEFT JOIN {StudentBalance.__tablename__} sb ON sb.student_id = s.student_id
+    ) b
+""").bindparams(
+    bindparam("student_ids", type_=ARRAY(Integer)),
+    bindparam("transaction_types", type_=ARRAY(SmallInteger)),
+    bindparam("amounts", type_=ARRAY(Integer)),
+    bindparam("session_ids", type_=ARRAY(Integer)),
+    bindparam("node_ids", type_=ARRAY(String)),
+    bindparam("descriptions", type_=ARRAY(String)),
+    bindparam("transaction_metadata", type_=ARRAY(String)),
+)
+
+
+async def insert_coin_transactions(session: AsyncSession, rows: List[Dict[str, Any]]) -> int:
+    """Insert CoinTransaction rows with balances computed in SQL and commit"""
+    if not rows:
+        return 0
+
+    student_ids = [row["student_id"] for row in rows]
+    await session.execute(ENSURE_STUDENT_BALANCES_SQL, {"student_ids": student_ids})
+    await session.execute(LOCK_STUDENT_BALANCES_SQL, {"student_ids": student_ids})
+    await session.execute(INSERT_COIN_TRANSACTIONS_SQL, {
+        "student_ids": student_ids,
+        # Raw SQL bypasses SmallIntEnum, so encode the SMALLINT here
+        "transaction_types": [TRANSACTION_TYPE_CODES[row["transaction_type"]] for row in rows],
+        "amounts": [row["amount"] for row in rows],
+        "session_ids": [row.get("session_id") for row in rows],
+        "node_ids": [row.get("node_id") for row in rows],
+        "descriptions": [row["description"] for row in rows],
+        "transaction_metadata": [
+            orjson.dumps(row["transaction_metadata"]).decode()
+            if row.get("transaction_metadata") is not None else None
+            for row in rows
+        ],
+    })
+    await session.commit()
+    return len(rows)
+
+
+def _is_transient(error: Exception) -> bool:
+    """Connection-level failures a later attempt can succeed past"""
+    if isinstance(error, DBAPIError):
+        return error.connection_invalidated or isinstance(error, (OperationalError, InterfaceError))
+    return isinstance(error, (OSError, asyncio.TimeoutError))
+
+
+class BatchIngestService:
+    """
+    Queues rows for one table and writes them in batches from a background task
+
+    By default a failed batch is logged and dropped (best-effort telemetry). With
+    retry_seconds set, a batch that failed on a connection error is kept and
+    retried ahead of newer rows after that delay, and a batch that failed
+    otherwise is rewritten row by row so only the offending rows are lost.
+    """
+
+    def __init__(
+        self,
+        write_batch: Callable[[AsyncSession, List[Dict[str, Any]]], Awaitable[int]],
+        batch_size: int,
+        flush_interval_seconds: float,
+        retry_seconds: Optional[float] = None
+    ):
+        self.write_batch = write_batch
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.retry_seconds = retry_seconds
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._retry_batch: List[Dict[str, Any]] = []
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    def submit(self, **row: Any):
+        """Queue one row (model field names as keywords); safe to call from worker threads"""
+        try:
+            running_loop = asyncio.get_running_loop()
+        except RuntimeError:
+            running_loop = None
+
+        if self._loop is not None and running_loop is not self._loop:
+            self._loop.call_soon_threadsafe(self._queue.put_nowait, row)
+        else:
+            self._queue.put_nowait(row)
+
+    def start(self):
+        """Start the background flusher (idempotent)"""
+        if self._worker is None or self._worker.done():
+            self._loop = asyncio.get_running_loop()
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the flusher and write whatever is still queued"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+        batch, self._retry_batch = self._retry_batch, []
+        self._drain_into(batch, len(batch) + self._queue.qsize())
+        await self._flush(batch, final=True)
+
+    def _drain_into(self, batch: List[Dict[str, Any]], limit: int):
+        while len(batch) < limit and not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch, self._retry_batch = self._retry_batch, []
+            if not batch:
+                batch.append(await self._queue.get())
+            deadline = loop.time() + self.flush_interval_seconds
+
+            while True:
+                self._drain_into(batch, self.batch_size)
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or remaining <= 0:
+                    break
+                await asyncio.sleep(min(remaining, 0.02))
+
+            await self._flush(batch)
+
+    async def _write(self, batch: List[Dict[str, Any]]):
+        async with AsyncSession(async_engine) as db:
+            await self.write_batch(db, batch)
+
+    async def _flush(self, batch: List[Dict[str, Any]], final: bool = False):
+        if not batch:
+            return
+        try:
+            await self._write(batch)
+        except Exception as e:
+            if self.retry_seconds is None:
+                logger.error("Failed to write %s rows via %s: %s", len(batch), self.write_batch.__name__, e)
+            elif _is_transient(e) and not final:
+                logger.warning(
+                    "Failed to write %s rows via %s, retrying in %ss: %s",
+                    len(batch), self.write_batch.__name__, self.retry_seconds, e
+                )
+                self._retry_batch = batch
+                await asyncio.sleep(self.retry_seconds)
+            else:
+                await self._write_each(batch, e, final)
+
+    async def _write_each(self, batch: List[Dict[str, Any]], error: Exception, final: bool):
+        """Rewrite a failed batch one row at a time, logging every row that still fails"""
+        logger.warning("Batch of %s rows via %s failed, writing rows one by one: %s",
+                       len(batch), self.write_batch.__name__, error)
+        for position, row in enumerate(batch):
+            try:
+                await self._write([row])
+            except Exception as e:
+                if _is_transient(e) and not final:
+                    # Connection lost midway; the rest goes back to the retry path
+                    self._retry_batch = batch[position:]
+                    return
+                logger.error("Failed to write row via %s: %s; row: %r", self.write_batch.__name__, e, row)
+
+
+class EventStagingMover:
+    """Periodically drains eventlog_staging into eventlog"""
+
+    def __init__(self, interval_seconds: float = STAGING_MOVE_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the periodic move (idempotent)"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the periodic move and drain whatever is still staged"""
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        await self.move()
+
+    async def move(self):
+        try:
+            async with AsyncSession(async_engine) as db:
+                await move_staged_event_logs(db)
+        except Exception as e:
+            logger.error("Failed to move staged event log rows: %s", e)
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval_seconds)
+            await self.move()
+
+
+# Global ingest instances, started with the application
+event_ingest = BatchIngestService(
+    copy_event_logs, EVENT_BATCH_SIZE, EVENT_FLUSH_INTERVAL_SECONDS
+)
+code_interaction_ingest = BatchIngestService(
+    insert_code_interactions, CODE_INTERACTION_BATCH_SIZE, CODE_INTERACTION_FLUSH_INTERVAL_SECONDS
+)
+coin_transaction_ingest = BatchIngestService(
+    insert_coin_transactions, COIN_TRANSACTION_BATCH_SIZE, COIN_TRANSACTION_FLUSH_INTERVAL_SECONDS,
+    retry_seconds=COIN_TRANSACTION_RETRY_SECONDS
+)
+event_staging_mover = EventStagingMover()
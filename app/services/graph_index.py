@@ -0,0 +1,153 @@
+"""
+Graph Index - Compact adjacency for bubble graph traversal
+Node ids are mapped to dense integers and edges are stored in CSR form
+(adj_offsets/adj_csr), so successor lookups are a slice and traversals scan
+flat integer lists instead of re-walking the nested graph JSON
+"""
+
+import threading
+from collections import OrderedDict, deque
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.models.session import Session as SessionModel
+from app.schemas.session import BubbleGraphSchema
+
+# Indexes kept per (session_id, updated_at); a graph edit bumps updated_at
+GRAPH_INDEX_CACHE_SIZE = 1024
+
+_session_indexes: "OrderedDict[Tuple[int, Optional[datetime]], GraphIndex]" = OrderedDict()
+_session_indexes_lock = threading.Lock()
+
+
+class GraphIndex:
+    """Structure-of-arrays view of a bubble graph"""
+    
+    __slots__ = ("start", "node_ids", "node_idx", "adj_offsets", "adj_csr")
+    
+    def __init__(self, start: Optional[str], node_ids: List[str], edges: Iterable[Tuple[str, str]]):
+        self.start = start
+        self.node_ids = node_ids
+        self.node_idx: Dict[str, int] = {node_id: i for i, node_id in enumerate(node_ids)}
+        
+        # Counting sort of edges by source; edges to unknown nodes are left out
+        # (GraphService reports them as validation errors)
+        pairs = [
+            (self.node_idx[source], self.node_idx[target])
+            for source, target in edges
+            if source in self.node_idx and target in self.node_idx
+        ]
+        offsets = [0] * (len(node_ids) + 1)
+        for source, _ in pairs:
+            offsets[source + 1] += 1
+        for i in range(len(node_ids)):
+            offsets[i + 1] += offsets[i]
+        
+        csr = [0] * len(pairs)
+        cursor = offsets[:-1]
+        for source, target in pairs:
+            csr[cursor[source]] = target
+            cursor[source] += 1
+        
+        self.adj_offsets = offsets
+        self.adj_csr = csr
+    
+    @classmethod
+    def from_dict(cls, graph_json: Dict[str, Any]) -> "GraphIndex":
+        """Build from a stored graph_json document"""
+        return cls(
+            graph_json.get("start_node"),
+            [node["id"] for node in graph_json.get("nodes", [])],
+            ((edge["from_node"], edge["to_node"]) for edge in graph_json.get("edges", [])),
+        )
+    
+    @classmethod
+    def from_schema(cls, graph: BubbleGraphSchema) -> "GraphIndex":
+        """Build from a validated graph payload"""
+        return cls(
+            graph.start_node,
+            [node.id for node in graph.nodes],
+            ((edge.from_node, edge.to_node) for edge in graph.edges),
+        )
+    
+    @classmethod
+    def for_session(cls, session: SessionModel) -> "GraphIndex":
+        """The session's index, built once per graph version and kept in-process"""
+        key = (session.id, session.updated_at)
+        with _session_indexes_lock:
+            index = _session_indexes.get(key)
+            if index is not None:
+                _session_indexes.move_to_end(key)
+                return index
+        
+        # Built from the persisted navigation index rather than the full graph
+        graph_index = session.graph_index
+        index = cls(
+            graph_index["start"],
+            list(graph_index["types"]),
+            ((source, target) for source, targets in graph_index["adj"].items() for target in targets),
+        )
+        with _session_indexes_lock:
+            _session_indexes[key] = index
+            if len(_session_indexes) > GRAPH_INDEX_CACHE_SIZE:
+                _session_indexes.popitem(last=False)
+        return index
+    
+    @property
+    def node_count(self) -> int:
+        return len(self.node_ids)
+    
+    @property
+    def edge_count(self) -> int:
+        return len(self.adj_csr)
+    
+    def _successor_indexes(self, i: int) -> List[int]:
+        return self.adj_csr[self.adj_offsets[i]:self.adj_offsets[i + 1]]
+    
+    def successors(self, node_id: str) -> List[str]:
+        """Ids of the nodes directly reachable from node_id, in edge order"""
+        i = self.node_idx.get(node_id)
+        if i is None:
+            return []
+        return [self.node_ids[j] for j in self._successor_indexes(i)]
+    
+    def out_degrees(self) -> List[int]:
+        offsets = self.adj_offsets
+        return [offsets[i + 1] - offsets[i] for i in range(self.node_count)]
+    
+    def has_cycle(self) -> bool:
+        """Kahn's algorithm: acyclic iff every node can be peeled off in topological order"""
+        offsets, csr = self.adj_offsets, self.adj_csr
+        in_degree = [0] * self.node_count
+        for target in csr:
+            in_degree[target] += 1
+        
+        ready = [i for i, degree in enumerate(in_degree) if degree == 0]
+        peeled = 0
+        while ready:
+            node = ready.pop()
+            peeled += 1
+            for successor in csr[offsets[node]:offsets[node + 1]]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    ready.append(successor)
+        # Nodes on (or downstream of) a cycle never reach in-degree zero
+        return peeled < self.node_count
+    
+    def unreachable(self) -> List[str]:
+        """Nodes not reachable from the start node (all of them if it is unknown)"""
+        visited = [False] * self.node_count
+        start = self.node_idx.get(self.start)
+        if start is not None:
+            visited[start] = True
+            queue = deque([start])
+            while queue:
+                for successor in self._successor_indexes(queue.popleft()):
+                    if not visited[successor]:
+                        visited[successor] = True
+                        queue.append(successor)
+        return [node_id for node_id, seen in zip(self.node_ids, visited) if not seen]
+    
+    def dead_ends(self) -> List[str]:
+        """Nodes with no outgoing edges"""
+        return [node_id for node_id, degree in zip(self.node_ids, self.out_degrees()) if degree == 0]
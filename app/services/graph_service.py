@@ -4,9 +4,10 @@ Graph validation and traversal service for bubble graphs
 
 from typing import List, Dict, Set, Optional, Tuple, Any
 import logging
-from collections import defaultdict, deque
+from collections import defaultdict
 
 from app.schemas.session import BubbleGraphSchema, GraphValidationResponse
+from app.services.graph_index import GraphIndex
 
 logger = logging.getLogger(__name__)
 
@@ -43,18 +44,21 @@ class GraphService:
             edge_errors = self._validate_edges(graph.edges, node_ids)
             errors.extend(edge_errors)
             
+            # One adjacency index for all traversal checks
+            index = GraphIndex.from_schema(graph)
+            
             # Check for cycles
-            has_cycles = self._has_cycles(graph)
+            has_cycles = index.has_cycle()
             if has_cycles:
                 warnings.append("Graph contains cycles - students may get stuck in loops")
             
             # Check for unreachable nodes
-            unreachable = self._find_unreachable_nodes(graph)
+            unreachable = index.unreachable()
             if unreachable:
                 warnings.append(f"Unreachable nodes found: {', '.join(unreachable)}")
             
             # Check for dead ends (nodes with no outgoing edges except last nodes)
-            dead_ends = self._find_dead_ends(graph)
+            dead_ends = index.dead_ends()
             if len(dead_ends) > 1:
                 warnings.append(f"Multiple dead ends found: {', '.join(dead_ends)}")
             
@@ -99,75 +103,6 @@ class GraphService:
         
         return errors
     
-    def _has_cycles(self, graph: BubbleGraphSchema) -> bool:
-        """Check for cycles using DFS"""
-        # Build adjacency list
-        adj_list = defaultdict(list)
-        for edge in graph.edges:
-            adj_list[edge.from_node].append(edge.to_node)
-        
-        # Track visited nodes and recursion stack
-        visited = set()
-        rec_stack = set()
-        
-        def dfs(node: str) -> bool:
-            if node in rec_stack:
-                return True  # Cycle found
-            if node in visited:
-                return False
-            
-            visited.add(node)
-            rec_stack.add(node)
-            
-            for neighbor in adj_list[node]:
-                if dfs(neighbor):
-                    return True
-            
-            rec_stack.remove(node)
-            return False
-        
-        # Check each node
-        for node in [n.id for n in graph.nodes]:
-            if node not in visited:
-                if dfs(node):
-                    return True
-        
-        return False
-    
-    def _find_unreachable_nodes(self, graph: BubbleGraphSchema) -> List[str]:
-        """Find nodes unreachable from start node"""
-        # Build adjacency list
-        adj_list = defaultdict(list)
-        for edge in graph.edges:
-            adj_list[edge.from_node].append(edge.to_node)
-        
-        # BFS from start node
-        visited = set()
-        queue = deque([graph.start_node])
-        visited.add(graph.start_node)
-        
-        while queue:
-            current = queue.popleft()
-            for neighbor in adj_list[current]:
-                if neighbor not in visited:
-                    visited.add(neighbor)
-                    queue.append(neighbor)
-        
-        # Find unreachable nodes
-        all_nodes = {node.id for node in graph.nodes}
-        unreachable = list(all_nodes - visited)
-        return unreachable
-    
-    def _find_dead_ends(self, graph: BubbleGraphSchema) -> List[str]:
-        """Find nodes with no outgoing edges"""
-        nodes_with_outgoing = set()
-        for edge in graph.edges:
-            nodes_with_outgoing.add(edge.from_node)
-        
-        all_nodes = {node.id for node in graph.nodes}
-        dead_ends = list(all_nodes - nodes_with_outgoing)
-        return dead_ends
-    
     def _validate_node_content(self, nodes: List[Any]) -> List[str]:
         """Validate node content and types"""
         warnings = []
@@ -191,15 +126,12 @@ class GraphService:
     
     def get_next_nodes(self, graph: BubbleGraphSchema, current_node: str) -> List[str]:
         """Get possible next nodes from current node"""
-        next_nodes = []
-        for edge in graph.edges:
-            if edge.from_node == current_node:
-                next_nodes.append(edge.to_node)
-        return next_nodes
+        return GraphIndex.from_schema(graph).successors(current_node)
     
     def get_valid_paths(self, graph: BubbleGraphSchema) -> List[List[str]]:
         """Get all valid paths through the graph"""
         paths = []
+        index = GraphIndex.from_schema(graph)
         
         def dfs_paths(current: str, path: List[str], visited: Set[str]):
             # Avoid infinite loops
@@ -211,7 +143,7 @@ class GraphService:
             new_visited.add(current)
             
             # Get next nodes
-            next_nodes = self.get_next_nodes(graph, current)
+            next_nodes = index.successors(current)
             
             if not next_nodes:
                 # End of path
@@ -225,13 +157,14 @@ class GraphService:
     
     def calculate_graph_metrics(self, graph: BubbleGraphSchema) -> Dict[str, Any]:
         """Calculate graph complexity metrics"""
+        index = GraphIndex.from_schema(graph)
         metrics = {
             "total_nodes": len(graph.nodes),
             "total_edges": len(graph.edges),
             "start_node": graph.start_node,
-            "has_cycles": self._has_cycles(graph),
-            "unreachable_nodes": len(self._find_unreachable_nodes(graph)),
-            "dead_ends": len(self._find_dead_ends(graph)),
+            "has_cycles": index.has_cycle(),
+            "unreachable_nodes": len(index.unreachable()),
+            "dead_ends": len(index.dead_ends()),
         }
         
         # Calculate node type distribution
@@ -241,12 +174,10 @@ class GraphService:
         metrics["node_types"] = dict(type_counts)
         
         # Calculate average branching factor
-        outgoing_counts = defaultdict(int)
-        for edge in graph.edges:
-            outgoing_counts[edge.from_node] += 1
+        outgoing_counts = [degree for degree in index.out_degrees() if degree]
         
         if outgoing_counts:
-            avg_branching = sum(outgoing_counts.values()) / len(outgoing_counts)
+            avg_branching = sum(outgoing_counts) / len(outgoing_counts)
             metrics["avg_branching_factor"] = round(avg_branching, 2)
         else:
             metrics["avg_branching_factor"] = 0
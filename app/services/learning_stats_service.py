@@ -0,0 +1,85 @@
+"""
+Learning Stats Service - Keeps the student_learning_stats materialized view fresh
+pg_cron refreshes the view every few minutes where it is installed; everywhere else
+this task refreshes it from the application on the same schedule.
+"""
+
+import asyncio
+import logging
+from typing import Optional
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import async_engine
+
+logger = logging.getLogger(__name__)
+
+# Matches the pg_cron schedule in migration 2c7a9d4e6f13
+LEARNING_STATS_REFRESH_INTERVAL_SECONDS = 300
+
+# Lets one worker refresh while the others skip (pg_try_advisory_xact_lock key)
+LEARNING_STATS_REFRESH_LOCK_ID = 0x6c737473
+
+
+async def refresh_learning_stats(session: AsyncSession) -> bool:
+    """
+    Refresh student_learning_stats unless pg_cron owns the refresh or another worker
+    is refreshing it; returns whether this call refreshed the view
+    """
+    has_pg_cron = await session.execute(text(
+        "SELECT EXISTS (SELECT 1 FROM pg_extension WHERE extname = 'pg_cron')"
+    ))
+    if has_pg_cron.scalar():
+        return False
+
+    locked = await session.execute(
+        text("SELECT pg_try_advisory_xact_lock(:lock_id)"), {"lock_id": LEARNING_STATS_REFRESH_LOCK_ID}
+    )
+    if not locked.scalar():
+        await session.rollback()
+        return False
+
+    # CONCURRENTLY keeps the view readable during the refresh
+    await session.execute(text("REFRESH MATERIALIZED VIEW CONCURRENTLY student_learning_stats"))
+    await session.commit()
+    return True
+
+
+class LearningStatsRefresher:
+    """Periodically refreshes the learning stats view when pg_cron is unavailable"""
+
+    def __init__(self, interval_seconds: float = LEARNING_STATS_REFRESH_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the periodic refresh (idempotent)"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def refresh(self):
+        try:
+            async with AsyncSession(async_engine) as db:
+                if await refresh_learning_stats(db):
+                    logger.info("Refreshed student_learning_stats")
+        except Exception as e:
+            logger.error("Failed to refresh student_learning_stats: %s", e)
+
+    async def _run(self):
+        while True:
+            await self.refresh()
+            await asyncio.sleep(self.interval_seconds)
+
+
+# Global refresher, started with the application
+learning_stats_refresher = LearningStatsRefresher()
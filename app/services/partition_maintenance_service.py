@@ -0,0 +1,126 @@
+"""
+Partition Maintenance Service - App-side upkeep of the monthly telemetry partitions
+pg_cron pre-creates next month's eventlog/codeinteraction partitions where it is
+installed; this task does the same from the application everywhere else, and moves
+rows that already landed in a DEFAULT partition into the month they belong to.
+"""
+
+import asyncio
+import logging
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.database import async_engine
+
+logger = logging.getLogger(__name__)
+
+# Range-partitioned by month on "timestamp" (migration a3c1e9f27b54)
+PARTITIONED_TABLES = ("eventlog", "codeinteraction")
+
+# Months of partitions kept ahead of the current one, as in the migration
+MONTHS_AHEAD = 3
+
+PARTITION_MAINTENANCE_INTERVAL_SECONDS = 3600
+
+# Serializes maintenance across workers (pg_advisory_xact_lock key)
+PARTITION_MAINTENANCE_LOCK_ID = 0x70617274
+
+
+def _month_starts(today: date, months_ahead: int) -> List[date]:
+    month_start = today.replace(day=1)
+    months = [month_start]
+    for _ in range(months_ahead):
+        month_start = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        months.append(month_start)
+    return months
+
+
+async def ensure_monthly_partitions(session: AsyncSession, today: Optional[date] = None) -> List[str]:
+    """
+    Create missing partitions from the current month through MONTHS_AHEAD, and for
+    any month with rows in the DEFAULT partition, then commit
+
+    Rows DEFAULT already holds for such a month are moved into the new partition in
+    the same transaction (CREATE ... PARTITION OF fails otherwise).
+    Returns the names of the partitions created.
+    """
+    await session.execute(text("SELECT pg_advisory_xact_lock(:lock_id)"), {"lock_id": PARTITION_MAINTENANCE_LOCK_ID})
+
+    upcoming = _month_starts(today or datetime.utcnow().date(), MONTHS_AHEAD)
+    created = []
+    for table in PARTITIONED_TABLES:
+        # Months stranded in DEFAULT (e.g. the app was down across a month boundary)
+        stranded_months = await session.execute(text(
+            f'SELECT DISTINCT date_trunc(\'month\', "timestamp")::date FROM "{table}_default"'
+        ))
+        for month_start in sorted({*upcoming, *stranded_months.scalars()}):
+            partition = f"{table}_{month_start:%Y_%m}"
+            exists = await session.execute(
+                text("SELECT to_regclass(:partition) IS NOT NULL"), {"partition": partition}
+            )
+            if exists.scalar():
+                continue
+
+            month_end = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+            bounds = {"month_start": month_start, "month_end": month_end}
+            stranded = f"{partition}_stranded"
+            await session.execute(text(f'CREATE TEMP TABLE "{stranded}" (LIKE "{table}") ON COMMIT DROP'))
+            await session.execute(text(
+                f'WITH moved AS (DELETE FROM "{table}_default" '
+                f'WHERE "timestamp" >= :month_start AND "timestamp" < :month_end RETURNING *) '
+                f'INSERT INTO "{stranded}" SELECT * FROM moved'
+            ), bounds)
+            await session.execute(
+                text("SELECT create_monthly_partition(:table, :month_start)"),
+                {"table": table, "month_start": month_start}
+            )
+            moved = await session.execute(text(f'INSERT INTO "{table}" SELECT * FROM "{stranded}"'))
+            if moved.rowcount:
+                logger.warning("Moved %s rows from %s_default into %s", moved.rowcount, table, partition)
+            created.append(partition)
+
+    await session.commit()
+    return created
+
+
+class PartitionMaintenance:
+    """Periodically ensures upcoming monthly partitions exist"""
+
+    def __init__(self, interval_seconds: float = PARTITION_MAINTENANCE_INTERVAL_SECONDS):
+        self.interval_seconds = interval_seconds
+        self._worker: Optional[asyncio.Task] = None
+
+    def start(self):
+        """Start the periodic maintenance, running once immediately (idempotent)"""
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def run_once(self):
+        try:
+            async with AsyncSession(async_engine) as db:
+                created = await ensure_monthly_partitions(db)
+            if created:
+                logger.info("Created partitions %s", ", ".join(created))
+        except Exception as e:
+            logger.error("Partition maintenance failed: %s", e)
+
+    async def _run(self):
+        while True:
+            await self.run_once()
+            await asyncio.sleep(self.interval_seconds)
+
+
+# Global maintenance task, started with the application
+partition_maintenance = PartitionMaintenance()
@@ -15,6 +15,7 @@ from dataclasses import dataclass
 from app.models.user import User
 from app.models.session import Session, BubbleNode, StudentState
 from app.models.analytics import EventLog, EventType, CoinTransaction
+from app.schemas.base import fast_response
 from app.schemas.progress_tracking import (
     ProgressAnalysis, SkillAssessment, LearningPattern, DifficultyRecommendation,
     PerformanceMetrics, LearningStyleProfile, MasteryLevel, StudySession,
@@ -24,6 +25,34 @@ from app.schemas.progress_tracking import (
 
 logger = logging.getLogger(__name__)
 
+# EventLog is partitioned by month; unbounded per-student lookups are capped to this window
+EVENT_LOOKBACK_DAYS = 90
+
+
+def _attempt_arrays(events: List[EventLog]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Per-event (succeeded, attempted, day_index) arrays, in event order
+    
+    succeeded/attempted are 0/1 floats (BUBBLE_SUCCESS, and BUBBLE_SUCCESS or
+    BUBBLE_FAIL); day_index numbers the distinct event dates from 0.
+    """
+    succeeded = np.fromiter(
+        (e.event_type == EventType.BUBBLE_SUCCESS for e in events), dtype=np.float64, count=len(events)
+    )
+    failed = np.fromiter(
+        (e.event_type == EventType.BUBBLE_FAIL for e in events), dtype=np.float64, count=len(events)
+    )
+    day_ordinals = np.fromiter(
+        (e.timestamp.toordinal() for e in events), dtype=np.int64, count=len(events)
+    )
+    _, day_index = np.unique(day_ordinals, return_inverse=True)
+    return succeeded, succeeded + failed, day_index
+
+
+def _success_rate(succeeded: np.ndarray, attempted: np.ndarray) -> float:
+    """Successes over attempts (0.0 without attempts), as in _calculate_success_rate"""
+    return float(succeeded.sum()) / max(float(attempted.sum()), 1.0)
+
 
 @dataclass
 class LearningMetrics:
@@ -48,22 +77,24 @@ class ProgressTrackingService:
         self,
         student_id: int,
         time_period: Optional[timedelta] = None,
-        db: Session = None
+        db: Session = None,
+        now: Optional[datetime] = None
     ) -> ProgressAnalysis:
-        """Comprehensive analysis of student progress"""
+        """Comprehensive analysis of student progress (as of `now`, default the current time)"""
         
         if time_period is None:
             time_period = timedelta(days=30)  # Default to last 30 days
+        now = now or datetime.utcnow()
         
         # Gather comprehensive data
-        sessions = self._get_student_sessions(student_id, time_period, db)
-        events = self._get_student_events(student_id, time_period, db)
-        transactions = self._get_coin_transactions(student_id, time_period, db)
+        sessions = self._get_student_sessions(student_id, time_period, db, now)
+        events = self._get_student_events(student_id, time_period, db, now)
+        transactions = self._get_coin_transactions(student_id, time_period, db, now)
         
         # Analyze different aspects
         performance_metrics = self._calculate_performance_metrics(events, sessions)
         learning_patterns = self._identify_learning_patterns(events, sessions)
-        skill_assessments = self._assess_skills(events, sessions)
+        skill_assessments = self._assess_skills(events, sessions, now)
         learning_style = self._analyze_learning_style(events)
         mastery_levels = self._calculate_mastery_levels(events, sessions)
         trends = self._calculate_progress_trends(events, sessions)
@@ -73,7 +104,9 @@ class ProgressTrackingService:
             performance_metrics, learning_patterns, skill_assessments
         )
         
-        return ProgressAnalysis(
+        # Assembled from validated sub-models and our own aggregates; skip re-validation
+        return fast_response(
+            ProgressAnalysis,
             student_id=student_id,
             analysis_period=time_period,
             performance_metrics=performance_metrics,
@@ -83,7 +116,7 @@ class ProgressTrackingService:
             mastery_levels=mastery_levels,
             progress_trends=trends,
             recommendations=recommendations,
-            generated_at=datetime.utcnow()
+            generated_at=now
         )
     
     async def track_skill_development(
@@ -204,7 +237,8 @@ class ProgressTrackingService:
     ) -> List[LearningGoal]:
         """Generate personalized learning goals based on progress analysis"""
         
-        progress = await self.analyze_student_progress(student_id, db=db)
+        now = datetime.utcnow()
+        progress = await self.analyze_student_progress(student_id, db=db, now=now)
         
         goals = []
         
@@ -217,7 +251,7 @@ class ProgressTrackingService:
                 target_metric="skill_level",
                 current_value=weakest_skill.current_level,
                 target_value=min(weakest_skill.current_level + 0.2, 1.0),
-                deadline=datetime.utcnow() + timedelta(days=14),
+                deadline=now + timedelta(days=14),
                 priority="high"
             ))
         
@@ -229,7 +263,7 @@ class ProgressTrackingService:
                 target_metric="overall_score",
                 current_value=progress.performance_metrics.overall_score,
                 target_value=0.75,
-                deadline=datetime.utcnow() + timedelta(days=21),
+                deadline=now + timedelta(days=21),
                 priority="medium"
             ))
         
@@ -241,7 +275,7 @@ class ProgressTrackingService:
                 target_metric="engagement_score",
                 current_value=progress.performance_metrics.engagement_score,
                 target_value=0.75,
-                deadline=datetime.utcnow() + timedelta(days=10),
+                deadline=now + timedelta(days=10),
                 priority="high"
             ))
         
@@ -254,8 +288,9 @@ class ProgressTrackingService:
     ) -> List[AchievementBadge]:
         """Calculate earned achievement badges"""
         
-        events = self._get_student_events(student_id, timedelta(days=90), db)
-        sessions = self._get_student_sessions(student_id, timedelta(days=90), db)
+        now = datetime.utcnow()
+        events = self._get_student_events(student_id, timedelta(days=90), db, now)
+        sessions = self._get_student_sessions(student_id, timedelta(days=90), db, now)
         
         badges = []
         
@@ -266,7 +301,7 @@ class ProgressTrackingService:
                 name="Week Warrior",
                 description="Completed learning sessions for 7 consecutive days",
                 category="consistency",
-                earned_date=datetime.utcnow(),
+                earned_date=now,
                 points=100
             ))
         
@@ -277,7 +312,7 @@ class ProgressTrackingService:
                 name="Century Champion",
                 description="Successfully completed 100 learning activities",
                 category="achievement",
-                earned_date=datetime.utcnow(),
+                earned_date=now,
                 points=200
             ))
         
@@ -291,7 +326,7 @@ class ProgressTrackingService:
                     name=f"{skill.replace('_', ' ').title()} Master",
                     description=f"Achieved mastery in {skill.replace('_', ' ')}",
                     category="mastery",
-                    earned_date=datetime.utcnow(),
+                    earned_date=now,
                     points=300
                 ))
         
@@ -299,10 +334,12 @@ class ProgressTrackingService:
     
     # Private helper methods
     
-    def _get_student_sessions(self, student_id: int, time_period: timedelta, db: Session) -> List[StudentState]:
+    def _get_student_sessions(
+        self, student_id: int, time_period: timedelta, db: Session, now: Optional[datetime] = None
+    ) -> List[StudentState]:
         """Get student sessions within time period"""
         try:
-            cutoff_date = datetime.utcnow() - time_period
+            cutoff_date = (now or datetime.utcnow()) - time_period
             stmt = (select(StudentState)
                    .where(StudentState.student_id == student_id)
                    .where(StudentState.started_at >= cutoff_date)
@@ -312,10 +349,12 @@ class ProgressTrackingService:
             logger.error(f"Error fetching student sessions: {e}")
             return []
     
-    def _get_student_events(self, student_id: int, time_period: timedelta, db: Session) -> List[EventLog]:
+    def _get_student_events(
+        self, student_id: int, time_period: timedelta, db: Session, now: Optional[datetime] = None
+    ) -> List[EventLog]:
         """Get student events within time period"""
         try:
-            cutoff_date = datetime.utcnow() - time_period
+            cutoff_date = (now or datetime.utcnow()) - time_period
             stmt = (select(EventLog)
                    .where(EventLog.student_id == student_id)
                    .where(EventLog.timestamp >= cutoff_date)
@@ -325,10 +364,12 @@ class ProgressTrackingService:
             logger.error(f"Error fetching student events: {e}")
             return []
     
-    def _get_coin_transactions(self, student_id: int, time_period: timedelta, db: Session) -> List[CoinTransaction]:
+    def _get_coin_transactions(
+        self, student_id: int, time_period: timedelta, db: Session, now: Optional[datetime] = None
+    ) -> List[CoinTransaction]:
         """Get coin transactions within time period"""
         try:
-            cutoff_date = datetime.utcnow() - time_period
+            cutoff_date = (now or datetime.utcnow()) - time_period
             stmt = (select(CoinTransaction)
                    .where(CoinTransaction.student_id == student_id)
                    .where(CoinTransaction.timestamp >= cutoff_date)
@@ -342,7 +383,8 @@ class ProgressTrackingService:
         """Calculate comprehensive performance metrics"""
         
         if not events:
-            return PerformanceMetrics(
+            return fast_response(
+                PerformanceMetrics,
                 overall_score=0.0,
                 accuracy=0.0,
                 speed_score=0.0,
@@ -351,32 +393,42 @@ class ProgressTrackingService:
                 engagement_score=0.0
             )
         
+        # One pass over the ORM rows; every reduction below runs on these arrays
+        succeeded, attempted, day_index = _attempt_arrays(events)
+        success_count = int(succeeded.sum())
+        
         # Calculate accuracy
-        success_events = [e for e in events if e.event_type == EventType.BUBBLE_SUCCESS]
-        total_attempts = [e for e in events if e.event_type in [EventType.BUBBLE_SUCCESS, EventType.BUBBLE_FAIL]]
-        accuracy = len(success_events) / max(len(total_attempts), 1)
+        accuracy = _success_rate(succeeded, attempted)
         
         # Calculate speed (tasks per hour)
         if sessions:
             total_time = sum(s.total_time_spent / 60 or 0 for s in sessions)  # convert seconds to minutes
-            speed_score = len(success_events) / max(total_time / 60, 0.1)  # tasks per hour
+            speed_score = success_count / max(total_time / 60, 0.1)  # tasks per hour
             speed_score = min(speed_score / 10, 1.0)  # normalize to 0-1
         else:
             speed_score = 0.0
         
         # Calculate consistency (variance in daily performance)
-        daily_scores = self._calculate_daily_scores(events)
-        if daily_scores and len(daily_scores) > 1:
-            consistency = 1.0 - np.std(daily_scores)
-            consistency = max(0.0, min(consistency, 1.0))
+        days = int(day_index.max()) + 1
+        if days > 1:
+            daily_successes = np.bincount(day_index, weights=succeeded, minlength=days)
+            daily_attempts = np.bincount(day_index, weights=attempted, minlength=days)
+            daily_scores = daily_successes / np.maximum(daily_attempts, 1)
+            consistency = max(0.0, min(1.0 - float(daily_scores.std()), 1.0))
         else:
             consistency = 0.0
         
-        # Calculate improvement rate
-        improvement_rate = self._calculate_improvement_rate(events)
+        # Calculate improvement rate: first 25% vs last 25% of events
+        if len(events) < 10:
+            improvement_rate = 0.0
+        else:
+            quarter = len(events) // 4
+            early_performance = _success_rate(succeeded[:quarter], attempted[:quarter])
+            recent_performance = _success_rate(succeeded[-quarter:], attempted[-quarter:])
+            improvement_rate = max(0.0, min(1.0, recent_performance - early_performance + 0.5))
         
         # Calculate engagement score
-        engagement_score = self._calculate_engagement_score(events, sessions)
+        engagement_score = float(self._calculate_engagement_score(events, sessions))
         
         # Overall score (weighted average)
         overall_score = (
@@ -387,7 +439,9 @@ class ProgressTrackingService:
             engagement_score * 0.15
         )
         
-        return PerformanceMetrics(
+        # Every value is computed here from our own rows, so skip re-validation
+        return fast_response(
+            PerformanceMetrics,
             overall_score=overall_score,
             accuracy=accuracy,
             speed_score=speed_score,
@@ -457,8 +511,10 @@ class ProgressTrackingService:
         
         return patterns
     
-    def _assess_skills(self, events: List[EventLog], sessions: List[StudentState]) -> List[SkillAssessment]:
-        """Assess skill levels across different domains"""
+    def _assess_skills(
+        self, events: List[EventLog], sessions: List[StudentState], now: datetime
+    ) -> List[SkillAssessment]:
+        """Assess skill levels across different domains (last_updated=now)"""
         
         assessments = []
         
@@ -477,7 +533,7 @@ class ProgressTrackingService:
                     weaknesses=self._identify_skill_weaknesses(skill_events),
                     next_milestones=self._predict_next_milestones(current_level, progress_rate),
                     confidence_score=self._calculate_confidence_score(skill_events),
-                    last_updated=datetime.utcnow()
+                    last_updated=now
                 ))
             else:
                 # Default assessment for skills with no data
@@ -489,7 +545,7 @@ class ProgressTrackingService:
                     weaknesses=["Insufficient data"],
                     next_milestones=["Complete initial assessment"],
                     confidence_score=0.0,
-                    last_updated=datetime.utcnow()
+                    last_updated=now
                 ))
         
         return assessments
@@ -642,13 +698,17 @@ class ProgressTrackingService:
     
     # Additional helper methods (simplified implementations)
     
-    def _get_skill_specific_events(self, student_id: int, skill: str, db: Session) -> List[EventLog]:
+    def _get_skill_specific_events(
+        self, student_id: int, skill: str, db: Session, since: Optional[datetime] = None
+    ) -> List[EventLog]:
         """Get events related to specific skill domain"""
         # In a real implementation, this would filter events by skill domain
         # For now, return a sample of events
+        since = since or datetime.utcnow() - timedelta(days=EVENT_LOOKBACK_DAYS)
         try:
             stmt = (select(EventLog)
                    .where(EventLog.student_id == student_id)
+                   .where(EventLog.timestamp >= since)
                    .limit(20))
             return db.exec(stmt).all()
         except Exception:
@@ -688,15 +748,6 @@ class ProgressTrackingService:
         
         return len(success_events) / max(len(total_attempts), 1)
     
-    def _calculate_daily_scores(self, events: List[EventLog]) -> List[float]:
-        """Calculate daily performance scores"""
-        daily_events = defaultdict(list)
-        for event in events:
-            day = event.timestamp.date()
-            daily_events[day].append(event)
-        
-        return [self._calculate_success_rate(day_events) for day_events in daily_events.values()]
-    
     def _calculate_weekly_scores(self, events: List[EventLog]) -> List[float]:
         """Calculate weekly performance scores"""
         weekly_events = defaultdict(list)
@@ -706,18 +757,6 @@ class ProgressTrackingService:
         
         return [self._calculate_success_rate(week_events) for week_events in weekly_events.values()]
     
-    def _calculate_improvement_rate(self, events: List[EventLog]) -> float:
-        """Calculate overall improvement rate"""
-        if len(events) < 10:
-            return 0.0
-        
-        # Compare first 25% vs last 25%
-        quarter = len(events) // 4
-        early_performance = self._calculate_success_rate(events[:quarter])
-        recent_performance = self._calculate_success_rate(events[-quarter:])
-        
-        return max(0.0, min(1.0, recent_performance - early_performance + 0.5))
-    
     def _calculate_engagement_score(self, events: List[EventLog], sessions: List[StudentState]) -> float:
         """Calculate engagement score"""
         if not sessions:
@@ -913,11 +952,15 @@ class ProgressTrackingService:
         
         return list(weekly_counts.values())
     
-    def _get_topic_events(self, student_id: int, topic: str, db: Session) -> List[EventLog]:
+    def _get_topic_events(
+        self, student_id: int, topic: str, db: Session, since: Optional[datetime] = None
+    ) -> List[EventLog]:
         """Get events for specific topic"""
+        since = since or datetime.utcnow() - timedelta(days=EVENT_LOOKBACK_DAYS)
         try:
             stmt = (select(EventLog)
                    .where(EventLog.student_id == student_id)
+                   .where(EventLog.timestamp >= since)
                    .where(EventLog.node_id.like(f"%{topic}%"))
                    .limit(50))
             return db.exec(stmt).all()
@@ -0,0 +1,47 @@
+"""
+Session Edge Repository - Materialized graph edges for direct node lookups
+session_edge holds one row per graph edge, rewritten whenever bubbles are
+materialized from the graph, so successor/prerequisite lookups are index
+probes instead of reads of the whole graph_json document
+"""
+
+from typing import List
+
+from sqlalchemy import delete, insert
+from sqlmodel import Session, select
+
+from app.models.session import Session as SessionModel, SessionEdge
+
+
+class SessionEdgeRepository:
+    """Reads and writes of SessionEdge rows"""
+    
+    @staticmethod
+    def replace_from_graph(db: Session, session: SessionModel) -> int:
+        """
+        Replace the session's edge rows with the edges of session.graph_json
+        
+        Does not commit, so it shares the caller's transaction with the
+        BubbleNode upsert. Returns the number of edges.
+        """
+        edges = (session.graph_json or {}).get("edges", [])
+        db.execute(delete(SessionEdge).where(SessionEdge.session_id == session.id))
+        if edges:
+            db.execute(insert(SessionEdge.__table__), [
+                {"session_id": session.id, "from_node": edge["from_node"], "to_node": edge["to_node"]}
+                for edge in edges
+            ])
+        return len(edges)
+    
+    @staticmethod
+    def delete_for_session(db: Session, session_id: int):
+        """Remove a session's edges (does not commit)"""
+        db.execute(delete(SessionEdge).where(SessionEdge.session_id == session_id))
+    
+    @staticmethod
+    def prerequisite_ids(db: Session, session_id: int, node_id: str) -> List[str]:
+        """Nodes with an edge into node_id"""
+        return db.exec(select(SessionEdge.from_node).where(
+            SessionEdge.session_id == session_id,
+            SessionEdge.to_node == node_id
+        ).order_by(SessionEdge.id)).all()
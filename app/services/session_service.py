@@ -5,17 +5,24 @@ Session service for managing student progress through bubble graphs
 from typing import List, Dict, Optional, Tuple, Any
 import json
 import logging
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
 from sqlmodel import Session, select
 
 from app.core.database import get_session
-from app.models.session import Session as SessionModel, StudentState, BubbleNode
-from app.models.analytics import EventLog, CoinTransaction
+from app.models.session import Session as SessionModel, SessionStatus, StudentState, BubbleNode
+from app.models.analytics import EventLog, get_coin_balance
+from app.schemas.base import fast_response_from_row
 from app.schemas.session import (
-    BubbleGraphSchema, BubbleAdvanceRequest, BubbleAdvanceResponse,
+    BubbleAdvanceRequest, BubbleAdvanceResponse,
     StudentStateResponse
 )
 from app.services.graph_service import GraphService
+from app.services.graph_index import GraphIndex
+from app.services.student_state_repository import StudentStateRepository
+from app.services.bubble_node_repository import BubbleNodeRepository
+from app.services.session_edge_repository import SessionEdgeRepository
+from app.services.cache_service import get_cached_session, get_cached_student_state
+from app.services.event_ingest_service import coin_transaction_ingest
 
 logger = logging.getLogger(__name__)
 
@@ -43,15 +50,13 @@ class SessionService:
             
             if existing_state and not existing_state.is_completed:
                 # Resume existing session
-                existing_state.last_activity_at = datetime.utcnow()
+                existing_state.last_activity_at = datetime.now(timezone.utc)
                 db.add(existing_state)
                 db.commit()
                 db.refresh(existing_state)
                 return existing_state
             
-            # Parse graph to get start node
-            graph_data = BubbleGraphSchema(**session.graph_json)
-            start_node = graph_data.start_node
+            start_node = session.get_start_node_id()
             
             # Create new student state
             student_state = StudentState(
@@ -63,8 +68,6 @@ class SessionService:
                 total_coins=0,
                 is_completed=False,
                 completion_percentage=0.0,
-                started_at=datetime.utcnow(),
-                last_activity_at=datetime.utcnow(),
                 total_time_spent=0
             )
             
@@ -111,17 +114,13 @@ class SessionService:
                     is_session_complete=True
                 )
             
-            # Get session and bubble data
-            session = db.get(SessionModel, session_id)
+            # Get session and bubble data (read-only, so served from cache)
+            session = get_cached_session(session_id, db)
             if not session:
                 raise ValueError("Session not found")
             
             # Get bubble node details
-            bubble_stmt = select(BubbleNode).where(
-                BubbleNode.session_id == session_id,
-                BubbleNode.node_id == request.node_id
-            )
-            bubble_node = db.exec(bubble_stmt).first()
+            bubble_node = BubbleNodeRepository.get_cached(session_id, request.node_id)
             
             if not bubble_node:
                 raise ValueError(f"Bubble node {request.node_id} not found")
@@ -132,15 +131,14 @@ class SessionService:
             )
             
             # Update student state
-            now = datetime.utcnow()
+            now = datetime.now(timezone.utc)
             time_spent = request.time_spent or 0
             student_state.last_activity_at = now
             student_state.total_time_spent += time_spent
             
             if success:
                 # Mark bubble as completed
-                if request.node_id not in student_state.completed_nodes:
-                    student_state.completed_nodes.append(request.node_id)
+                if StudentStateRepository.add_completed_node(db, student_state, request.node_id):
                     student_state.total_coins += coins_earned
                     
                     # Award coins
@@ -148,9 +146,9 @@ class SessionService:
                         self._award_coins(db, student_id, session_id, coins_earned, 
                                         f"Completed bubble: {bubble_node.title}")
                 
-                # Get next node
-                graph_data = BubbleGraphSchema(**session.graph_json)
-                next_nodes = self.graph_service.get_next_nodes(graph_data, request.node_id)
+                # Get next node from the session's cached adjacency index
+                graph = GraphIndex.for_session(session)
+                next_nodes = graph.successors(request.node_id)
                 
                 next_node_id = next_nodes[0] if next_nodes else None
                 if next_node_id:
@@ -165,7 +163,7 @@ class SessionService:
                     })
                 
                 # Update completion percentage
-                total_nodes = len(graph_data.nodes)
+                total_nodes = graph.node_count
                 completed_count = len(student_state.completed_nodes)
                 student_state.completion_percentage = (completed_count / total_nodes) * 100
                 
@@ -189,23 +187,21 @@ class SessionService:
             
             else:
                 # Handle failure
-                if request.node_id not in student_state.failed_attempts:
-                    student_state.failed_attempts[request.node_id] = 0
-                student_state.failed_attempts[request.node_id] += 1
+                attempts = StudentStateRepository.increment_failed_attempt(db, student_state, request.node_id)
                 
                 db.add(student_state)
                 db.commit()
                 
                 # Get hints if available
                 hints = []
-                if bubble_node.hints and student_state.failed_attempts[request.node_id] <= len(bubble_node.hints):
-                    hint_index = student_state.failed_attempts[request.node_id] - 1
+                if bubble_node.hints and attempts <= len(bubble_node.hints):
+                    hint_index = attempts - 1
                     hints = [bubble_node.hints[hint_index]]
                 
                 # Log failure
                 self._log_event(db, student_id, session_id, "bubble_failed", {
                     "node_id": request.node_id,
-                    "attempt_number": student_state.failed_attempts[request.node_id],
+                    "attempt_number": attempts,
                     "response": request.student_response[:100]  # Truncate for privacy
                 })
                 
@@ -220,18 +216,35 @@ class SessionService:
             db.rollback()
             raise
     
+    def publish_session(self, session: SessionModel, db: Session) -> SessionModel:
+        """
+        Publish a session, materializing its graph as BubbleNode and SessionEdge rows
+        
+        Status, timestamps, the BubbleNode upsert and the edge rows commit in one transaction.
+        graph_json keeps the nodes (with their editor layout) and edges for export.
+        """
+        now = datetime.now(timezone.utc)
+        session.status = SessionStatus.PUBLISHED
+        session.published_at = now
+        session.updated_at = now
+        db.add(session)
+        db.flush()
+        
+        BubbleNodeRepository.upsert_from_graph(db, session)
+        SessionEdgeRepository.replace_from_graph(db, session)
+        db.commit()
+        BubbleNodeRepository.invalidate()
+        db.refresh(session)
+        return session
+    
     def get_student_state(self, student_id: int, session_id: int, db: Session) -> Optional[StudentStateResponse]:
         """Get current student state for a session"""
-        stmt = select(StudentState).where(
-            StudentState.student_id == student_id,
-            StudentState.session_id == session_id
-        )
-        state = db.exec(stmt).first()
+        state = get_cached_student_state(student_id, session_id, db)
         
         if not state:
             return None
         
-        return StudentStateResponse.from_orm(state)
+        return fast_response_from_row(StudentStateResponse, state)
     
     def get_session_analytics(self, session_id: int, db: Session) -> Dict[str, Any]:
         """Get analytics for a session"""
@@ -257,25 +270,10 @@ class SessionService:
                 avg_completion_time = sum(s.total_time_spent for s in completed_states) / len(completed_states)
                 avg_coins = sum(s.total_coins for s in completed_states) / len(completed_states)
             
-            # Most challenging bubbles (highest failure rate)
-            all_failures = {}
-            for state in states:
-                for node_id, attempts in state.failed_attempts.items():
-                    if node_id not in all_failures:
-                        all_failures[node_id] = []
-                    all_failures[node_id].append(attempts)
-            
-            challenging_bubbles = []
-            for node_id, attempts_list in all_failures.items():
-                avg_attempts = sum(attempts_list) / len(attempts_list)
-                if avg_attempts > 1.5:  # More than 1.5 attempts on average
-                    challenging_bubbles.append({
-                        "node_id": node_id,
-                        "avg_attempts": round(avg_attempts, 2),
-                        "students_struggled": len(attempts_list)
-                    })
-            
-            challenging_bubbles.sort(key=lambda x: x["avg_attempts"], reverse=True)
+            # Most challenging bubbles (highest failure rate): more than 1.5 attempts on average
+            challenging_bubbles = StudentStateRepository.challenging_nodes(
+                db, session_id, min_avg_attempts=1.5, limit=5
+            )
             
             return {
                 "total_students": total_students,
@@ -283,7 +281,7 @@ class SessionService:
                 "completion_rate": round(completion_rate, 2),
                 "avg_completion_time_minutes": round(avg_completion_time / 60, 2),
                 "avg_coins_earned": round(avg_coins, 2),
-                "challenging_bubbles": challenging_bubbles[:5],  # Top 5 most challenging
+                "challenging_bubbles": challenging_bubbles,  # Top 5 most challenging
                 "student_states": [
                     {
                         "student_id": s.student_id,
@@ -338,18 +336,15 @@ class SessionService:
             return False, "Error evaluating your response. Please try again.", 0
     
     def _award_coins(self, db: Session, student_id: int, session_id: int, amount: int, description: str):
-        """Award coins to student"""
+        """Award coins to student (written in a batch; balances are computed in SQL)"""
         try:
-            transaction = CoinTransaction(
+            coin_transaction_ingest.submit(
                 student_id=student_id,
                 session_id=session_id,
                 amount=amount,
                 transaction_type="earned",
-                description=description,
-                created_at=datetime.utcnow()
+                description=description
             )
-            db.add(transaction)
-            db.commit()
             
         except Exception as e:
             logger.error(f"Error awarding coins: {e}")
@@ -377,10 +372,8 @@ class SessionService:
             stmt = select(StudentState).where(StudentState.student_id == student_id)
             states = db.exec(stmt).all()
             
-            # Get total coins
-            coin_stmt = select(CoinTransaction).where(CoinTransaction.student_id == student_id)
-            transactions = db.exec(coin_stmt).all()
-            total_coins = sum(t.amount for t in transactions if t.transaction_type == "earned")
+            # Current coin balance (cached per student, O(1))
+            total_coins = get_coin_balance(student_id, db)
             
             # Calculate progress
             total_sessions = len(states)
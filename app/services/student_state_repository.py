@@ -0,0 +1,146 @@
+"""
+Student State Repository - SQL-side reads and atomic updates for StudentState
+completed_nodes and failed_attempts are JSONB; updates here run as single
+UPDATE ... RETURNING statements instead of rewriting the whole document, and
+many states are persisted with chunked multi-row upserts
+"""
+
+from typing import Any, Dict, List
+
+from sqlalchemy import text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm.attributes import set_committed_value
+from sqlmodel import Session, select
+
+from app.models.session import StudentState
+from app.services.cache_service import invalidate_on_commit, student_state_key
+
+
+ADD_COMPLETED_NODE_SQL = text("""
+    UPDATE studentstate
+    SET completed_nodes = completed_nodes || jsonb_build_array(CAST(:node_id AS text))
+    WHERE id = :state_id
+      AND NOT completed_nodes @> jsonb_build_array(CAST(:node_id AS text))
+    RETURNING completed_nodes
+""")
+
+# Rows per multi-row INSERT ... ON CONFLICT statement
+UPSERT_CHUNK_SIZE = 1000
+
+# Columns identifying a state; everything else is overwritten on conflict
+STATE_KEY_COLUMNS = ("student_id", "session_id")
+STATE_INSERT_ONLY_COLUMNS = ("id", "started_at")
+
+INCREMENT_FAILED_ATTEMPT_SQL = text("""
+    UPDATE studentstate
+    SET failed_attempts = jsonb_set(
+        coalesce(failed_attempts, '{}'::jsonb),
+        ARRAY[CAST(:node_id AS text)],
+        to_jsonb(coalesce((failed_attempts ->> CAST(:node_id AS text))::int, 0) + 1)
+    )
+    WHERE id = :state_id
+    RETURNING failed_attempts
+""")
+
+# Per-node failed attempt averages across a session's students, hardest first
+CHALLENGING_NODES_SQL = text("""
+    SELECT f.key AS node_id,
+           avg(f.value::int) AS avg_attempts,
+           count(*) AS students_struggled
+    FROM studentstate s
+    CROSS JOIN LATERAL jsonb_each_text(s.failed_attempts) AS f
+    WHERE s.session_id = :session_id
+    GROUP BY f.key
+    HAVING avg(f.value::int) > :min_avg_attempts
+    ORDER BY avg_attempts DESC, f.key
+    LIMIT :limit
+""")
+
+
+class StudentStateRepository:
+    """Queries and atomic JSONB updates for StudentState rows"""
+    
+    @staticmethod
+    def add_completed_node(db: Session, state: StudentState, node_id: str) -> bool:
+        """
+        Append node_id to completed_nodes in SQL; returns False if it was already there
+        
+        The instance's completed_nodes is refreshed without marking it dirty.
+        """
+        completed_nodes = db.execute(
+            ADD_COMPLETED_NODE_SQL, {"state_id": state.id, "node_id": node_id}
+        ).scalar_one_or_none()
+        if completed_nodes is None:
+            return False
+        # Raw UPDATEs bypass the flush hook, so invalidate explicitly
+        invalidate_on_commit(db, student_state_key(state.student_id, state.session_id))
+        set_committed_value(state, "completed_nodes", completed_nodes)
+        return True
+    
+    @staticmethod
+    def increment_failed_attempt(db: Session, state: StudentState, node_id: str) -> int:
+        """Increment failed_attempts[node_id] in SQL; returns the new count"""
+        failed_attempts = db.execute(
+            INCREMENT_FAILED_ATTEMPT_SQL, {"state_id": state.id, "node_id": node_id}
+        ).scalar_one()
+        invalidate_on_commit(db, student_state_key(state.student_id, state.session_id))
+        set_committed_value(state, "failed_attempts", failed_attempts)
+        return failed_attempts[node_id]
+    
+    @staticmethod
+    def bulk_upsert(db: Session, states: List[Dict[str, Any]]) -> int:
+        """
+        Insert or update many states (dicts of StudentState columns) and commit
+        
+        Rows are keyed on (student_id, session_id) and sent in chunks of
+        UPSERT_CHUNK_SIZE, one statement per chunk. Returns the number of rows written.
+        """
+        if not states:
+            return 0
+        
+        table = StudentState.__table__
+        for start in range(0, len(states), UPSERT_CHUNK_SIZE):
+            chunk = states[start:start + UPSERT_CHUNK_SIZE]
+            statement = insert(table).values(chunk)
+            # Only columns present in the rows are overwritten
+            updated = set(chunk[0]) - set(STATE_KEY_COLUMNS) - set(STATE_INSERT_ONLY_COLUMNS)
+            db.execute(statement.on_conflict_do_update(
+                index_elements=list(STATE_KEY_COLUMNS),
+                set_={column: statement.excluded[column] for column in updated}
+            ))
+        invalidate_on_commit(db, *(
+            student_state_key(state["student_id"], state["session_id"]) for state in states
+        ))
+        db.commit()
+        return len(states)
+    
+    @staticmethod
+    def students_who_completed(db: Session, session_id: int, node_id: str) -> List[int]:
+        """Student ids that completed node_id (served by the completed_nodes GIN index)"""
+        statement = select(StudentState.student_id).where(
+            StudentState.session_id == session_id,
+            StudentState.completed_nodes.contains([node_id])
+        )
+        return list(db.exec(statement).all())
+    
+    @staticmethod
+    def challenging_nodes(
+        db: Session, session_id: int, min_avg_attempts: float, limit: int
+    ) -> List[Dict[str, Any]]:
+        """
+        Nodes whose failed attempts average above min_avg_attempts, hardest first
+        
+        Aggregated in Postgres over failed_attempts; each entry has node_id,
+        avg_attempts (rounded to 2 places) and students_struggled.
+        """
+        rows = db.execute(CHALLENGING_NODES_SQL, {
+            "session_id": session_id, "min_avg_attempts": min_avg_attempts, "limit": limit
+        }).all()
+        return [
+            {
+                "node_id": row.node_id,
+                "avg_attempts": round(float(row.avg_attempts), 2),
+                "students_struggled": row.students_struggled
+            }
+            for row in rows
+        ]
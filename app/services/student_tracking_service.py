@@ -3,24 +3,47 @@ Student Tracking Service - Real-time comprehensive student interaction tracking
 Building on the existing analytics foundation with enhanced real-time capabilities
 """
 
+import asyncio
 import json
 import logging
-from typing import Dict, List, Optional, Any, Tuple
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Any, Tuple, Union
 from datetime import datetime, timedelta
 from sqlmodel import Session, select, and_, or_, func
+from sqlmodel.ext.asyncio.session import AsyncSession
 from sqlalchemy import desc
 
 from app.models.analytics import (
     StudentSessionTracking, ChatInteraction, CodeInteraction, CodeSubmission,
-    StruggleAnalysis, StudentLearningProfile, EventLog, EventType,
-    MessageType, StruggleSeverity
+    StruggleAnalysis, StudentLearningProfile, EventLog, EventType, CodeInteractionBlob,
+    MessageType, StruggleSeverity, PROFILE_EMBEDDING_DIMENSIONS
 )
 from app.models.session import Session as SessionModel
 from app.models.user import User
 from app.core.config import settings
+from app.utils.ai_utils import get_embedding
+from app.utils.code_snapshots import compress_snapshot, make_line_delta
+from app.services.event_ingest_service import code_interaction_ingest, event_ingest
 
 logger = logging.getLogger(__name__)
 
+# High-frequency code interaction types that skip the per-request INSERT
+BUFFERED_CODE_INTERACTION_TYPES = frozenset({"keypress", "delete"})
+
+# Matches CodeInteraction.code_diff; longer deltas are not stored (the snapshot always is)
+CODE_DIFF_MAX_LENGTH = 2000
+
+
+@dataclass(slots=True, frozen=True)
+class QueuedCodeInteraction:
+    """Metrics of a code interaction accepted for a batched write (no id/timestamp yet)"""
+    interaction_type: str
+    characters_added: int
+    characters_deleted: int
+    is_significant_change: bool
+    completion_progress: float
+    syntax_errors: List[str]
+
 
 class StudentTrackingService:
     """Comprehensive real-time student tracking and analytics service"""
@@ -86,9 +109,7 @@ class StudentTrackingService:
     ) -> ChatInteraction:
         """Track a detailed chat interaction"""
         
-        # Analyze message content
-        word_count = len(content.split())
-        character_count = len(content)
+        # Analyze message content (character/word counts are generated columns)
         emotional_tone = self._analyze_emotional_tone(content)
         intent_classification = self._classify_intent(content, message_type)
         complexity_score = self._calculate_message_complexity(content)
@@ -98,13 +119,10 @@ class StudentTrackingService:
             session_tracking_id=session_tracking_id,
             student_id=student_id,
             session_id=session_id,
-            timestamp=datetime.utcnow(),
             message_type=message_type,
             content=content,
             node_id=node_id,
             response_time_ms=response_time_ms,
-            character_count=character_count,
-            word_count=word_count,
             emotional_tone=emotional_tone,
             intent_classification=intent_classification,
             complexity_score=complexity_score
@@ -137,8 +155,14 @@ class StudentTrackingService:
         language: str = "python",
         previous_code: Optional[str] = None,
         db: Session = None
-    ) -> Optional[CodeInteraction]:
-        """Track code changes with intelligent batching"""
+    ) -> Union[CodeInteraction, QueuedCodeInteraction, None]:
+        """
+        Track code changes with intelligent batching
+        
+        Returns the saved CodeInteraction, a QueuedCodeInteraction for keystroke-level
+        rows handed to the batch writer (no id yet), or None when the
+        change was too small to record.
+        """
         
         # Calculate code metrics
         lines_of_code = len([line for line in code_snapshot.split('\n') if line.strip()])
@@ -151,6 +175,8 @@ class StudentTrackingService:
         
         if previous_code:
             code_diff = self._calculate_code_diff(previous_code, code_snapshot)
+            if len(code_diff) > CODE_DIFF_MAX_LENGTH:
+                code_diff = None
             chars_added, chars_deleted = self._count_character_changes(previous_code, code_snapshot)
             is_significant = self._is_significant_change(previous_code, code_snapshot)
         else:
@@ -164,24 +190,60 @@ class StudentTrackingService:
             syntax_errors = self._analyze_syntax_errors(code_snapshot, language)
             completion_progress = self._estimate_completion_progress(code_snapshot, node_id)
             
-            code_interaction = CodeInteraction(
-                session_tracking_id=session_tracking_id,
-                student_id=student_id,
-                session_id=session_id,
-                timestamp=datetime.utcnow(),
-                node_id=node_id,
-                interaction_type=interaction_type,
-                code_snapshot=code_snapshot,
-                code_diff=code_diff,
-                language=language,
-                characters_added=chars_added,
-                characters_deleted=chars_deleted,
-                lines_of_code=lines_of_code,
-                syntax_errors=syntax_errors,
-                is_significant_change=is_significant,
-                completion_progress=completion_progress
-            )
+            # Keystrokes between recorded rows are never stored, so previous_code is
+            # not the previous stored snapshot: every row keeps a full compressed
+            # snapshot, and code_diff only describes the change from previous_code.
+            # Stamped here rather than by Postgres so batched rows keep request order
+            # relative to inline ones.
+            row = {
+                "timestamp": datetime.utcnow(),
+                "session_tracking_id": session_tracking_id,
+                "student_id": student_id,
+                "session_id": session_id,
+                "node_id": node_id,
+                "interaction_type": interaction_type,
+                "language": language,
+                "characters_added": chars_added,
+                "characters_deleted": chars_deleted,
+                "lines_of_code": lines_of_code,
+                "syntax_errors": syntax_errors,
+                "execution_result": None,
+                "execution_success": None,
+                "execution_time_ms": None,
+                "is_significant_change": is_significant,
+                "completion_progress": completion_progress,
+                "additional_metadata": {}
+            }
+            blob = {
+                "code_snapshot_zst": compress_snapshot(code_snapshot),
+                "code_diff": code_diff,
+            }
+            # Keystroke-level rows are written in batches, and the batch updates the
+            # session tracking metrics; their ids are assigned on flush
+            if interaction_type in BUFFERED_CODE_INTERACTION_TYPES:
+                code_interaction_ingest.submit(**row, **blob)
+                
+                # Analyze for struggle indicators in code patterns
+                await self._analyze_code_for_struggle_indicators(
+                    session_tracking_id, student_id, session_id, code_snapshot, 
+                    syntax_errors, interaction_type, db
+                )
+                if db.new or db.dirty:
+                    db.commit()
+                
+                logger.debug(f"Queued code interaction for student {student_id}: {interaction_type}")
+                return QueuedCodeInteraction(
+                    interaction_type=interaction_type,
+                    characters_added=chars_added,
+                    characters_deleted=chars_deleted,
+                    is_significant_change=is_significant,
+                    completion_progress=completion_progress,
+                    syntax_errors=syntax_errors
+                )
             
+            # The ORM inserts the metric row first, then the blob with its id
+            code_interaction = CodeInteraction(**row)
+            code_interaction.blob = CodeInteractionBlob(**blob)
             db.add(code_interaction)
             
             # Update session tracking metrics
@@ -249,28 +311,28 @@ class StudentTrackingService:
             session_id, student_id, progress_data
         )
     
-    async def get_session_overview(self, session_id: int, db: Session = None) -> Dict[str, Any]:
+    async def get_session_overview(self, session_id: int, db: AsyncSession = None) -> Dict[str, Any]:
         """Get comprehensive session overview for instructor dashboard"""
-        if not db:
+        if db is None:
             return {"error": "Database session required"}
         
         # Get all active session trackings
         statement = select(StudentSessionTracking).where(
             StudentSessionTracking.session_id == session_id
         )
-        session_trackings = db.exec(statement).all()
+        session_trackings = (await db.exec(statement)).all()
         
         students_data = []
         for tracking in session_trackings:
-            student = db.get(User, tracking.student_id)
+            student = await db.get(User, tracking.student_id)
             student_name = f"{student.first_name} {student.last_name}" if student else f"Student {tracking.student_id}"
             
             # Get recent struggle analysis
-            recent_struggle = db.exec(
+            recent_struggle = (await db.exec(
                 select(StruggleAnalysis)
                 .where(StruggleAnalysis.session_tracking_id == tracking.id)
                 .order_by(desc(StruggleAnalysis.timestamp))
-            ).first()
+            )).first()
             
             students_data.append({
                 "student_id": tracking.student_id,
@@ -300,44 +362,45 @@ class StudentTrackingService:
         self,
         student_id: int,
         session_id: int,
-        db: Session
+        db: AsyncSession
     ) -> Dict[str, Any]:
         """Get detailed analytics for a specific student"""
         
         # Get session tracking
-        tracking = db.exec(
+        tracking = (await db.exec(
             select(StudentSessionTracking).where(
                 and_(
                     StudentSessionTracking.session_id == session_id,
                     StudentSessionTracking.student_id == student_id
                 )
             )
-        ).first()
+        )).first()
         
         if not tracking:
             return {"error": "No tracking data found"}
         
         # Get recent interactions
-        recent_chats = db.exec(
+        recent_chats = (await db.exec(
             select(ChatInteraction)
             .where(ChatInteraction.session_tracking_id == tracking.id)
             .order_by(desc(ChatInteraction.timestamp))
             .limit(10)
-        ).all()
+        )).all()
         
-        recent_code = db.exec(
+        recent_code = (await db.exec(
             select(CodeInteraction)
             .where(CodeInteraction.session_tracking_id == tracking.id)
+            .where(CodeInteraction.timestamp >= tracking.start_time)
             .order_by(desc(CodeInteraction.timestamp))
             .limit(10)
-        ).all()
+        )).all()
         
-        recent_submissions = db.exec(
+        recent_submissions = (await db.exec(
             select(CodeSubmission)
             .where(CodeSubmission.session_tracking_id == tracking.id)
             .order_by(desc(CodeSubmission.timestamp))
             .limit(5)
-        ).all()
+        )).all()
         
         return {
             "student_id": student_id,
@@ -388,17 +451,17 @@ class StudentTrackingService:
     async def acknowledge_struggle_intervention(
         self,
         struggle_id: int,
-        db: Session
+        db: AsyncSession
     ):
         """Mark a struggle intervention as acknowledged by instructor"""
-        struggle = db.get(StruggleAnalysis, struggle_id)
+        struggle = await db.get(StruggleAnalysis, struggle_id)
         if struggle:
             struggle.instructor_notified = True
             struggle.instructor_response_time_seconds = int(
                 (datetime.utcnow() - struggle.timestamp).total_seconds()
             )
             db.add(struggle)
-            db.commit()
+            await db.commit()
             
             logger.info(f"Struggle intervention {struggle_id} acknowledged by instructor")
     
@@ -429,10 +492,7 @@ class StudentTrackingService:
         submission_number = submission_count + 1
         
         # Calculate time since session start
-        statement = select(StudentSessionTracking).where(
-            StudentSessionTracking.id == session_tracking_id
-        )
-        session_tracking = db.exec(statement).first()
+        session_tracking = db.get(StudentSessionTracking, session_tracking_id)
         time_since_start = 0
         if session_tracking:
             time_since_start = int((datetime.utcnow() - session_tracking.start_time).total_seconds())
@@ -458,7 +518,6 @@ class StudentTrackingService:
             student_id=student_id,
             session_id=session_id,
             node_id=node_id,
-            timestamp=datetime.utcnow(),
             submission_number=submission_number,
             submitted_code=submitted_code,
             language=language,
@@ -475,6 +534,18 @@ class StudentTrackingService:
         
         db.add(code_submission)
         
+        # The eventlog insert trigger counts CODE_EXECUTED events into total_interactions,
+        # consecutive_failures and average_response_time_ms on the latest tracking row
+        event_ingest.submit(
+            event_type=EventType.CODE_EXECUTED,
+            student_id=student_id,
+            session_id=session_id,
+            node_id=node_id,
+            payload={"submission_number": submission_number},
+            response_time_ms=execution_time_ms,
+            success=is_correct
+        )
+        
         # Update session tracking with submission results
         await self._update_session_submission_metrics(session_tracking_id, is_correct, db)
         
@@ -548,7 +619,6 @@ class StudentTrackingService:
                 student_id=student_id,
                 session_id=session_id,
                 node_id=node_id,
-                timestamp=datetime.utcnow(),
                 struggle_score=struggle_score,
                 severity=severity,
                 indicators=indicators,
@@ -575,6 +645,21 @@ class StudentTrackingService:
         
         return None
     
+    def get_latest_code(self, session_tracking_id: int, db: Session) -> Optional[str]:
+        """Latest tracked code for a session, from its newest stored snapshot"""
+        statement = (
+            select(CodeInteractionBlob)
+            .join(CodeInteraction, CodeInteraction.id == CodeInteractionBlob.interaction_id)
+            .where(
+                CodeInteraction.session_tracking_id == session_tracking_id,
+                CodeInteractionBlob.code_snapshot_zst.is_not(None)
+            )
+            .order_by(CodeInteraction.timestamp.desc(), CodeInteraction.id.desc())
+            .limit(1)
+        )
+        latest = db.exec(statement).first()
+        return latest.code_snapshot if latest else None
+    
     async def update_learning_profile(
         self,
         student_id: int,
@@ -603,18 +688,20 @@ class StudentTrackingService:
         profile.learning_style = profile_data.get("learning_style")
         profile.learning_style_confidence = profile_data.get("learning_style_confidence", 0.0)
         profile.preferred_time_of_day = profile_data.get("preferred_time_of_day")
-        profile.average_session_duration_minutes = profile_data.get("avg_session_duration", 0.0)
-        profile.average_response_time_ms = profile_data.get("avg_response_time", 0.0)
         profile.preferred_help_method = profile_data.get("preferred_help_method")
         profile.common_struggle_areas = profile_data.get("struggle_areas", [])
         profile.struggle_recovery_methods = profile_data.get("recovery_methods", [])
         profile.resilience_score = profile_data.get("resilience_score", 50.0)
         profile.motivation_drivers = profile_data.get("motivation_drivers", [])
-        profile.overall_success_rate = profile_data.get("success_rate", 0.0)
         profile.consistency_score = profile_data.get("consistency_score", 50.0)
-        profile.total_sessions = profile_data.get("total_sessions", 0)
-        profile.total_study_time_hours = profile_data.get("total_study_hours", 0.0)
-        profile.last_activity_date = datetime.utcnow()
+        # Session/event aggregates are maintained by the student_learning_stats view
+        
+        # Keep the previous embedding if the AI service is unavailable
+        embedding = await asyncio.get_running_loop().run_in_executor(
+            None, get_embedding, self._profile_embedding_text(profile), PROFILE_EMBEDDING_DIMENSIONS
+        )
+        if embedding is not None:
+            profile.embedding = embedding
         
         db.commit()
         db.refresh(profile)
@@ -622,8 +709,45 @@ class StudentTrackingService:
         logger.info(f"Updated learning profile for student {student_id}")
         return profile
     
+    def find_similar_learners(
+        self,
+        student_id: int,
+        db: Session,
+        limit: int = 20
+    ) -> List[Tuple[StudentLearningProfile, float]]:
+        """Profiles nearest to the student's embedding, with their cosine distance"""
+        statement = select(StudentLearningProfile.embedding).where(
+            StudentLearningProfile.student_id == student_id
+        )
+        query_embedding = db.exec(statement).first()
+        if query_embedding is None:
+            return []
+        
+        distance = StudentLearningProfile.embedding.cosine_distance(query_embedding)
+        statement = (
+            select(StudentLearningProfile, distance)
+            .where(StudentLearningProfile.student_id != student_id)
+            .where(StudentLearningProfile.embedding.is_not(None))
+            .order_by(distance)
+            .limit(limit)
+        )
+        return [(profile, float(dist)) for profile, dist in db.exec(statement).all()]
+    
     # Private helper methods for analysis
     
+    def _profile_embedding_text(self, profile: StudentLearningProfile) -> str:
+        """Text embedded for similarity search: style, struggle and motivation fields plus insights"""
+        return "\n".join([
+            f"learning style: {profile.learning_style or 'unknown'}",
+            f"preferred time: {profile.preferred_time_of_day or 'unknown'}",
+            f"preferred help: {profile.preferred_help_method or 'unknown'}",
+            f"struggle areas: {', '.join(profile.common_struggle_areas)}",
+            f"recovery methods: {', '.join(profile.struggle_recovery_methods)}",
+            f"motivation: {', '.join(profile.motivation_drivers)}",
+            f"recommendations: {', '.join(profile.personalized_recommendations)}",
+            f"insights: {json.dumps(profile.ai_generated_insights, sort_keys=True)}",
+        ])
+    
     def _analyze_emotional_tone(self, content: str) -> str:
         """Analyze emotional tone of message content"""
         content_lower = content.lower()
@@ -678,14 +802,8 @@ class StudentTrackingService:
         return max(1.0, complexity)
     
     def _calculate_code_diff(self, old_code: str, new_code: str) -> str:
-        """Calculate a simple diff between code versions"""
-        # Simple diff implementation - could be enhanced with proper diff algorithms
-        if len(new_code) > len(old_code):
-            return f"+{len(new_code) - len(old_code)} chars"
-        elif len(new_code) < len(old_code):
-            return f"-{len(old_code) - len(new_code)} chars"
-        else:
-            return "modified"
+        """Calculate a line delta between code versions (see app.utils.code_snapshots)"""
+        return make_line_delta(old_code, new_code)
     
     def _count_character_changes(self, old_code: str, new_code: str) -> Tuple[int, int]:
         """Count characters added and deleted"""
@@ -850,10 +968,7 @@ class StudentTrackingService:
     
     async def _update_session_chat_metrics(self, session_tracking_id: int, db: Session):
         """Update session tracking with latest chat metrics"""
-        statement = select(StudentSessionTracking).where(
-            StudentSessionTracking.id == session_tracking_id
-        )
-        session_tracking = db.exec(statement).first()
+        session_tracking = db.get(StudentSessionTracking, session_tracking_id)
         
         if session_tracking:
             session_tracking.total_chat_messages += 1
@@ -862,10 +977,7 @@ class StudentTrackingService:
     
     async def _update_session_code_metrics(self, session_tracking_id: int, db: Session):
         """Update session tracking with latest code metrics"""
-        statement = select(StudentSessionTracking).where(
-            StudentSessionTracking.id == session_tracking_id
-        )
-        session_tracking = db.exec(statement).first()
+        session_tracking = db.get(StudentSessionTracking, session_tracking_id)
         
         if session_tracking:
             session_tracking.total_code_changes += 1
@@ -874,33 +986,16 @@ class StudentTrackingService:
     
     async def _update_session_submission_metrics(self, session_tracking_id: int, is_correct: bool, db: Session):
         """Update session tracking with submission results"""
-        statement = select(StudentSessionTracking).where(
-            StudentSessionTracking.id == session_tracking_id
-        )
-        session_tracking = db.exec(statement).first()
+        session_tracking = db.get(StudentSessionTracking, session_tracking_id)
         
         if session_tracking:
-            session_tracking.total_interactions += 1
-            if not is_correct:
-                session_tracking.consecutive_failures += 1
-            else:
-                session_tracking.consecutive_failures = 0
-            
-            # Recalculate success rate
-            total_submissions = session_tracking.total_interactions
-            if total_submissions > 0:
-                # This is simplified - would need to query actual submission results
-                pass
-            
+            # Interaction and failure counters are maintained by the eventlog trigger
             session_tracking.last_activity = datetime.utcnow()
             db.add(session_tracking)
     
     async def _update_session_struggle_metrics(self, session_tracking_id: int, struggle_score: float, db: Session):
         """Update session tracking with struggle metrics"""
-        statement = select(StudentSessionTracking).where(
-            StudentSessionTracking.id == session_tracking_id
-        )
-        session_tracking = db.exec(statement).first()
+        session_tracking = db.get(StudentSessionTracking, session_tracking_id)
         
         if session_tracking:
             session_tracking.current_struggle_score = struggle_score
@@ -1000,10 +1095,7 @@ class StudentTrackingService:
     ) -> Dict[str, Any]:
         """Analyze time-based struggle indicators"""
         
-        statement = select(StudentSessionTracking).where(
-            StudentSessionTracking.id == session_tracking_id
-        )
-        session_tracking = db.exec(statement).first()
+        session_tracking = db.get(StudentSessionTracking, session_tracking_id)
         
         indicators = {}
         
@@ -1031,18 +1123,6 @@ class StudentTrackingService:
         if not all_sessions:
             return {}
         
-        # Calculate various metrics
-        total_sessions = len(all_sessions)
-        total_time = sum(
-            (session.end_time or datetime.utcnow() - session.start_time).total_seconds() / 3600
-            for session in all_sessions
-        )
-        avg_session_duration = total_time / total_sessions if total_sessions > 0 else 0
-        
-        # Calculate overall success rate
-        total_interactions = sum(session.total_interactions for session in all_sessions)
-        # This would need more complex calculation based on actual submission data
-        
         # Analyze time patterns (simplified)
         session_hours = [session.start_time.hour for session in all_sessions]
         if session_hours:
@@ -1057,15 +1137,10 @@ class StudentTrackingService:
             preferred_time = None
         
         return {
-            "total_sessions": total_sessions,
-            "total_study_hours": total_time,
-            "avg_session_duration": avg_session_duration * 60,  # Convert to minutes
             "preferred_time_of_day": preferred_time,
-            "success_rate": 0.75,  # Placeholder - would calculate from actual data
             "consistency_score": 85.0,  # Placeholder
             "learning_style": "visual",  # Would be determined by AI analysis
             "learning_style_confidence": 0.7,
-            "avg_response_time": 2500.0,  # milliseconds
             "preferred_help_method": "hints",
             "struggle_areas": ["loops", "functions"],  # From struggle analysis
             "recovery_methods": ["hints", "examples"],
@@ -4,6 +4,7 @@ Simple utilities for interacting with OpenAI API
 """
 
 import logging
+from typing import List, Optional
 from openai import OpenAI
 from app.core.config import settings
 
@@ -54,6 +55,26 @@ def ask_gpt(question: str, system_prompt: str = "You are a helpful assistant.")
         return f"Sorry, I encountered an error: {str(e)}"
 
 
+EMBEDDING_MODEL = "text-embedding-3-small"
+
+
+def get_embedding(text: str, dimensions: int) -> Optional[List[float]]:
+    """
+    Embed text with OpenAI, shortened to `dimensions`
+    
+    Returns None when the AI service is unavailable or the call fails.
+    """
+    if not client:
+        return None
+    
+    try:
+        response = client.embeddings.create(model=EMBEDDING_MODEL, input=text, dimensions=dimensions)
+        return response.data[0].embedding
+    except Exception as e:
+        logger.error(f"Error creating embedding: {e}")
+        return None
+
+
 def is_ai_available() -> bool:
     """Check if AI service is available"""
     return client is not None
@@ -0,0 +1,64 @@
+"""
+Code Snapshot Utilities
+Compression of stored CodeInteraction snapshots, and the line-delta encoding of
+their code_diff
+"""
+
+import threading
+from difflib import SequenceMatcher
+import orjson
+import zstandard
+
+# Level 3 is zstd's default: fast, and 5-10x on source text
+COMPRESSION_LEVEL = 3
+
+# zstd (de)compressor instances are not thread-safe; reuse one per thread
+_zstd = threading.local()
+
+
+def _compressor() -> zstandard.ZstdCompressor:
+    if not hasattr(_zstd, "compressor"):
+        _zstd.compressor = zstandard.ZstdCompressor(level=COMPRESSION_LEVEL)
+    return _zstd.compressor
+
+
+def _decompressor() -> zstandard.ZstdDecompressor:
+    if not hasattr(_zstd, "decompressor"):
+        _zstd.decompressor = zstandard.ZstdDecompressor()
+    return _zstd.decompressor
+
+
+def compress_snapshot(code: str) -> bytes:
+    """Compress a code snapshot for storage"""
+    return _compressor().compress(code.encode())
+
+
+def decompress_snapshot(data: bytes) -> str:
+    """Decompress a stored code snapshot"""
+    return _decompressor().decompress(data).decode()
+
+
+def make_line_delta(old_code: str, new_code: str) -> str:
+    """
+    Encode the change from old_code to new_code as a compact line delta
+
+    The delta is a JSON list of [start, end, replacement_lines] edits against the
+    old code's lines, applied by apply_line_delta().
+    """
+    old_lines = old_code.splitlines(keepends=True)
+    new_lines = new_code.splitlines(keepends=True)
+    edits = [
+        [i1, i2, new_lines[j1:j2]]
+        for tag, i1, i2, j1, j2 in SequenceMatcher(None, old_lines, new_lines, autojunk=False).get_opcodes()
+        if tag != "equal"
+    ]
+    return orjson.dumps(edits).decode()
+
+
+def apply_line_delta(old_code: str, delta: str) -> str:
+    """Rebuild the new code from the old code and a delta from make_line_delta()"""
+    lines = old_code.splitlines(keepends=True)
+    # Apply from the end so earlier offsets stay valid
+    for start, end, replacement in reversed(orjson.loads(delta)):
+        lines[start:end] = replacement
+    return "".join(lines)
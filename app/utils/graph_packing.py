@@ -0,0 +1,64 @@
+"""
+Graph Packing Utilities
+Short-key layout for persisted bubble graphs. JSONB stores every key in every
+node and edge, so long key names dominate the size of large graphs.
+"""
+
+from typing import Any, Dict, Optional
+
+# Full key -> stored key, per level of the document
+GRAPH_KEYS = {"start_node": "s", "nodes": "n", "edges": "e"}
+NODE_KEYS = {"id": "i", "type": "k", "title": "t", "x": "x", "y": "y", "width": "w", "height": "h", "color": "c"}
+EDGE_KEYS = {"from_node": "f", "to_node": "t", "label": "l", "condition": "c"}
+
+# Optional keys left out of stored rows while null and restored as null on read
+NULLABLE_NODE_KEYS = ("color",)
+NULLABLE_EDGE_KEYS = ("label", "condition")
+
+_GRAPH_KEYS_UNPACK = {v: k for k, v in GRAPH_KEYS.items()}
+_NODE_KEYS_UNPACK = {v: k for k, v in NODE_KEYS.items()}
+_EDGE_KEYS_UNPACK = {v: k for k, v in EDGE_KEYS.items()}
+
+
+def _pack_item(item: Dict[str, Any], keys: Dict[str, str], nullable) -> Dict[str, Any]:
+    return {
+        keys.get(key, key): value
+        for key, value in item.items()
+        if not (value is None and key in nullable)
+    }
+
+
+def _unpack_item(item: Dict[str, Any], keys: Dict[str, str], nullable) -> Dict[str, Any]:
+    unpacked = {keys.get(key, key): value for key, value in item.items()}
+    for key in nullable:
+        unpacked.setdefault(key, None)
+    return unpacked
+
+
+def pack_graph(graph: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """
+    Convert a graph to its stored layout
+
+    Also packs partial documents (e.g. containment probes such as
+    {"nodes": [{"id": ...}]}), so @> queries match stored rows.
+    """
+    if graph is None:
+        return None
+    packed = {GRAPH_KEYS.get(key, key): value for key, value in graph.items()}
+    if "nodes" in graph:
+        packed["n"] = [_pack_item(node, NODE_KEYS, NULLABLE_NODE_KEYS) for node in graph["nodes"]]
+    if "edges" in graph:
+        packed["e"] = [_pack_item(edge, EDGE_KEYS, NULLABLE_EDGE_KEYS) for edge in graph["edges"]]
+    return packed
+
+
+def unpack_graph(packed: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Expand a stored graph back to the API layout"""
+    if packed is None:
+        return None
+    graph = {_GRAPH_KEYS_UNPACK.get(key, key): value for key, value in packed.items()}
+    if "n" in packed:
+        graph["nodes"] = [_unpack_item(node, _NODE_KEYS_UNPACK, NULLABLE_NODE_KEYS) for node in packed["n"]]
+    if "e" in packed:
+        graph["edges"] = [_unpack_item(edge, _EDGE_KEYS_UNPACK, NULLABLE_EDGE_KEYS) for edge in packed["e"]]
+    return graph
@@ -0,0 +1,26 @@
+#!/usr/bin/env python3
+"""
+Nightly job: export aged eventlog/codeinteraction partitions to Parquet and drop them
+"""
+
+import sys
+import os
+import logging
+
+# Add project root to path
+sys.path.append(os.path.dirname(os.path.dirname(__file__)))
+
+from app.services.archive_service import archive_cold_partitions
+
+
+def main():
+    logging.basicConfig(level=logging.INFO)
+    archived = archive_cold_partitions()
+    if not archived:
+        print("No partitions to archive")
+    for partition, rows in archived.items():
+        print(f"{partition}: {rows} rows archived")
+
+
+if __name__ == "__main__":
+    main()
@@ -91,7 +91,7 @@ def test_models():
         user = User(
             username="test_user",
             email="test@example.com",
-            hashed_password="dummy_hash"
+            hashed_password=b"dummy_hash"
         )
         
         course = Course(